@@ -0,0 +1,313 @@
+"""Векторизованный анализ собранных данных прогонов на NumPy.
+
+Источники:
+- трафик traffic.py (JSONL: endpoint, elapsed_ms, ttfb_ms, status);
+- гистограммы latency_recorder.py (latency-<время>.json);
+- сравнения статистики v1/v2 (JSONL из StatisticsDiff.to_dict / stats_scanner.py).
+
+Строки загружаются в столбцы NumPy (эндпоинт хранится кодом), дальше
+перцентили, выбросы, доли ошибок и разницы v1/v2 считаются без циклов по
+строкам. Разобранный JSONL кэшируется рядом в <файл>.npz.
+
+Запуск:
+    python analysis.py traffic traffic.jsonl
+    python analysis.py traffic traffic-new.jsonl --baseline traffic.jsonl --threshold 0.1
+    python analysis.py latency latency_reports/latency-20250101-120000.json
+    python analysis.py stats stats_scan.findings.jsonl
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+
+import numpy as np
+
+from latency_recorder import bucket_bounds
+
+DEFAULT_PERCENTILES = (50, 95, 99)
+STATISTICS_FIELDS = ("likes", "viewCount", "contacts")
+_CACHE_VERSION = 1
+_PARSE_BATCH = 50000
+
+
+class LatencyColumns:
+    """Задержки в столбцах: codes[i] - номер эндпоинта в endpoints"""
+
+    def __init__(self, endpoints, codes, latency_ms, status=None, ttfb_ms=None):
+        self.endpoints = list(endpoints)
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.latency_ms = np.asarray(latency_ms, dtype=np.float64)
+        # 0 - запрос без ответа (ошибка соединения, таймаут)
+        self.status = np.zeros(len(self.codes), dtype=np.int16) if status is None else np.asarray(status, dtype=np.int16)
+        self.ttfb_ms = np.full(len(self.codes), np.nan) if ttfb_ms is None else np.asarray(ttfb_ms, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def responses(self):
+        """Только строки с ответом"""
+        mask = self.status > 0
+        return LatencyColumns(self.endpoints, self.codes[mask], self.latency_ms[mask],
+                              self.status[mask], self.ttfb_ms[mask])
+
+
+def _cached(path, parse):
+    """Столбцы из <path>.npz, если он новее исходного файла, иначе parse(path)"""
+    cache = f"{path}.npz"
+    stat = os.stat(path)
+    if os.path.exists(cache):
+        with np.load(cache, allow_pickle=False) as data:
+            if (int(data["version"]) == _CACHE_VERSION and int(data["source_size"]) == stat.st_size
+                    and float(data["source_mtime"]) == stat.st_mtime):
+                return {name: data[name] for name in data.files}
+    columns = parse(path)
+    try:
+        np.savez(cache, version=_CACHE_VERSION, source_size=stat.st_size, source_mtime=stat.st_mtime, **columns)
+    except OSError:
+        pass
+    return columns
+
+
+def _iter_jsonl_batches(path, batch_size=_PARSE_BATCH):
+    """Строки JSONL списками словарей: один json.loads на пачку строк быстрее, чем на строку"""
+    with open(path, encoding="utf-8") as f:
+        while True:
+            lines = list(itertools.islice(f, batch_size))
+            if not lines:
+                return
+            lines = [line for line in lines if line.strip()]
+            if lines:
+                yield json.loads("[" + ",".join(lines) + "]")
+
+
+def _parse_traffic(path):
+    endpoints = {}
+    codes, latency, status, ttfb = [], [], [], []
+    for batch in _iter_jsonl_batches(path):
+        codes.append(np.array([endpoints.setdefault(entry["endpoint"], len(endpoints)) for entry in batch],
+                              dtype=np.int32))
+        latency.append(np.array([entry["elapsed_ms"] for entry in batch], dtype=np.float64))
+        status.append(np.array([entry.get("status") or 0 for entry in batch], dtype=np.int16))
+        ttfb.append(np.array([entry.get("ttfb_ms", np.nan) for entry in batch], dtype=np.float64))
+    return {
+        "endpoints": np.array(list(endpoints), dtype=str),
+        "codes": _concatenate(codes, np.int32),
+        "latency_ms": _concatenate(latency, np.float64),
+        "status": _concatenate(status, np.int16),
+        "ttfb_ms": _concatenate(ttfb, np.float64),
+    }
+
+
+def _concatenate(chunks, dtype):
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+
+
+def load_traffic(path, cache=True):
+    """Записанный трафик (traffic.py) в LatencyColumns"""
+    data = _cached(path, _parse_traffic) if cache else _parse_traffic(path)
+    return LatencyColumns(data["endpoints"].tolist(), data["codes"], data["latency_ms"],
+                          data["status"], data["ttfb_ms"])
+
+
+def load_latency_report(path):
+    """Гистограммы latency_recorder в LatencyColumns.
+
+    Каждое значение - середина своего бакета, поэтому точность та же, что у
+    гистограммы (< 1%).
+    """
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    endpoints, codes, latency = [], [], []
+    for code, (endpoint, histogram) in enumerate(sorted(report["endpoints"].items())):
+        endpoints.append(endpoint)
+        indexes = np.array([int(index) for index in histogram["buckets"]], dtype=np.int64)
+        counts = np.array(list(histogram["buckets"].values()), dtype=np.int64)
+        bounds = np.array([bucket_bounds(index) for index in indexes], dtype=np.float64).reshape(-1, 2)
+        middle_ms = (bounds[:, 0] + bounds[:, 1] - 1) / 2 / 1e6
+        latency.append(np.repeat(middle_ms, counts))
+        codes.append(np.full(counts.sum(), code, dtype=np.int32))
+    if not endpoints:
+        return LatencyColumns([], [], [], [])
+    latency = np.concatenate(latency)
+    return LatencyColumns(endpoints, np.concatenate(codes), latency, np.full(len(latency), 200))
+
+
+def _grouped(columns):
+    """Задержки, отсортированные по (эндпоинт, задержка), и границы групп"""
+    order = np.lexsort((columns.latency_ms, columns.codes))
+    codes = columns.codes[order]
+    values = columns.latency_ms[order]
+    groups = np.arange(len(columns.endpoints))
+    starts = np.searchsorted(codes, groups, side="left")
+    ends = np.searchsorted(codes, groups, side="right")
+    return values, starts, ends
+
+
+def _group_quantiles(values, starts, ends, percents):
+    """Перцентили для всех групп сразу: [группа, перцентиль].
+
+    Ранг считается так же, как в load_driver.percentile.
+    """
+    counts = ends - starts
+    percents = np.asarray(percents, dtype=np.float64)
+    ranks = np.ceil(percents[None, :] * counts[:, None] / 100).astype(np.int64)
+    ranks = np.clip(ranks, 1, np.maximum(counts, 1)[:, None])
+    result = np.full((len(counts), len(percents)), np.nan)
+    present = counts > 0
+    if len(values):
+        result[present] = values[starts[present, None] + ranks[present] - 1]
+    return result
+
+
+def percentiles(columns, percents=DEFAULT_PERCENTILES):
+    """{эндпоинт: {"count", "mean_ms", "p50_ms", ...}} по строкам с ответом"""
+    columns = columns.responses()
+    values, starts, ends = _grouped(columns)
+    quantiles = _group_quantiles(values, starts, ends, percents)
+    counts = ends - starts
+    sums = np.bincount(columns.codes, weights=columns.latency_ms, minlength=len(columns.endpoints))
+    result = {}
+    for code, endpoint in enumerate(columns.endpoints):
+        if not counts[code]:
+            continue
+        row = {"count": int(counts[code]), "mean_ms": float(sums[code] / counts[code])}
+        row.update({f"p{p:g}_ms": float(quantiles[code, i]) for i, p in enumerate(percents)})
+        result[endpoint] = row
+    return result
+
+
+def outliers(columns, k=1.5):
+    """Выбросы по Тьюки внутри каждого эндпоинта: задержка > Q3 + k * IQR.
+
+    Возвращает (маска строк с ответом, {эндпоинт: (число выбросов, граница, мс)}).
+    """
+    columns = columns.responses()
+    values, starts, ends = _grouped(columns)
+    q1, q3 = _group_quantiles(values, starts, ends, [25, 75]).T
+    fences = q3 + k * (q3 - q1)
+    mask = columns.latency_ms > fences[columns.codes]
+    counts = np.bincount(columns.codes[mask], minlength=len(columns.endpoints))
+    summary = {endpoint: (int(counts[code]), float(fences[code]))
+               for code, endpoint in enumerate(columns.endpoints) if ends[code] > starts[code]}
+    return mask, summary
+
+
+def error_rates(columns):
+    """{эндпоинт: доля ответов 5xx и запросов без ответа}"""
+    failed = (columns.status == 0) | (columns.status >= 500)
+    total = np.bincount(columns.codes, minlength=len(columns.endpoints))
+    errors = np.bincount(columns.codes[failed], minlength=len(columns.endpoints))
+    return {endpoint: float(errors[code] / total[code])
+            for code, endpoint in enumerate(columns.endpoints) if total[code]}
+
+
+def find_regressions(baseline, current, threshold=0.1, percents=DEFAULT_PERCENTILES):
+    """Эндпоинты, где перцентиль текущего прогона больше базового в 1 + threshold раз.
+
+    Возвращает список (эндпоинт, перцентиль, базовое мс, текущее мс, отношение).
+    """
+    before = percentiles(baseline, percents)
+    after = percentiles(current, percents)
+    endpoints = sorted(set(before) & set(after))
+    if not endpoints:
+        return []
+    keys = [f"p{p:g}_ms" for p in percents]
+    old = np.array([[before[endpoint][key] for key in keys] for endpoint in endpoints])
+    new = np.array([[after[endpoint][key] for key in keys] for endpoint in endpoints])
+    ratio = np.divide(new, old, out=np.full_like(new, np.inf), where=old > 0)
+    rows, cols = np.nonzero(ratio > 1 + threshold)
+    return [(endpoints[row], keys[col][:-3], float(old[row, col]), float(new[row, col]), float(ratio[row, col]))
+            for row, col in zip(rows, cols)]
+
+
+class StatisticsColumns:
+    """Статистика v1 и v2: массивы [объявление, поле], NaN - нет данных"""
+
+    def __init__(self, item_ids, v1, v2):
+        self.item_ids = np.asarray(item_ids, dtype=str)
+        self.v1 = np.asarray(v1, dtype=np.float64).reshape(-1, len(STATISTICS_FIELDS))
+        self.v2 = np.asarray(v2, dtype=np.float64).reshape(-1, len(STATISTICS_FIELDS))
+
+    def __len__(self):
+        return len(self.item_ids)
+
+
+def _parse_statistics(path):
+    item_ids, v1, v2 = [], [], []
+    for batch in _iter_jsonl_batches(path):
+        # Ошибки продавцов из stats_scanner.py не относятся к объявлениям
+        batch = [entry for entry in batch if "item_id" in entry]
+        item_ids.extend(entry["item_id"] for entry in batch)
+        for target, version in ((v1, "v1"), (v2, "v2")):
+            target.append(np.array([[(entry.get(version) or {}).get(field, np.nan) for field in STATISTICS_FIELDS]
+                                    for entry in batch], dtype=np.float64).reshape(-1, len(STATISTICS_FIELDS)))
+    empty = [np.zeros((0, len(STATISTICS_FIELDS)))]
+    return {
+        "item_ids": np.array(item_ids, dtype=str),
+        "v1": np.concatenate(v1 or empty),
+        "v2": np.concatenate(v2 or empty),
+    }
+
+
+def load_statistics(path, cache=True):
+    data = _cached(path, _parse_statistics) if cache else _parse_statistics(path)
+    return StatisticsColumns(data["item_ids"], data["v1"], data["v2"])
+
+
+def statistics_deltas(columns):
+    """Разница v2 - v1 по полям для объявлений, у которых есть обе версии"""
+    both = ~(np.isnan(columns.v1).any(axis=1) | np.isnan(columns.v2).any(axis=1))
+    deltas = columns.v2[both] - columns.v1[both]
+    mismatched = deltas != 0
+    result = {"items": len(columns), "compared": int(both.sum()),
+              "items_mismatched": int(mismatched.any(axis=1).sum()), "fields": {}}
+    for index, field in enumerate(STATISTICS_FIELDS):
+        delta = deltas[:, index]
+        changed = delta[mismatched[:, index]]
+        result["fields"][field] = {
+            "mismatched": int(changed.size),
+            "mean_delta": float(changed.mean()) if changed.size else 0.0,
+            "max_abs_delta": float(np.abs(changed).max()) if changed.size else 0.0,
+        }
+    return result
+
+
+def format_latency_summary(columns, percents=DEFAULT_PERCENTILES):
+    rows = percentiles(columns, percents)
+    errors = error_rates(columns)
+    _, outlier_counts = outliers(columns)
+    header = f"{'endpoint':<28} {'count':>8} {'mean':>8} " + " ".join(f"{f'p{p:g}':>8}" for p in percents)
+    lines = [header + f" {'errors':>7} {'outliers':>8}"]
+    for endpoint, row in rows.items():
+        cells = " ".join(f"{row[f'p{p:g}_ms']:>8.2f}" for p in percents)
+        lines.append(f"{endpoint:<28} {row['count']:>8} {row['mean_ms']:>8.2f} {cells} "
+                     f"{errors.get(endpoint, 0.0):>7.2%} {outlier_counts[endpoint][0]:>8}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=["traffic", "latency", "stats"], help="Тип данных")
+    parser.add_argument("path", help="Файл с данными")
+    parser.add_argument("--baseline", default=None, help="Базовый прогон того же типа для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Допустимый рост перцентиля (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.kind == "stats":
+        print(json.dumps(statistics_deltas(load_statistics(args.path)), ensure_ascii=False, indent=2))
+        return 0
+    load = load_traffic if args.kind == "traffic" else load_latency_report
+    columns = load(args.path)
+    print(f"{len(columns)} строк")
+    print(format_latency_summary(columns))
+    if args.baseline is None:
+        return 0
+    regressions = find_regressions(load(args.baseline), columns, args.threshold)
+    for endpoint, percent, old, new, ratio in regressions:
+        print(f"РЕГРЕССИЯ {endpoint} {percent}: {old:.2f} -> {new:.2f} ms (x{ratio:.2f})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
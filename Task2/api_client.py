@@ -1,20 +1,351 @@
+import contextvars
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import RequestEvent, RequestHooks
+from json_stream import iter_json_array
+from resilience import CircuitBreakerRegistry, CircuitOpenError, RetryPolicy
+from timeouts import CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT, TIMEOUT_PROFILES, DeadlineExceeded, current_deadline
+
+DEFAULT_BASE_URL = "https://qa-internship.avito.com"
+# Переменная окружения для запуска против другого стенда (например, fake_server.py)
+BASE_URL_ENV = "API_BASE_URL"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Параметры пула соединений по умолчанию:
+# pool_connections - сколько пулов (по одному на хост) держать в кэше,
+# pool_maxsize - сколько keep-alive соединений держать на один хост,
+# pool_block - блокироваться ли при исчерпании лимита на хост вместо открытия лишних соединений
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_POOL_BLOCK = False
+
+_shared_sessions = {}
+_shared_sessions_lock = threading.Lock()
+# Обертки транспортных адаптеров общих сессий (например, cassette.CassetteAdapter)
+_adapter_wrappers = []
+
+
+def _mount_adapter(session, adapter):
+    for wrapper in _adapter_wrappers:
+        adapter = wrapper(adapter)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def get_shared_session(pool_connections=DEFAULT_POOL_CONNECTIONS,
+                       pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                       pool_block=DEFAULT_POOL_BLOCK):
+    """Общая keep-alive сессия с пулом соединений (одна на процесс для каждой конфигурации пула)"""
+    key = (pool_connections, pool_maxsize, pool_block)
+    with _shared_sessions_lock:
+        session = _shared_sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block
+            )
+            _mount_adapter(session, adapter)
+            _shared_sessions[key] = session
+        return session
+
+
+def wrap_shared_adapters(wrapper):
+    """Обернуть транспорт общих сессий: wrapper(adapter) -> adapter.
+
+    Действует на уже созданные и будущие сессии до unwrap_shared_adapters().
+    """
+    with _shared_sessions_lock:
+        _adapter_wrappers.append(wrapper)
+        for session in _shared_sessions.values():
+            adapter = wrapper(session.get_adapter("http://"))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+
+
+def unwrap_shared_adapters():
+    """Снять все обертки: общие сессии закрываются и создаются заново"""
+    with _shared_sessions_lock:
+        _adapter_wrappers.clear()
+    close_shared_sessions()
+
+
+def close_shared_sessions():
+    """Закрыть все общие сессии и их соединения"""
+    with _shared_sessions_lock:
+        for session in _shared_sessions.values():
+            session.close()
+        _shared_sessions.clear()
+
+
+def _reset_shared_sessions_after_fork():
+    # После os.fork() (например, multiprocessing с методом fork) потомок не должен
+    # писать в унаследованные сокеты родителя: создаем свой пул. Воркеры pytest-xdist
+    # запускаются отдельными интерпретаторами, а не fork, и пул у них и так свой.
+    global _shared_sessions_lock
+    _shared_sessions_lock = threading.Lock()
+    _shared_sessions.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_shared_sessions_after_fork)
+
+
+# Политика повторов и circuit breaker'ы общие для всех клиентов процесса,
+# чтобы счетчики и состояние эндпоинтов не сбрасывались в каждом setup_method
+DEFAULT_RETRY_POLICY = RetryPolicy()
+DEFAULT_CIRCUIT_BREAKERS = CircuitBreakerRegistry()
+# Хуки, общие для всех клиентов без собственных (сюда подключается сборщик метрик сессии)
+DEFAULT_HOOKS = RequestHooks()
+
+# BUG-001: вместо объекта объявления сервис возвращает {"status": "Сохранили объявление - <uuid>"}
+_STATUS_ID_PATTERN = re.compile(r"([0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12})")
+
+
+def extract_item_id(response_data):
+    """Извлечение ID из ответа создания объявления (объект, список или строка статуса)"""
+    if isinstance(response_data, list):
+        return extract_item_id(response_data[0]) if response_data else None
+    if not isinstance(response_data, dict):
+        return None
+    if response_data.get("id"):
+        return response_data["id"]
+    match = _STATUS_ID_PATTERN.search(str(response_data.get("status", "")))
+    return match.group(1) if match else None
+
+
+class CreateItemResult:
+    """Результат создания одного объявления в пакете"""
+
+    def __init__(self, index, payload, response=None, error=None):
+        self.index = index
+        self.payload = payload
+        self.response = response
+        self.error = error
+        self.item_id = None
+        if response is not None and response.status_code == 200:
+            try:
+                self.item_id = extract_item_id(response.json())
+            except ValueError:
+                self.item_id = None
+
+    @property
+    def ok(self):
+        return self.item_id is not None
+
+    def __repr__(self):
+        status = self.response.status_code if self.response is not None else self.error
+        return f"CreateItemResult(index={self.index}, item_id={self.item_id!r}, status={status!r})"
+
+
+STATISTICS_FIELDS = ("likes", "viewCount", "contacts")
+
+
+def extract_statistics(response):
+    """Статистика из ответа v1/v2 (список из одного объекта или объект) или None"""
+    if response is None or response.status_code != 200:
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    if isinstance(data, list):
+        data = data[0] if data else None
+    return data if isinstance(data, dict) else None
+
+
+class StatisticsDiff:
+    """Сравнение статистики одного объявления в API v1 и v2.
+
+    kind: consistent - данные совпадают, mismatch - различаются поля,
+    status_mismatch - разные коды ответа, not_found - обе версии вернули
+    одинаковую ошибку, error - запрос не выполнен.
+    """
+
+    def __init__(self, index, item_id, v1_response=None, v2_response=None, error=None):
+        self.index = index
+        self.item_id = item_id
+        self.error = error
+        self.v1_status = v1_response.status_code if v1_response is not None else None
+        self.v2_status = v2_response.status_code if v2_response is not None else None
+        self.v1 = extract_statistics(v1_response)
+        self.v2 = extract_statistics(v2_response)
+        # {поле: (значение v1, значение v2)} для различающихся полей
+        self.differences = {}
+        if self.v1 is not None and self.v2 is not None:
+            for field in STATISTICS_FIELDS:
+                if self.v1.get(field) != self.v2.get(field):
+                    self.differences[field] = (self.v1.get(field), self.v2.get(field))
+
+    @property
+    def kind(self):
+        if self.error is not None:
+            return "error"
+        if self.v1_status != self.v2_status:
+            return "status_mismatch"
+        if self.v1_status != 200:
+            return "not_found"
+        return "mismatch" if self.differences else "consistent"
+
+    @property
+    def consistent(self):
+        return self.kind in ("consistent", "not_found")
+
+    def to_dict(self):
+        return {
+            "item_id": self.item_id,
+            "kind": self.kind,
+            "v1_status": self.v1_status,
+            "v2_status": self.v2_status,
+            "v1": {field: self.v1.get(field) for field in STATISTICS_FIELDS} if self.v1 is not None else None,
+            "v2": {field: self.v2.get(field) for field in STATISTICS_FIELDS} if self.v2 is not None else None,
+            "differences": {field: list(values) for field, values in self.differences.items()},
+            "error": self.error,
+        }
+
+    def __repr__(self):
+        return f"StatisticsDiff(item_id={self.item_id!r}, kind={self.kind!r}, differences={self.differences!r})"
+
+
+class StatisticsReport:
+    """Итог сравнения статистики v1 и v2"""
 
-class ApiClient:
     def __init__(self):
-        self.base_url = "https://qa-internship.avito.com"
-        self.timeout = 10
+        self.total = 0
+        self.kinds = {}
+        self.field_mismatches = {field: 0 for field in STATISTICS_FIELDS}
+        self.duration = 0.0
+
+    def add(self, diff):
+        self.total += 1
+        self.kinds[diff.kind] = self.kinds.get(diff.kind, 0) + 1
+        for field in diff.differences:
+            self.field_mismatches[field] += 1
+
+    @property
+    def inconsistent(self):
+        return sum(count for kind, count in self.kinds.items() if kind not in ("consistent", "not_found"))
+
+    @property
+    def throughput(self):
+        """Объявлений в секунду (по два запроса на объявление)"""
+        return self.total / self.duration if self.duration > 0 else 0.0
+
+    def summary(self):
+        kinds = ", ".join(f"{kind}={count}" for kind, count in sorted(self.kinds.items())) or "-"
+        fields = ", ".join(f"{field}={count}" for field, count in self.field_mismatches.items())
+        return (f"items={self.total} inconsistent={self.inconsistent} ({kinds}); "
+                f"field mismatches: {fields}; {self.duration:.2f}s, {self.throughput:.1f} items/s")
+
+
+class ApiClient:
+    def __init__(self, base_url=None,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 pool_block=DEFAULT_POOL_BLOCK,
+                 session=None,
+                 retry_policy=None,
+                 circuit_breakers=None,
+                 timeouts=None,
+                 hooks=None):
+        self.base_url = (base_url or os.environ.get(BASE_URL_ENV) or DEFAULT_BASE_URL).rstrip("/")
+        # Таймаут чтения для эндпоинтов без профиля
+        self.timeout = DEFAULT_READ_TIMEOUT
+        # (connect, read) по эндпоинтам, см. timeouts.TIMEOUT_PROFILES
+        self.timeouts = dict(TIMEOUT_PROFILES if timeouts is None else timeouts)
+        # Все клиенты с одинаковыми параметрами пула используют одну сессию,
+        # поэтому ApiClient() в каждом setup_method не открывает новые соединения
+        self.session = session or get_shared_session(pool_connections, pool_maxsize, pool_block)
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.circuit_breakers = circuit_breakers or DEFAULT_CIRCUIT_BREAKERS
+        self.hooks = hooks if hooks is not None else DEFAULT_HOOKS
+
+    def get_timeout(self, endpoint):
+        """(connect, read) для эндпоинта"""
+        return self.timeouts.get(endpoint, (CONNECT_TIMEOUT, self.timeout))
 
-    def _make_request(self, method, url, **kwargs):
+    def _send(self, method, url, endpoint, breaker, timeout, deadline, **kwargs):
+        """Одна попытка запроса с учетом circuit breaker, дедлайна и хуков"""
+        if deadline is not None:
+            if deadline.expired:
+                raise DeadlineExceeded(f"Deadline exceeded: {url}")
+            # Попытка не может длиться дольше, чем осталось до дедлайна
+            timeout = deadline.clip(timeout)
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f"Circuit open: {method} {url}")
+        event = None
+        if self.hooks:
+            event = RequestEvent(endpoint, method, url, stream=kwargs.get("stream", False), json=kwargs.get("json"))
+            self.hooks.fire("pre_request", event)
         try:
-            response = requests.request(method, url, timeout=self.timeout, **kwargs)
-            return response
-        except requests.exceptions.Timeout:
-            raise Exception(f"Request timeout: {url}")
-        except requests.exceptions.ConnectionError:
-            raise Exception(f"Connection error: {url}")
+            response = self._request(method, url, breaker, timeout, deadline, **kwargs)
+        except Exception as e:
+            if event is not None:
+                event.finish(error=e)
+                self.hooks.fire("on_error", event)
+            raise
+        if event is not None:
+            event.finish(response=response)
+            self.hooks.fire("post_response", event)
+        return response
+
+    def _request(self, method, url, breaker, timeout, deadline, **kwargs):
+        try:
+            response = self.session.request(method, url, timeout=timeout, **kwargs)
+        except requests.exceptions.Timeout as e:
+            if deadline is not None and deadline.expired:
+                # Истек дедлайн вызывающего, а не таймаут эндпоинта: не ошибка эндпоинта
+                self._release(breaker)
+                raise DeadlineExceeded(f"Deadline exceeded: {url}") from e
+            self._record(breaker, False)
+            raise Exception(f"Request timeout: {url}") from e
+        except requests.exceptions.ConnectionError as e:
+            self._record(breaker, False)
+            raise Exception(f"Connection error: {url}") from e
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Request failed: {e}")
+            # Без исхода пробный запрос half-open цепи остался бы незавершенным навсегда
+            self._record(breaker, False)
+            raise Exception(f"Request failed: {e}") from e
+        self._record(breaker, response.status_code < 500)
+        return response
+
+    @staticmethod
+    def _record(breaker, success):
+        if breaker is not None:
+            breaker.record(success)
+
+    @staticmethod
+    def _release(breaker):
+        if breaker is not None:
+            breaker.release()
+
+    def _should_retry(self, response, error):
+        if error is not None:
+            return isinstance(error.__cause__, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+        return response.status_code in self.retry_policy.retry_statuses
+
+    def _make_request(self, method, url, endpoint=None, **kwargs):
+        """Запрос с повторами (только идемпотентные методы) и circuit breaker по эндпоинту"""
+        endpoint = endpoint or f"{method} {url}"
+        breaker = None
+        if self.circuit_breakers.enabled:
+            breaker = self.circuit_breakers.get(f"{self.base_url} {endpoint}")
+        timeout = self.get_timeout(endpoint)
+        deadline = current_deadline()
+        return self.retry_policy.call(
+            method,
+            lambda: self._send(method, url, endpoint, breaker, timeout, deadline, **kwargs),
+            self._should_retry,
+            deadline=deadline
+        )
 
     def create_item(self, item_data):
         url = f"{self.base_url}/api/1/item"
@@ -22,31 +353,137 @@ class ApiClient:
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
-        return self._make_request("POST", url, headers=headers, json=item_data)
+        return self._make_request("POST", url, endpoint="POST /api/1/item", headers=headers, json=item_data)
+
+    def create_items(self, items, max_workers=16):
+        """Создать объявления параллельно.
+
+        items читается лениво: в работе держится не больше 2 * max_workers
+        запросов. Возвращает список CreateItemResult в порядке входных данных;
+        ошибка отдельного объявления не прерывает пакет. Если в текущем
+        контексте задан дедлайн (timeouts.deadline_scope), после его истечения
+        оставшиеся объявления не отправляются и получают ошибку "Deadline exceeded".
+        """
+        deadline = current_deadline()
+
+        def create_one(index, payload):
+            try:
+                return CreateItemResult(index, payload, response=self.create_item(payload))
+            except Exception as e:
+                return CreateItemResult(index, payload, error=str(e))
+
+        def submit(index, payload):
+            if deadline is not None and deadline.expired:
+                future = Future()
+                future.set_result(CreateItemResult(index, payload, error="Deadline exceeded"))
+                return future
+            # Дедлайн хранится в contextvars и должен попасть в поток пула
+            return executor.submit(contextvars.copy_context().run, create_one, index, payload)
+
+        results = []
+        pending = set()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="create-items") as executor:
+            for index, payload in enumerate(items):
+                if len(pending) >= 2 * max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results.extend(future.result() for future in done)
+                pending.add(submit(index, payload))
+            results.extend(future.result() for future in pending)
+        results.sort(key=lambda result: result.index)
+        return results
+
+    def compare_statistics(self, item_ids, max_workers=16, report=None):
+        """Сравнить статистику API v1 и v2 для потока ID.
+
+        Запросы v1 и v2 для каждого ID выполняются параллельно, всего в работе
+        не больше 2 * max_workers запросов; item_ids читается лениво.
+        Генератор отдает StatisticsDiff по мере готовности (не в порядке
+        входных данных); итог накапливается в report (StatisticsReport).
+        """
+        report = report if report is not None else StatisticsReport()
+        endpoints = (self.get_statistics, self.get_statistics_v2)
+        started = time.perf_counter()
+
+        def fetch(get, item_id):
+            try:
+                return get(item_id), None
+            except Exception as e:
+                return None, str(e)
+
+        # index -> [ответ v1, ответ v2, ошибка, сколько запросов еще не завершено]
+        states = {}
+        pending = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="compare-statistics") as executor:
+            def collect(done):
+                for future in done:
+                    index, item_id, version = pending.pop(future)
+                    response, error = future.result()
+                    state = states[index]
+                    state[version] = response
+                    state[2] = state[2] or error
+                    state[3] -= 1
+                    if state[3] == 0:
+                        del states[index]
+                        diff = StatisticsDiff(index, item_id, state[0], state[1], error=state[2])
+                        report.add(diff)
+                        yield diff
+
+            try:
+                for index, item_id in enumerate(item_ids):
+                    while len(pending) >= 2 * max_workers:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        yield from collect(done)
+                    states[index] = [None, None, None, len(endpoints)]
+                    for version, get in enumerate(endpoints):
+                        # Копия контекста переносит дедлайн в поток пула
+                        future = executor.submit(contextvars.copy_context().run, fetch, get, item_id)
+                        pending[future] = (index, item_id, version)
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from collect(done)
+            finally:
+                for future in pending:
+                    future.cancel()
+                report.duration = time.perf_counter() - started
 
     def get_item(self, item_id):
         url = f"{self.base_url}/api/1/item/{item_id}"
         headers = {"Accept": "application/json"}
-        return self._make_request("GET", url, headers=headers)
+        return self._make_request("GET", url, endpoint="GET /api/1/item/:id", headers=headers)
 
-    def get_seller_items(self, seller_id):
+    def get_seller_items(self, seller_id, stream=False):
         url = f"{self.base_url}/api/1/{seller_id}/item"
         headers = {"Accept": "application/json"}
-        return self._make_request("GET", url, headers=headers)
+        return self._make_request("GET", url, endpoint="GET /api/1/:sellerID/item", headers=headers, stream=stream)
+
+    def iter_seller_items(self, seller_id, chunk_size=STREAM_CHUNK_SIZE):
+        """Объявления продавца по одному, по мере получения тела ответа"""
+        response = self.get_seller_items(seller_id, stream=True)
+        with response:
+            if response.status_code != 200:
+                raise Exception(f"Unexpected status {response.status_code}: {response.url}")
+            deadline = current_deadline()
+            try:
+                for item in iter_json_array(response.iter_content(chunk_size)):
+                    if deadline is not None and deadline.expired:
+                        raise DeadlineExceeded(f"Deadline exceeded: {response.url}")
+                    yield item
+            except requests.exceptions.RequestException as e:
+                raise Exception(f"Request failed: {e}") from e
 
     def get_statistics(self, item_id):
         """Получить статистику через API v1"""
         url = f"{self.base_url}/api/1/statistic/{item_id}"
         headers = {"Accept": "application/json"}
-        return self._make_request("GET", url, headers=headers)
+        return self._make_request("GET", url, endpoint="GET /api/1/statistic/:id", headers=headers)
 
     def get_statistics_v2(self, item_id):
         """Получить статистику через API v2"""
         url = f"{self.base_url}/api/2/statistic/{item_id}"
         headers = {"Accept": "application/json"}
-        return self._make_request("GET", url, headers=headers)
+        return self._make_request("GET", url, endpoint="GET /api/2/statistic/:id", headers=headers)
 
     def delete_item(self, item_id):
         url = f"{self.base_url}/api/2/item/{item_id}"
         headers = {"Accept": "application/json"}
-        return self._make_request("DELETE", url, headers=headers)
\ No newline at end of file
+        return self._make_request("DELETE", url, endpoint="DELETE /api/2/item/:id", headers=headers)
\ No newline at end of file
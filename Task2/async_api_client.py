@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from api_client import ApiClient, DEFAULT_POOL_MAXSIZE
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class AsyncApiClient:
+    """Асинхронный интерфейс к ApiClient с теми же методами.
+
+    Это адаптер, а не нативный asyncio-клиент: каждый запрос выполняется
+    блокирующим ApiClient (общий пул соединений requests, те же повторы,
+    circuit breaker'ы и исключения при Timeout/ConnectionError) в отдельном
+    пуле потоков через run_in_executor. Параллельность ограничена числом
+    потоков, равным max_concurrency, а семафор не дает корутинам ставить в
+    очередь пула больше запросов, чем выполняется одновременно.
+    """
+
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, api_client=None, base_url=None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.max_concurrency = max_concurrency
+        self.api_client = api_client or ApiClient(
+            base_url=base_url,
+            pool_maxsize=max(DEFAULT_POOL_MAXSIZE, max_concurrency)
+        )
+        self._semaphore = None
+        self._executor = None
+
+    @property
+    def base_url(self):
+        return self.api_client.base_url
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """Остановить пул потоков (соединения общего пула остаются открытыми)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _call(self, method, *args):
+        # Семафор создается лениво, чтобы привязаться к текущему event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="async-api-client"
+            )
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            # Копия контекста переносит дедлайн (timeouts.deadline_scope) в поток пула
+            context = contextvars.copy_context()
+            return await loop.run_in_executor(self._executor, context.run, method, *args)
+
+    async def create_item(self, item_data):
+        return await self._call(self.api_client.create_item, item_data)
+
+    async def get_item(self, item_id):
+        return await self._call(self.api_client.get_item, item_id)
+
+    async def get_seller_items(self, seller_id):
+        return await self._call(self.api_client.get_seller_items, seller_id)
+
+    async def get_statistics(self, item_id):
+        """Получить статистику через API v1"""
+        return await self._call(self.api_client.get_statistics, item_id)
+
+    async def get_statistics_v2(self, item_id):
+        """Получить статистику через API v2"""
+        return await self._call(self.api_client.get_statistics_v2, item_id)
+
+    async def delete_item(self, item_id):
+        return await self._call(self.api_client.delete_item, item_id)
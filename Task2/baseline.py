@@ -0,0 +1,396 @@
+"""Хранилище базовых замеров задержек и проверка регрессий.
+
+Каждый прогон тестов производительности (гистограммы LatencyRecorder по
+эндпоинтам) сохраняется в SQLite вместе с метаданными: коммит, ветка и
+наличие незакоммиченных изменений, версия Python, платформа, хост, число CPU
+и стенд (target). Базой для сравнения служат последние N прогонов на том же
+стенде и хосте, не помеченные как регрессия: их гистограммы объединяются.
+На CI, где хост каждый раз новый, хост не учитывается (any_host). Принятое
+намеренное замедление снимает пометку с прогона (accept), и он становится
+базой для следующих.
+
+Текущий прогон сравнивается с базой по каждому эндпоинту односторонним
+U-критерием Манна-Уитни (нормальная аппроксимация с поправкой на связи;
+значения гистограммы - середины бакетов, поэтому одинаковые бакеты - это
+связи). Регрессия - значимый сдвиг вверх (p < alpha), при котором медиана
+выросла не меньше чем на min_change и не меньше чем на min_delta_ms: шум
+в доли миллисекунды на быстром стенде сборку не ломает.
+
+Запуск:
+    pytest -k response_time --baseline-db=baselines.sqlite
+    pytest -k response_time --baseline-db=baselines.sqlite --baseline-any-host
+    python baseline.py baselines.sqlite runs
+    python baseline.py baselines.sqlite compare 12 --runs 5
+    python baseline.py baselines.sqlite accept 12
+    python baseline.py baselines.sqlite import latency_reports/*.json --target https://example.com
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+from latency_recorder import LatencyHistogram, bucket_bounds
+
+DEFAULT_BASELINE_RUNS = 5
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_CHANGE = 0.1
+DEFAULT_MIN_DELTA_MS = 1.0
+# Меньше замеров с любой стороны - сравнение не проводится
+MIN_SAMPLES = 10
+
+REGRESSION = "регрессия"
+IMPROVEMENT = "быстрее"
+UNCHANGED = "ok"
+NO_BASELINE = "нет базы"
+TOO_FEW = "мало замеров"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    target TEXT NOT NULL,
+    git_commit TEXT,
+    git_branch TEXT,
+    git_dirty INTEGER,
+    python TEXT,
+    platform TEXT,
+    hostname TEXT,
+    cpu_count INTEGER,
+    label TEXT,
+    regressed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS histograms (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    endpoint TEXT NOT NULL,
+    histogram TEXT NOT NULL,
+    PRIMARY KEY (run_id, endpoint)
+);
+CREATE INDEX IF NOT EXISTS runs_by_target ON runs (target, hostname, id);
+"""
+RUN_FIELDS = ("created_at", "target", "git_commit", "git_branch", "git_dirty", "python", "platform",
+              "hostname", "cpu_count", "label")
+
+
+def _git(*args):
+    try:
+        result = subprocess.run(["git", *args], capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def environment_metadata(target, label=None):
+    """Метаданные прогона: коммит, окружение и стенд"""
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "created_at": time.time(),
+        "target": target,
+        "git_commit": _git("rev-parse", "HEAD"),
+        "git_branch": _git("rev-parse", "--abbrev-ref", "HEAD"),
+        "git_dirty": None if status is None else int(bool(status)),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "hostname": socket.gethostname(),
+        "cpu_count": os.cpu_count(),
+        "label": label,
+    }
+
+
+class BaselineStore:
+    def __init__(self, path):
+        self.path = str(path)
+        self._db = sqlite3.connect(self.path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def save_run(self, histograms, metadata, regressed=False):
+        """Сохранить гистограммы {эндпоинт: LatencyHistogram}; вернуть ID прогона"""
+        with self._db:
+            cursor = self._db.execute(
+                f"INSERT INTO runs ({', '.join(RUN_FIELDS)}, regressed) VALUES ({', '.join('?' * len(RUN_FIELDS))}, ?)",
+                [metadata.get(field) for field in RUN_FIELDS] + [int(regressed)])
+            run_id = cursor.lastrowid
+            self._db.executemany(
+                "INSERT INTO histograms (run_id, endpoint, histogram) VALUES (?, ?, ?)",
+                [(run_id, endpoint, json.dumps(histogram.to_dict()))
+                 for endpoint, histogram in sorted(histograms.items())])
+        return run_id
+
+    def mark_regressed(self, run_id, regressed=True):
+        with self._db:
+            self._db.execute("UPDATE runs SET regressed = ? WHERE id = ?", (int(regressed), run_id))
+
+    def run(self, run_id):
+        row = self._db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Run {run_id} not found in {self.path}")
+        return dict(row)
+
+    def runs(self, target=None, limit=20):
+        """Последние прогоны (новые первыми)"""
+        query, params = "SELECT * FROM runs", []
+        if target is not None:
+            query, params = query + " WHERE target = ?", [target]
+        rows = self._db.execute(query + " ORDER BY id DESC LIMIT ?", params + [limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def histograms(self, run_id):
+        rows = self._db.execute("SELECT endpoint, histogram FROM histograms WHERE run_id = ?", (run_id,))
+        return {row["endpoint"]: LatencyHistogram.from_dict(json.loads(row["histogram"])) for row in rows}
+
+    def baseline(self, target, hostname=None, runs=DEFAULT_BASELINE_RUNS, before=None):
+        """Объединенные гистограммы последних runs прогонов без регрессий
+        на том же стенде (и хосте); before - учитывать только прогоны раньше
+        этого ID. Возвращает ({эндпоинт: LatencyHistogram}, [ID прогонов])."""
+        query, params = "SELECT id FROM runs WHERE target = ? AND regressed = 0", [target]
+        if hostname is not None:
+            query, params = query + " AND hostname = ?", params + [hostname]
+        if before is not None:
+            query, params = query + " AND id < ?", params + [before]
+        run_ids = [row["id"] for row in self._db.execute(query + " ORDER BY id DESC LIMIT ?", params + [runs])]
+        merged = {}
+        for run_id in run_ids:
+            for endpoint, histogram in self.histograms(run_id).items():
+                merged.setdefault(endpoint, LatencyHistogram()).merge(histogram)
+        return merged, run_ids
+
+
+def histogram_counts(histogram):
+    """{значение в нс: количество} - середины бакетов гистограммы"""
+    counts = {}
+    for index, count in histogram.buckets.items():
+        lower, upper = bucket_bounds(index)
+        counts[(lower + upper - 1) // 2] = count
+    return counts
+
+
+def _counts(values):
+    if isinstance(values, dict):
+        return values
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def mann_whitney_u(x, y):
+    """U-критерий Манна-Уитни: (U для x, p-value гипотезы "x больше y").
+
+    x, y - последовательности значений или {значение: количество}.
+    Нормальная аппроксимация с поправкой на связи и на непрерывность.
+    """
+    x, y = _counts(x), _counts(y)
+    n1, n2 = sum(x.values()), sum(y.values())
+    if not n1 or not n2:
+        raise ValueError("Both samples must be non-empty")
+    n = n1 + n2
+    rank_sum = 0.0
+    ties = 0
+    rank = 0
+    for value in sorted(set(x) | set(y)):
+        in_x, in_y = x.get(value, 0), y.get(value, 0)
+        tied = in_x + in_y
+        # Средний ранг группы одинаковых значений
+        rank_sum += in_x * (rank + (tied + 1) / 2)
+        ties += tied ** 3 - tied
+        rank += tied
+    u = rank_sum - n1 * (n1 + 1) / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0
+    if variance <= 0:
+        return u, 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+class EndpointComparison:
+    def __init__(self, endpoint, baseline, current, alpha=DEFAULT_ALPHA, min_change=DEFAULT_MIN_CHANGE,
+                 min_delta_ms=DEFAULT_MIN_DELTA_MS):
+        self.endpoint = endpoint
+        self.baseline = baseline
+        self.current = current
+        self.p_slower = self.p_faster = None
+        if baseline is None or not baseline.count:
+            self.status = NO_BASELINE
+            return
+        if baseline.count < MIN_SAMPLES or current.count < MIN_SAMPLES:
+            self.status = TOO_FEW
+            return
+        baseline_counts, current_counts = histogram_counts(baseline), histogram_counts(current)
+        _, self.p_slower = mann_whitney_u(current_counts, baseline_counts)
+        _, self.p_faster = mann_whitney_u(baseline_counts, current_counts)
+        delta = self.delta_ms
+        if self.p_slower < alpha and self.change >= min_change and delta >= min_delta_ms:
+            self.status = REGRESSION
+        elif self.p_faster < alpha and -self.change >= min_change and -delta >= min_delta_ms:
+            self.status = IMPROVEMENT
+        else:
+            self.status = UNCHANGED
+
+    @property
+    def delta_ms(self):
+        return self.current.percentile_ms(50) - self.baseline.percentile_ms(50)
+
+    @property
+    def change(self):
+        """Относительное изменение медианы"""
+        base = self.baseline.percentile_ms(50)
+        return self.delta_ms / base if base else 0.0
+
+    @property
+    def regressed(self):
+        return self.status == REGRESSION
+
+    def row(self):
+        if self.baseline is None or not self.baseline.count:
+            base = ["-", "-", "-"]
+            change, p_value = "-", "-"
+        else:
+            base = [str(self.baseline.count), f"{self.baseline.percentile_ms(50):.2f}",
+                    f"{self.baseline.percentile_ms(95):.2f}"]
+            change = f"{self.change:+.1%}"
+            p_value = "-" if self.p_slower is None else f"{min(self.p_slower, self.p_faster):.2g}"
+        current = [str(self.current.count), f"{self.current.percentile_ms(50):.2f}",
+                   f"{self.current.percentile_ms(95):.2f}"]
+        return [self.endpoint, *base, *current, change, p_value, self.status]
+
+    def to_dict(self):
+        return {
+            "endpoint": self.endpoint,
+            "status": self.status,
+            "baseline_count": self.baseline.count if self.baseline else 0,
+            "baseline_p50_ms": self.baseline.percentile_ms(50) if self.baseline else None,
+            "current_count": self.current.count,
+            "current_p50_ms": self.current.percentile_ms(50),
+            "p_slower": self.p_slower,
+            "p_faster": self.p_faster,
+        }
+
+
+class BaselineComparison:
+    HEADER = ["Эндпоинт", "база n", "база p50", "база p95", "n", "p50", "p95", "Δp50", "p", "статус"]
+
+    def __init__(self, comparisons, baseline_runs):
+        self.comparisons = comparisons
+        self.baseline_runs = baseline_runs
+
+    @property
+    def regressions(self):
+        return [comparison for comparison in self.comparisons if comparison.regressed]
+
+    @property
+    def ok(self):
+        return not self.regressions
+
+    def table(self):
+        """Таблица сравнения по эндпоинтам (мс)"""
+        rows = [self.HEADER] + [comparison.row() for comparison in self.comparisons]
+        widths = [max(len(row[column]) for row in rows) for column in range(len(self.HEADER))]
+        lines = [f"Сравнение с базой (прогоны {', '.join(map(str, self.baseline_runs)) or 'нет'}):"]
+        for row in rows:
+            lines.append("  ".join(cell.ljust(width) if column == 0 else cell.rjust(width)
+                                   for column, (cell, width) in enumerate(zip(row, widths))).rstrip())
+        if self.regressions:
+            lines.append(f"Регрессии: {', '.join(comparison.endpoint for comparison in self.regressions)}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {"baseline_runs": self.baseline_runs,
+                "endpoints": [comparison.to_dict() for comparison in self.comparisons]}
+
+
+def compare(current, baseline, baseline_runs=(), alpha=DEFAULT_ALPHA, min_change=DEFAULT_MIN_CHANGE,
+            min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """Сравнить гистограммы {эндпоинт: LatencyHistogram} текущего прогона с базой"""
+    comparisons = [EndpointComparison(endpoint, baseline.get(endpoint), histogram, alpha, min_change, min_delta_ms)
+                   for endpoint, histogram in sorted(current.items())]
+    return BaselineComparison(comparisons, list(baseline_runs))
+
+
+def check_run(store, histograms, metadata, runs=DEFAULT_BASELINE_RUNS, alpha=DEFAULT_ALPHA,
+              min_change=DEFAULT_MIN_CHANGE, min_delta_ms=DEFAULT_MIN_DELTA_MS, any_host=False):
+    """Сравнить прогон с базой и сохранить его (с пометкой о регрессии).
+
+    Прогоны с регрессией в базу следующих сравнений не входят, пока их не
+    примут (store.mark_regressed(run_id, False)). any_host=True - база из
+    прогонов на любом хосте. Возвращает (ID прогона, BaselineComparison).
+    """
+    hostname = None if any_host else metadata.get("hostname")
+    baseline, run_ids = store.baseline(metadata["target"], hostname, runs)
+    comparison = compare(histograms, baseline, run_ids, alpha, min_change, min_delta_ms)
+    run_id = store.save_run(histograms, metadata, regressed=not comparison.ok)
+    return run_id, comparison
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("db", help="Файл SQLite с базовыми замерами")
+    commands = parser.add_subparsers(dest="command", required=True)
+    runs_parser = commands.add_parser("runs", help="Последние прогоны")
+    runs_parser.add_argument("--target", default=None, help="Только прогоны на этом стенде")
+    runs_parser.add_argument("--limit", type=int, default=20)
+    compare_parser = commands.add_parser("compare", help="Сравнить сохраненный прогон с базой перед ним")
+    compare_parser.add_argument("run_id", type=int)
+    compare_parser.add_argument("--runs", type=int, default=DEFAULT_BASELINE_RUNS, help="Прогонов в базе")
+    compare_parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    compare_parser.add_argument("--min-change", type=float, default=DEFAULT_MIN_CHANGE)
+    compare_parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS)
+    compare_parser.add_argument("--any-host", action="store_true", help="База из прогонов на любом хосте")
+    accept_parser = commands.add_parser("accept", help="Принять замедление: прогон снова входит в базу")
+    accept_parser.add_argument("run_id", type=int)
+    import_parser = commands.add_parser("import", help="Сохранить отчеты latency_reports/*.json как прогоны")
+    import_parser.add_argument("files", nargs="+")
+    import_parser.add_argument("--target", required=True, help="Стенд, на котором сняты отчеты")
+    args = parser.parse_args(argv)
+
+    with BaselineStore(args.db) as store:
+        if args.command == "runs":
+            for run in store.runs(args.target, args.limit):
+                commit = (run["git_commit"] or "-")[:10] + ("+" if run["git_dirty"] else "")
+                created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(run["created_at"]))
+                mark = " регрессия" if run["regressed"] else ""
+                print(f"{run['id']:>5}  {created}  {commit:<11}  {run['target']}  {run['hostname']}{mark}")
+            return 0
+        if args.command == "import":
+            for path in args.files:
+                with open(path, encoding="utf-8") as f:
+                    report = json.load(f)
+                metadata = environment_metadata(args.target, label=os.path.basename(path))
+                metadata["created_at"] = report.get("created_at", metadata["created_at"])
+                # Коммит, на котором снят отчет, неизвестен
+                metadata.update(git_commit=None, git_branch=None, git_dirty=None)
+                histograms = {endpoint: LatencyHistogram.from_dict(data)
+                              for endpoint, data in report["endpoints"].items()}
+                print(f"{path}: run {store.save_run(histograms, metadata)}")
+            return 0
+        run = store.run(args.run_id)
+        if args.command == "accept":
+            store.mark_regressed(args.run_id, False)
+            print(f"run {args.run_id} accepted as baseline for {run['target']}")
+            return 0
+        hostname = None if args.any_host else run["hostname"]
+        baseline, run_ids = store.baseline(run["target"], hostname, args.runs, before=args.run_id)
+        comparison = compare(store.histograms(args.run_id), baseline, run_ids, args.alpha, args.min_change,
+                             args.min_delta_ms)
+        print(comparison.table())
+        return 0 if comparison.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
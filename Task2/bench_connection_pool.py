@@ -0,0 +1,59 @@
+"""Бенчмарк: задержка одного запроса без пула соединений и с общим keep-alive пулом ApiClient.
+
+Запуск:
+    python bench_connection_pool.py --requests 200
+    python bench_connection_pool.py --base-url http://127.0.0.1:8080
+"""
+import argparse
+import statistics
+import time
+
+import requests
+
+from api_client import ApiClient
+from load_driver import percentile
+
+BENCH_ITEM_ID = "nonexistent_bench_id"
+
+
+def measure(make_call, count):
+    """Задержки count последовательных вызовов в миллисекундах, по возрастанию"""
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        make_call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)
+
+
+def report(title, samples):
+    print(f"{title:<22} mean={statistics.mean(samples):8.2f} ms  "
+          f"p50={percentile(samples, 50):8.2f} ms  "
+          f"p95={percentile(samples, 95):8.2f} ms  "
+          f"p99={percentile(samples, 99):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100, help="Количество запросов в каждом режиме")
+    parser.add_argument("--base-url", default=None, help="Базовый URL сервиса (по умолчанию API_BASE_URL или боевой стенд)")
+    args = parser.parse_args()
+
+    client = ApiClient(base_url=args.base_url)
+    url = f"{client.base_url}/api/1/item/{BENCH_ITEM_ID}"
+    headers = {"Accept": "application/json"}
+
+    # Без пула: каждый вызов открывает новое TCP/TLS соединение
+    before = measure(lambda: requests.request("GET", url, headers=headers, timeout=client.timeout), args.requests)
+    # С пулом: соединение переиспользуется между вызовами
+    client.get_item(BENCH_ITEM_ID)
+    after = measure(lambda: client.get_item(BENCH_ITEM_ID), args.requests)
+
+    print(f"GET {url}, {args.requests} запросов в каждом режиме")
+    report("requests.request", before)
+    report("ApiClient (пул)", after)
+    print(f"Ускорение по медиане: x{percentile(before, 50) / percentile(after, 50):.2f}")
+
+
+if __name__ == "__main__":
+    main()
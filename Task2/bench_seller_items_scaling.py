@@ -0,0 +1,179 @@
+"""Бенчмарк масштабирования GET /api/1/:sellerID/item по размеру каталога продавца.
+
+Для каждого размера создается продавец с N объявлениями, затем измеряются
+задержка запроса, размер ответа и время декодирования JSON. По результатам
+подбирается степенная зависимость y = a * N^b; показатель b > 1 означает
+сверхлинейный рост. При указании --baseline показатели сравниваются с
+предыдущим прогоном, и код возврата 1 сигнализирует о регрессии. Созданные
+объявления удаляются в конце (в том числе при ошибке), если не указан
+--keep-items.
+
+Запуск:
+    python bench_seller_items_scaling.py --fake-server
+    python bench_seller_items_scaling.py --sizes 10,100,1000 --output scaling.json --baseline previous.json
+"""
+import argparse
+import json
+import math
+import sys
+import time
+
+from api_client import DEFAULT_HOOKS, ApiClient
+from cleanup import CreatedItemRegistry
+from fake_server import FakeAdsServer
+from latency_recorder import LatencyHistogram
+from test_data import generate_seller_id, get_multiple_items_data
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+# Допустимое превышение показателя степени над линейным ростом и над прошлым прогоном
+DEFAULT_TOLERANCE = 0.15
+METRICS = ["latency_p50_ms", "bytes", "decode_p50_ms"]
+
+
+def fit_power_law(xs, ys):
+    """Подбор y = a * x^b методом наименьших квадратов в лог-лог масштабе: (a, b, r2)"""
+    points = [(math.log(x), math.log(y)) for x, y in zip(xs, ys) if x > 0 and y > 0]
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    if sxx == 0:
+        return None
+    b = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx
+    log_a = mean_y - b * mean_x
+    ss_total = sum((y - mean_y) ** 2 for _, y in points)
+    ss_residual = sum((y - (log_a + b * x)) ** 2 for x, y in points)
+    r2 = 1 - ss_residual / ss_total if ss_total else 1.0
+    return math.exp(log_a), b, r2
+
+
+def seed_seller(api_client, size, max_workers):
+    """Создать продавца с size объявлениями"""
+    seller_id = generate_seller_id()
+    results = api_client.create_items(
+        (get_multiple_items_data(seller_id, i + 1) for i in range(size)),
+        max_workers=max_workers
+    )
+    failed = [result for result in results if not result.ok]
+    if failed:
+        raise RuntimeError(f"Failed to seed seller {seller_id}: {len(failed)} of {size} items, first: {failed[0]}")
+    return seller_id
+
+
+def measure_size(api_client, seller_id, iterations, warmup):
+    """Задержка, размер ответа и время декодирования JSON для одного продавца"""
+    latency = LatencyHistogram()
+    decode = LatencyHistogram()
+    response_bytes = 0
+    for attempt in range(warmup + iterations):
+        start = time.perf_counter_ns()
+        response = api_client.get_seller_items(seller_id)
+        body = response.content
+        elapsed = time.perf_counter_ns() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"GET seller {seller_id} returned {response.status_code}")
+        decode_start = time.perf_counter_ns()
+        items = json.loads(body)
+        decode_elapsed = time.perf_counter_ns() - decode_start
+        if attempt >= warmup:
+            latency.record(elapsed)
+            decode.record(decode_elapsed)
+            response_bytes = len(body)
+    return {
+        "items": len(items),
+        "bytes": response_bytes,
+        "latency_p50_ms": latency.percentile_ms(50),
+        "latency_p95_ms": latency.percentile_ms(95),
+        "decode_p50_ms": decode.percentile_ms(50),
+        "decode_p95_ms": decode.percentile_ms(95),
+    }
+
+
+def fit_metrics(rows):
+    fits = {}
+    for metric in METRICS:
+        fit = fit_power_law([row["size"] for row in rows], [row[metric] for row in rows])
+        if fit is not None:
+            a, b, r2 = fit
+            fits[metric] = {"a": a, "exponent": b, "r2": r2}
+    return fits
+
+
+def find_regressions(fits, baseline_fits, tolerance):
+    """Сверхлинейный рост и рост показателя степени относительно прошлого прогона"""
+    problems = []
+    for metric, fit in fits.items():
+        if fit["exponent"] > 1 + tolerance:
+            problems.append(f"{metric}: super-linear growth, exponent {fit['exponent']:.2f}")
+        previous = (baseline_fits or {}).get(metric)
+        if previous and fit["exponent"] > previous["exponent"] + tolerance:
+            problems.append(f"{metric}: exponent grew from {previous['exponent']:.2f} to {fit['exponent']:.2f}")
+    return problems
+
+
+def run(api_client, sizes, iterations, warmup, max_workers):
+    rows = []
+    for size in sizes:
+        seller_id = seed_seller(api_client, size, max_workers)
+        row = {"size": size, "seller_id": seller_id}
+        row.update(measure_size(api_client, seller_id, iterations, warmup))
+        rows.append(row)
+        print(f"N={size:>6}  items={row['items']:>6}  bytes={row['bytes']:>9}  "
+              f"latency p50={row['latency_p50_ms']:8.2f} ms  p95={row['latency_p95_ms']:8.2f} ms  "
+              f"decode p50={row['decode_p50_ms']:7.2f} ms")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Размеры каталога продавца через запятую")
+    parser.add_argument("--iterations", type=int, default=10, help="Замеров на каждый размер")
+    parser.add_argument("--warmup", type=int, default=2, help="Прогревочных запросов на каждый размер")
+    parser.add_argument("--workers", type=int, default=16, help="Параллельность создания объявлений")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Допустимое превышение показателя степени")
+    parser.add_argument("--base-url", default=None, help="Базовый URL сервиса")
+    parser.add_argument("--fake-server", action="store_true", help="Запустить локальный fake_server.py")
+    parser.add_argument("--keep-items", action="store_true", help="Не удалять созданные объявления")
+    parser.add_argument("--output", default=None, help="Сохранить результаты в JSON")
+    parser.add_argument("--baseline", default=None, help="JSON с результатами предыдущего прогона")
+    args = parser.parse_args()
+
+    sizes = sorted(int(size) for size in args.sizes.split(","))
+    server = FakeAdsServer().start() if args.fake_server else None
+    api_client = ApiClient(base_url=server.url if server else args.base_url,
+                           pool_maxsize=max(args.workers, 1))
+    registry = None if args.keep_items else CreatedItemRegistry(api_client.base_url).attach(DEFAULT_HOOKS)
+    try:
+        rows = run(api_client, sizes, args.iterations, args.warmup, args.workers)
+    finally:
+        if registry is not None:
+            registry.detach()
+            print(registry.cleanup(api_client, workers=args.workers).summary())
+        if server is not None:
+            server.stop()
+
+    fits = fit_metrics(rows)
+    for metric, fit in fits.items():
+        print(f"{metric:<16} ~ {fit['a']:.4g} * N^{fit['exponent']:.2f}  (r2={fit['r2']:.3f})")
+
+    baseline_fits = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline_fits = json.load(f).get("fits")
+    problems = find_regressions(fits, baseline_fits, args.tolerance)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "sizes": rows, "fits": fits}, f, indent=2)
+
+    for problem in problems:
+        print(f"REGRESSION: {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
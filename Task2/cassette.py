@@ -0,0 +1,257 @@
+"""Кассета записанных ответов для запуска тестов без сети.
+
+Кассета - два файла:
+- <path>.dat - записи ответов (JSON), только дописываются;
+- <path>.idx - отсортированный индекс записей фиксированной длины
+  (sha256 ключа запроса, порядковый номер, смещение, длина).
+Оба файла открываются через mmap при первом запросе, поиск - бинарный по
+индексу, поэтому запуск не зависит от размера кассеты.
+
+Ключ запроса - sha256 от метода, пути с query и тела (JSON с отсортированными
+ключами, к которому применены body_filters - пары (regex, замена) для
+изменчивых частей, не влияющих на ответ). Одинаковые запросы различаются
+порядковым номером: n-й такой запрос получает n-й записанный ответ, а если
+записанных меньше - последний.
+
+Режимы:
+- none - только воспроизведение, отсутствующий запрос - ошибка CassetteMiss;
+- new - воспроизведение, отсутствующие запросы отправляются и дописываются;
+- all - все запросы отправляются, кассета записывается заново.
+"""
+import base64
+import datetime
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from bisect import bisect_left
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+MODES = ("none", "new", "all")
+INDEX_MAGIC = b"CASSIDX1"
+INDEX_HEADER = struct.Struct(">8sQ")
+INDEX_ENTRY = struct.Struct(">32sIQI")
+# Заголовки, которые не соответствуют сохраненному (уже распакованному) телу
+_DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+
+class CassetteMiss(requests.exceptions.RequestException):
+    """Запроса нет в кассете, а запись отключена"""
+
+
+class Cassette:
+    def __init__(self, path, mode="none", body_filters=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = str(path)
+        self.mode = mode
+        self.body_filters = body_filters or []
+        self.index_path = self.path + ".idx"
+        self.data_path = self.path + ".dat"
+        self.counters = {"played": 0, "recorded": 0, "missed": 0}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._index = None
+        self._data = None
+        self._count = 0
+        self._keys = []
+        self._played = {}
+        self._recorded = {}
+        self._new_entries = []
+        self._writer = None
+
+    def request_key(self, method, url, body):
+        parts = urlsplit(url)
+        target = parts.path + (f"?{parts.query}" if parts.query else "")
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", errors="surrogateescape")
+        body = body or ""
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False)
+        except ValueError:
+            pass
+        for pattern, replacement in self.body_filters:
+            body = pattern.sub(replacement, body)
+        digest = hashlib.sha256(f"{method.upper()} {target}\n".encode("utf-8"))
+        digest.update(body.encode("utf-8", errors="surrogateescape"))
+        return digest.digest()
+
+    def _load(self):
+        # Вызывается под self._lock
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.mode == "all":
+            for path in (self.index_path, self.data_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        elif os.path.exists(self.index_path) and os.path.getsize(self.index_path) > INDEX_HEADER.size:
+            with open(self.index_path, "rb") as f:
+                self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._count = INDEX_HEADER.unpack_from(self._index, 0)
+            if magic != INDEX_MAGIC:
+                raise ValueError(f"Not a cassette index: {self.index_path}")
+            with open(self.data_path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._keys = _IndexKeys(self._index, self._count)
+        elif self.mode == "none":
+            raise FileNotFoundError(f"Cassette not found: {self.index_path}")
+
+    def _entry(self, position):
+        return INDEX_ENTRY.unpack_from(self._index, INDEX_HEADER.size + position * INDEX_ENTRY.size)
+
+    def play(self, key):
+        """Записанный ответ для очередного запроса с ключом key или None"""
+        with self._lock:
+            self._load()
+            ordinal = self._played.get(key, 0)
+            self._played[key] = ordinal + 1
+            if not self._count:
+                return None
+            position = bisect_left(self._keys, (key, ordinal))
+            if position == self._count or self._entry(position)[:2] != (key, ordinal):
+                # Запросов больше, чем записано: повторяем последний ответ
+                position -= 1
+                if position < 0 or self._entry(position)[0] != key:
+                    return None
+            _, _, offset, length = self._entry(position)
+            self.counters["played"] += 1
+            return json.loads(self._data[offset:offset + length])
+
+    def record(self, key, record):
+        with self._lock:
+            self._load()
+            if self._writer is None:
+                directory = os.path.dirname(self.data_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._writer = open(self.data_path, "ab")
+            ordinal = self._recorded.get(key, 0)
+            self._recorded[key] = ordinal + 1
+            data = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            offset = self._writer.seek(0, os.SEEK_END)
+            self._writer.write(data)
+            self._new_entries.append((key, ordinal, offset, len(data)))
+            self.counters["recorded"] += 1
+
+    def miss(self):
+        with self._lock:
+            self.counters["missed"] += 1
+
+    def save(self):
+        """Записать индекс с новыми записями и закрыть файлы"""
+        with self._lock:
+            entries = []
+            if self._new_entries:
+                if self._index is not None:
+                    entries = [self._entry(position) for position in range(self._count)]
+                entries.extend(self._new_entries)
+                entries.sort()
+            self._close()
+            if not entries:
+                return
+            temporary = self.index_path + ".tmp"
+            with open(temporary, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, len(entries)))
+                for entry in entries:
+                    f.write(INDEX_ENTRY.pack(*entry))
+            os.replace(temporary, self.index_path)
+            self._new_entries = []
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for mapped in (self._index, self._data):
+            if mapped is not None:
+                mapped.close()
+        self._index = self._data = None
+        self._keys = []
+        self._count = 0
+        self._loaded = False
+
+
+class _IndexKeys:
+    """Последовательность (key, ordinal) поверх mmap индекса для bisect"""
+
+    def __init__(self, index, count):
+        self.index = index
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        return INDEX_ENTRY.unpack_from(self.index, INDEX_HEADER.size + position * INDEX_ENTRY.size)[:2]
+
+
+def response_to_record(response):
+    record = {
+        "status": response.status_code,
+        "reason": response.reason,
+        "headers": {name: value for name, value in response.headers.items()
+                    if name.lower() not in _DROPPED_HEADERS},
+        "elapsed": response.elapsed.total_seconds(),
+    }
+    try:
+        record["body"] = response.content.decode("utf-8")
+    except UnicodeDecodeError:
+        record["body_b64"] = base64.b64encode(response.content).decode("ascii")
+    return record
+
+
+def record_to_response(request, record, adapter):
+    response = requests.Response()
+    response.status_code = record["status"]
+    response.reason = record["reason"]
+    response.headers = CaseInsensitiveDict(record["headers"])
+    if "body_b64" in record:
+        response._content = base64.b64decode(record["body_b64"])
+    else:
+        response._content = record["body"].encode("utf-8")
+    response._content_consumed = True
+    response.headers["Content-Length"] = str(len(response._content))
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.elapsed = datetime.timedelta(seconds=record["elapsed"])
+    response.url = request.url
+    response.request = request
+    response.connection = adapter
+    return response
+
+
+class CassetteAdapter(BaseAdapter):
+    """Транспорт requests: запросы к base_url обслуживаются из кассеты,
+    остальные (например, к локальным серверам в тестах) уходят в adapter."""
+
+    def __init__(self, cassette, adapter, base_url):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+        self.base_url = base_url.rstrip("/") + "/"
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if not request.url.startswith(self.base_url):
+            return self.adapter.send(request, stream=stream, timeout=timeout, verify=verify,
+                                     cert=cert, proxies=proxies)
+        key = self.cassette.request_key(request.method, request.url, request.body)
+        if self.cassette.mode != "all":
+            record = self.cassette.play(key)
+            if record is not None:
+                return record_to_response(request, record, self)
+            if self.cassette.mode == "none":
+                self.cassette.miss()
+                raise CassetteMiss(f"Cassette miss: {request.method} {request.url}", request=request)
+        response = self.adapter.send(request, stream=stream, timeout=timeout, verify=verify,
+                                     cert=cert, proxies=proxies)
+        self.cassette.record(key, response_to_record(response))
+        return response
+
+    def close(self):
+        self.adapter.close()
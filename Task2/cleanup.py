@@ -0,0 +1,179 @@
+"""Реестр созданных объявлений и их удаление в конце сессии.
+
+CreatedItemRegistry подключается к хукам ApiClient и запоминает ID каждого
+объявления, успешно созданного через POST /api/1/item (в том числе через
+create_items, AsyncApiClient и пул объявлений). Объявления, которые тест
+удалил сам, из реестра убираются. В конце сессии cleanup() удаляет оставшиеся
+через DELETE /api/2/item/:id пулом потоков с ограничением частоты запросов,
+чтобы не нагружать стенд, и возвращает отчет.
+
+    registry = CreatedItemRegistry(base_url).attach(DEFAULT_HOOKS)
+    ...
+    report = registry.cleanup(ApiClient(base_url), workers=8, rate=50)
+    print(report.summary())
+"""
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import unquote, urlsplit
+
+from api_client import extract_item_id
+
+CREATE_ENDPOINT = "POST /api/1/item"
+DELETE_ENDPOINT = "DELETE /api/2/item/:id"
+
+
+class RateLimiter:
+    """Не больше rate вызовов acquire() в секунду, равномерно (rate=None - без ограничения)"""
+
+    def __init__(self, rate=None):
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CleanupReport:
+    """Итог удаления: deleted - удалены, missing - уже отсутствовали (404),
+    failed - {ID: причина} для остальных"""
+
+    def __init__(self):
+        self.deleted = []
+        self.missing = []
+        self.failed = {}
+        self.duration = 0.0
+
+    @property
+    def total(self):
+        return len(self.deleted) + len(self.missing) + len(self.failed)
+
+    @property
+    def ok(self):
+        return not self.failed
+
+    def summary(self):
+        line = (f"cleanup: {self.total} items, deleted={len(self.deleted)} missing={len(self.missing)} "
+                f"failed={len(self.failed)} in {self.duration:.2f}s")
+        for item_id, reason in list(self.failed.items())[:10]:
+            line += f"\n  {item_id}: {reason}"
+        if len(self.failed) > 10:
+            line += f"\n  ... and {len(self.failed) - 10} more"
+        return line
+
+    def to_dict(self):
+        return {
+            "total": self.total,
+            "deleted": len(self.deleted),
+            "missing": len(self.missing),
+            "failed": self.failed,
+            "duration": round(self.duration, 3),
+        }
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+class CreatedItemRegistry:
+    """base_url - учитывать только запросы к этому стенду (тесты поднимают и
+    собственные временные серверы, объявления на которых удалять не нужно)"""
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url.rstrip("/") + "/" if base_url else None
+        # dict сохраняет порядок создания
+        self._ids = {}
+        self._lock = threading.Lock()
+        self._hooks = None
+
+    def attach(self, hooks):
+        hooks.add("post_response", self.observe)
+        self._hooks = hooks
+        return self
+
+    def detach(self):
+        if self._hooks is not None:
+            self._hooks.remove("post_response", self.observe)
+            self._hooks = None
+
+    def __len__(self):
+        return len(self._ids)
+
+    @property
+    def item_ids(self):
+        with self._lock:
+            return list(self._ids)
+
+    def add(self, item_id):
+        with self._lock:
+            self._ids[item_id] = None
+
+    def discard(self, item_id):
+        with self._lock:
+            self._ids.pop(item_id, None)
+
+    def observe(self, event):
+        if self.base_url is not None and not event.url.startswith(self.base_url):
+            return
+        status = event.response.status_code
+        if event.endpoint == CREATE_ENDPOINT and status == 200:
+            try:
+                item_id = extract_item_id(event.response.json())
+            except ValueError:
+                return
+            if item_id:
+                self.add(item_id)
+        elif event.endpoint == DELETE_ENDPOINT and status in (200, 404):
+            self.discard(unquote(urlsplit(event.url).path.rsplit("/", 1)[-1]))
+
+    def cleanup(self, api_client, workers=8, rate=None):
+        """Удалить все зарегистрированные объявления; rate - запросов в секунду.
+
+        Удаленные и уже отсутствующие объявления убираются из реестра,
+        объявления с ошибкой остаются в нем и попадают в report.failed.
+        """
+        report = CleanupReport()
+        limiter = RateLimiter(rate)
+        started = time.perf_counter()
+
+        def delete(item_id):
+            limiter.acquire()
+            try:
+                return item_id, api_client.delete_item(item_id).status_code
+            except Exception as e:
+                return item_id, e
+
+        def collect(future):
+            item_id, outcome = future.result()
+            if outcome == 200:
+                report.deleted.append(item_id)
+            elif outcome == 404:
+                report.missing.append(item_id)
+            else:
+                report.failed[item_id] = f"status {outcome}" if isinstance(outcome, int) else str(outcome)
+                return
+            self.discard(item_id)
+
+        pending = set()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cleanup") as executor:
+            for item_id in self.item_ids:
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                pending.add(executor.submit(delete, item_id))
+            for future in pending:
+                collect(future)
+        report.duration = time.perf_counter() - started
+        return report
@@ -0,0 +1,325 @@
+import os
+import random
+
+import pytest
+
+from api_client import BASE_URL_ENV, DEFAULT_HOOKS, ApiClient, unwrap_shared_adapters, wrap_shared_adapters
+from baseline import (DEFAULT_ALPHA, DEFAULT_BASELINE_RUNS, DEFAULT_MIN_CHANGE, DEFAULT_MIN_DELTA_MS, BaselineStore,
+                      check_run, environment_metadata)
+from cassette import MODES as CASSETTE_MODES
+from cassette import Cassette, CassetteAdapter
+from cleanup import CreatedItemRegistry
+from fake_server import FakeAdsServer, build_faults, parse_bugs
+from instrumentation import MetricsCollector
+from item_pool import ItemPool
+from latency_recorder import LatencyRecorder
+from load_driver import LoadSlo
+from test_data import SELLER_ID_SEED_ENV, freeze_item_name_time, reseed_test_data
+from timeouts import deadline_scope
+from traffic import TrafficRecorder
+
+# Время в названиях объявлений при записи и воспроизведении кассеты
+CASSETTE_ITEM_NAME_TIME = 1700000000
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("fake_server", "Локальный заменитель сервиса")
+    group.addoption("--fake-server", action="store_true", default=False,
+                    help="Запустить тесты против локального fake_server.py вместо боевого стенда")
+    group.addoption("--fake-server-bugs", default="",
+                    help="Поведение из BUGS.md: 'all' или список через запятую (BUG-001,BUG-005)")
+    group.addoption("--fake-server-latency", default=None,
+                    help="Распределение задержки ответа, например lognormal:20:0.5")
+    group.addoption("--fake-server-error-rate", type=float, default=0.0,
+                    help="Доля ответов с ошибкой 500")
+
+    group = parser.getgroup("load", "Нагрузочные прогоны")
+    group.addoption("--load-workers", type=int, default=5,
+                    help="Количество параллельных воркеров")
+    group.addoption("--load-requests", type=int, default=50,
+                    help="Общее количество запросов в прогоне")
+    group.addoption("--load-rps", type=float, default=None,
+                    help="Целевой RPS (по умолчанию без ограничения)")
+    group.addoption("--slo-p95-ms", type=float, default=2000,
+                    help="Допустимый p95 задержки, мс")
+    group.addoption("--slo-p99-ms", type=float, default=None,
+                    help="Допустимый p99 задержки, мс")
+    group.addoption("--slo-error-rate", type=float, default=0.0,
+                    help="Допустимая доля ошибок (0.01 = 1%%)")
+    group.addoption("--slo-min-rps", type=float, default=None,
+                    help="Минимально допустимый throughput, rps")
+
+    group = parser.getgroup("latency", "Замеры задержек")
+    group.addoption("--latency-samples", type=int, default=20,
+                    help="Количество замеров на эндпоинт в тестах производительности")
+    group.addoption("--latency-warmup", type=int, default=3,
+                    help="Количество прогревочных запросов перед замерами")
+    group.addoption("--latency-dir", default="latency_reports",
+                    help="Каталог для JSON-гистограмм задержек по итогам сессии")
+
+    group = parser.getgroup("baseline", "Сравнение задержек с базой")
+    group.addoption("--baseline-db", default=None,
+                    help="SQLite с историей замеров: сравнить прогон с базой и сохранить его")
+    group.addoption("--baseline-runs", type=int, default=DEFAULT_BASELINE_RUNS,
+                    help="Количество последних прогонов в базе")
+    group.addoption("--baseline-alpha", type=float, default=DEFAULT_ALPHA,
+                    help="Уровень значимости критерия Манна-Уитни")
+    group.addoption("--baseline-min-change", type=float, default=DEFAULT_MIN_CHANGE,
+                    help="Минимальный относительный рост медианы, считающийся регрессией")
+    group.addoption("--baseline-min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                    help="Минимальный рост медианы в мс, считающийся регрессией")
+    group.addoption("--baseline-label", default=None,
+                    help="Метка прогона в базе")
+    group.addoption("--baseline-any-host", action="store_true", default=False,
+                    help="База из прогонов на любом хосте (CI с одноразовыми машинами)")
+
+    group = parser.getgroup("item_pool", "Общий пул объявлений")
+    group.addoption("--item-pool-size", type=int, default=4,
+                    help="Количество объявлений, создаваемых один раз на сессию для тестов на чтение")
+
+    group = parser.getgroup("timeouts", "Таймауты")
+    group.addoption("--test-deadline", type=float, default=None,
+                    help="Общий дедлайн на все запросы ApiClient в одном тесте, секунды")
+
+    group = parser.getgroup("metrics", "Метрики клиента")
+    group.addoption("--metrics-file", default=None,
+                    help="Записать метрики запросов по эндпоинтам (OpenMetrics) в файл в конце сессии")
+    group.addoption("--record-traffic", default=None,
+                    help="Дописывать все запросы и ответы в JSONL-файл для traffic.py")
+    group.addoption("--record-traffic-bodies", action="store_true", default=False,
+                    help="Сохранять в записи трафика тела ответов")
+
+    group = parser.getgroup("cassette", "Запуск без сети по записанным ответам")
+    group.addoption("--cassette", default=None,
+                    help="Путь к кассете (без расширения: создаются <путь>.idx и <путь>.dat)")
+    group.addoption("--cassette-mode", default="none", choices=CASSETTE_MODES,
+                    help="none - только воспроизведение, new - дописывать новые запросы, all - записать заново")
+
+    group = parser.getgroup("cleanup", "Удаление созданных объявлений")
+    group.addoption("--keep-items", action="store_true", default=False,
+                    help="Не удалять объявления, созданные за сессию")
+    group.addoption("--cleanup-workers", type=int, default=8,
+                    help="Параллельных запросов DELETE при удалении")
+    group.addoption("--cleanup-rps", type=float, default=100,
+                    help="Не больше стольких запросов DELETE в секунду (0 - без ограничения)")
+    group.addoption("--cleanup-report", default=None,
+                    help="Записать отчет об удалении (JSON) в файл")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "deadline(seconds): общий дедлайн на все запросы ApiClient в тесте"
+    )
+    if getattr(config.option, "numprocesses", None) and not hasattr(config, "workerinput"):
+        if config.getoption("--cassette"):
+            raise pytest.UsageError("--cassette не поддерживает параллельный запуск (-n)")
+        if config.getoption("--baseline-db"):
+            raise pytest.UsageError("--baseline-db не поддерживает параллельный запуск (-n)")
+        # При запуске через pytest-xdist сервер и метрики у каждого воркера свои
+        return
+    if config.getoption("--metrics-file"):
+        config._metrics_collector = MetricsCollector().attach(DEFAULT_HOOKS)
+    if config.getoption("--record-traffic"):
+        path = _worker_path(config, config.getoption("--record-traffic"))
+        config._traffic_recorder = TrafficRecorder(
+            str(path), record_bodies=config.getoption("--record-traffic-bodies")).attach(DEFAULT_HOOKS)
+    if config.getoption("--fake-server"):
+        _start_fake_server(config)
+    if not config.getoption("--keep-items"):
+        config._item_registry = CreatedItemRegistry(ApiClient().base_url).attach(DEFAULT_HOOKS)
+    if config.getoption("--cassette"):
+        _start_cassette(config)
+
+
+def _start_fake_server(config):
+    faults = build_faults(
+        latency=config.getoption("--fake-server-latency"),
+        error_rate=config.getoption("--fake-server-error-rate")
+    )
+    server = FakeAdsServer(bugs=parse_bugs(config.getoption("--fake-server-bugs")), faults=faults)
+    config._fake_server = server.start()
+    # ApiClient() без base_url берет адрес из окружения
+    config._fake_server_previous_url = os.environ.get(BASE_URL_ENV)
+    os.environ[BASE_URL_ENV] = server.url
+
+
+def _start_cassette(config):
+    path = config.rootpath / config.getoption("--cassette")
+    mode = config.getoption("--cassette-mode")
+    if mode == "none" and not os.path.exists(f"{path}.idx"):
+        raise pytest.UsageError(f"Кассета {path} не найдена: запишите ее с --cassette-mode all")
+    # Тела запросов должны совпадать с записанными: sellerID, названия и random детерминированы
+    os.environ.setdefault(SELLER_ID_SEED_ENV, "cassette")
+    freeze_item_name_time(CASSETTE_ITEM_NAME_TIME)
+    cassette = Cassette(path, mode)
+    # Из кассеты обслуживаются только запросы к тестируемому стенду
+    base_url = ApiClient().base_url
+    wrap_shared_adapters(lambda adapter: CassetteAdapter(cassette, adapter, base_url))
+    config._cassette = cassette
+
+
+def pytest_sessionfinish(session):
+    """Сравнить задержки с базой и удалить объявления, созданные за сессию,
+    пока стенд (или fake_server) доступен"""
+    config = session.config
+    if config.getoption("--baseline-db") and getattr(config, "_latency_histograms", None):
+        _check_baseline(session)
+    registry = getattr(config, "_item_registry", None)
+    if registry is None or not len(registry):
+        return
+    report = registry.cleanup(ApiClient(registry.base_url), workers=config.getoption("--cleanup-workers"),
+                              rate=config.getoption("--cleanup-rps") or None)
+    registry.detach()
+    config._cleanup_report = report
+    if config.getoption("--cleanup-report"):
+        report.write(str(_worker_path(config, config.getoption("--cleanup-report"))))
+
+
+def _baseline_target(config):
+    """Стенд прогона: сравниваются только прогоны на одном стенде"""
+    if getattr(config, "_cassette", None) is not None:
+        return "cassette"
+    if getattr(config, "_fake_server", None) is not None:
+        latency = config.getoption("--fake-server-latency")
+        return f"fake-server:{latency}" if latency else "fake-server"
+    return ApiClient().base_url
+
+
+def _check_baseline(session):
+    """Регрессия задержек проваливает сессию, если тесты прошли"""
+    config = session.config
+    metadata = environment_metadata(_baseline_target(config), label=config.getoption("--baseline-label"))
+    with BaselineStore(config.rootpath / config.getoption("--baseline-db")) as store:
+        _, comparison = check_run(store, config._latency_histograms, metadata,
+                                  runs=config.getoption("--baseline-runs"),
+                                  alpha=config.getoption("--baseline-alpha"),
+                                  min_change=config.getoption("--baseline-min-change"),
+                                  min_delta_ms=config.getoption("--baseline-min-delta-ms"),
+                                  any_host=config.getoption("--baseline-any-host"))
+    config._baseline_comparison = comparison
+    if not comparison.ok and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    comparison = getattr(config, "_baseline_comparison", None)
+    if comparison is not None:
+        terminalreporter.write_line(comparison.table(), red=not comparison.ok)
+    report = getattr(config, "_cleanup_report", None)
+    if report is not None:
+        terminalreporter.write_line(report.summary(), red=not report.ok)
+
+
+def pytest_unconfigure(config):
+    collector = getattr(config, "_metrics_collector", None)
+    if collector is not None:
+        collector.detach()
+        collector.write(str(_worker_path(config, config.getoption("--metrics-file"))))
+    recorder = getattr(config, "_traffic_recorder", None)
+    if recorder is not None:
+        recorder.close()
+    cassette = getattr(config, "_cassette", None)
+    if cassette is not None:
+        cassette.save()
+        unwrap_shared_adapters()
+    server = getattr(config, "_fake_server", None)
+    if server is None:
+        return
+    server.stop()
+    if config._fake_server_previous_url is None:
+        os.environ.pop(BASE_URL_ENV, None)
+    else:
+        os.environ[BASE_URL_ENV] = config._fake_server_previous_url
+
+
+def _worker_path(config, filename):
+    """Путь к файлу отчета; при запуске через pytest-xdist у каждого воркера свой файл"""
+    path = config.rootpath / filename
+    worker = getattr(config, "workerinput", {}).get("workerid")
+    if worker:
+        # metrics.txt -> metrics.gw0.txt
+        path = path.with_name(f"{path.stem}.{worker}{path.suffix}")
+    return path
+
+
+def pytest_report_header(config):
+    lines = []
+    server = getattr(config, "_fake_server", None)
+    if server is not None:
+        bugs = ", ".join(sorted(server.bugs)) or "нет"
+        lines.append(f"fake ads server: {server.url} (bugs: {bugs})")
+    cassette = getattr(config, "_cassette", None)
+    if cassette is not None:
+        lines.append(f"cassette: {cassette.path} (mode: {cassette.mode})")
+    return lines
+
+
+class LoadConfig:
+    """Параметры нагрузочного прогона из командной строки pytest"""
+
+    def __init__(self, config):
+        self.workers = config.getoption("--load-workers")
+        self.total_requests = config.getoption("--load-requests")
+        self.target_rps = config.getoption("--load-rps")
+        self.slo = LoadSlo(
+            max_p95_ms=config.getoption("--slo-p95-ms"),
+            max_p99_ms=config.getoption("--slo-p99-ms"),
+            max_error_rate=config.getoption("--slo-error-rate"),
+            min_throughput=config.getoption("--slo-min-rps")
+        )
+
+
+@pytest.fixture
+def load_config(request):
+    return LoadConfig(request.config)
+
+
+@pytest.fixture(scope="session")
+def latency_recorder(request):
+    """Гистограммы задержек по эндпоинтам; сохраняются в JSON в конце сессии"""
+    recorder = LatencyRecorder(
+        iterations=request.config.getoption("--latency-samples"),
+        warmup=request.config.getoption("--latency-warmup")
+    )
+    yield recorder
+    # Для сравнения с базой в pytest_sessionfinish
+    request.config._latency_histograms = recorder.histograms
+    if recorder.histograms:
+        recorder.dump(request.config.rootpath / request.config.getoption("--latency-dir"))
+
+
+@pytest.fixture(scope="session")
+def item_pool(request):
+    """Канонические объявления, создаваемые параллельно один раз на сессию"""
+    if getattr(request.config, "_cassette", None) is not None:
+        # Пул создается в первом использующем его тесте, до cassette_seed:
+        # тела запросов не должны зависеть от того, какой это тест
+        random.seed("item_pool")
+        reseed_test_data("item_pool")
+    return ItemPool.create(request.config.getoption("--item-pool-size"))
+
+
+@pytest.fixture
+def shared_item(item_pool):
+    """Объявление из общего пула для тестов, которые его только читают"""
+    return item_pool.acquire()
+
+
+@pytest.fixture(autouse=True)
+def cassette_seed(request):
+    """С кассетой данные теста не зависят от того, какие тесты запускались до него"""
+    if getattr(request.config, "_cassette", None) is not None:
+        random.seed(request.node.nodeid)
+        reseed_test_data(request.node.nodeid)
+
+
+@pytest.fixture(autouse=True)
+def request_deadline(request):
+    """Дедлайн теста из маркера deadline или опции --test-deadline"""
+    marker = request.node.get_closest_marker("deadline")
+    seconds = marker.args[0] if marker is not None else request.config.getoption("--test-deadline")
+    if seconds is None:
+        yield None
+        return
+    with deadline_scope(seconds) as deadline:
+        yield deadline
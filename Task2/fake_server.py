@@ -0,0 +1,452 @@
+"""Локальный in-process заменитель микросервиса объявлений.
+
+Реализует эндпоинты:
+    POST   /api/1/item              - создать объявление
+    GET    /api/1/item/:id          - получить объявление
+    GET    /api/1/:sellerID/item    - объявления продавца
+    GET    /api/1/statistic/:id     - статистика (v1)
+    GET    /api/2/statistic/:id     - статистика (v2)
+    DELETE /api/2/item/:id          - удалить объявление
+
+По умолчанию сервер ведет себя по документации; переключатели bugs включают
+поведение из BUGS.md. Задержки и ошибки можно задать распределениями.
+
+Запуск отдельным процессом:
+    python fake_server.py --port 8080 --latency lognormal:20:0.5 --error-rate 0.01
+    API_BASE_URL=http://127.0.0.1:8080 pytest -v
+"""
+import argparse
+import json
+import math
+import random
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+MIN_SELLER_ID = 111111
+MAX_SELLER_ID = 999999
+STATISTICS_FIELDS = ["likes", "viewCount", "contacts"]
+
+# Поведение реального сервиса из BUGS.md, включаемое по отдельности
+BUGS = {
+    "BUG-001": "POST /api/1/item возвращает {\"status\": \"Сохранили объявление - <id>\"} вместо объекта",
+    "BUG-002": "POST /api/1/item принимает отрицательную цену",
+    "BUG-003": "POST /api/1/item принимает отрицательную статистику",
+    "BUG-004": "POST /api/1/item отклоняет нулевую статистику",
+    "BUG-005": "GET /api/1/item/:id возвращает 400 для существующего объявления",
+    "BUG-006": "GET /api/1/item/:id возвращает 400 для несуществующего объявления",
+    "BUG-007": "GET /api/1/item/:id возвращает 400 для числового ID",
+    "BUG-009": "GET /api/1/:sellerID/item возвращает 405 для нечислового sellerID",
+    "BUG-010": "GET /api/1/:sellerID/item принимает отрицательный sellerID",
+    "BUG-011": "GET /api/1/:sellerID/item принимает sellerID вне диапазона",
+}
+
+
+def parse_bugs(value):
+    """'all', '' или список через запятую ('BUG-001,BUG-005') -> множество переключателей"""
+    if not value:
+        return set()
+    if value == "all":
+        return set(BUGS)
+    bugs = {bug.strip().upper() for bug in value.split(",") if bug.strip()}
+    unknown = bugs - set(BUGS)
+    if unknown:
+        raise ValueError(f"Unknown bug switches: {', '.join(sorted(unknown))}")
+    return bugs
+
+
+class Distribution:
+    """Распределение задержки в миллисекундах.
+
+    Формат: fixed:<ms>, uniform:<min_ms>:<max_ms>, lognormal:<median_ms>:<sigma>,
+    exponential:<mean_ms>.
+    """
+
+    def __init__(self, spec):
+        self.spec = spec
+        kind, *params = spec.split(":")
+        try:
+            params = [float(param) for param in params]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2, "exponential": 1}
+        if expected.get(kind) != len(params):
+            raise ValueError(f"Invalid latency spec: {spec}")
+        self.kind = kind
+        self.params = params
+
+    def sample_ms(self, rng):
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return rng.expovariate(1 / self.params[0]) if self.params[0] > 0 else 0.0
+
+
+class FaultInjection:
+    """Задержки и ошибки, добавляемые к ответам сервера.
+
+    latency - Distribution для всех маршрутов, route_latency - {route: Distribution};
+    error_rate - вероятность ответа одним из error_statuses; reset_rate - вероятность
+    разорвать соединение без ответа.
+    """
+
+    def __init__(self, latency=None, route_latency=None, error_rate=0.0,
+                 error_statuses=(500,), reset_rate=0.0, seed=None):
+        self.latency = latency
+        self.route_latency = route_latency or {}
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.reset_rate = reset_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay_seconds(self, route):
+        distribution = self.route_latency.get(route, self.latency)
+        if distribution is None:
+            return 0.0
+        with self._lock:
+            return max(0.0, distribution.sample_ms(self._rng)) / 1000
+
+    def pick_fault(self):
+        """None, 'reset' или HTTP статус для инжектируемой ошибки"""
+        with self._lock:
+            roll = self._rng.random()
+            if roll < self.reset_rate:
+                return "reset"
+            if roll < self.reset_rate + self.error_rate:
+                return self._rng.choice(self.error_statuses)
+        return None
+
+
+class ItemStore:
+    """Потокобезопасное хранилище объявлений с индексами по id и sellerID"""
+
+    def __init__(self):
+        self.items = {}
+        self.by_seller = {}
+        self._lock = threading.Lock()
+
+    def add(self, seller_id, name, price, statistics):
+        item = {
+            "id": str(uuid.uuid4()),
+            "sellerId": seller_id,
+            "name": name,
+            "price": price,
+            "statistics": {field: statistics[field] for field in STATISTICS_FIELDS},
+            "createdAt": datetime.now(timezone.utc).isoformat()
+        }
+        with self._lock:
+            self.items[item["id"]] = item
+            self.by_seller.setdefault(seller_id, {})[item["id"]] = item
+        return item
+
+    def get(self, item_id):
+        with self._lock:
+            return self.items.get(item_id)
+
+    def by_seller_id(self, seller_id):
+        with self._lock:
+            return list(self.by_seller.get(seller_id, {}).values())
+
+    def delete(self, item_id):
+        with self._lock:
+            item = self.items.pop(item_id, None)
+            if item is not None:
+                del self.by_seller[item["sellerId"]][item_id]
+            return item
+
+    def clear(self):
+        with self._lock:
+            self.items.clear()
+            self.by_seller.clear()
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class AdsRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Без Nagle keep-alive ответы не ждут delayed ACK клиента
+    disable_nagle_algorithm = True
+    server_version = "FakeAds/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    # --- Разбор запроса ---
+
+    def _route(self):
+        """(имя маршрута, параметр пути) или (None, None)"""
+        segments = [unquote(segment) for segment in urlsplit(self.path).path.split("/")[1:]]
+        if len(segments) != 4 or segments[0] != "api":
+            return None, None
+        version, resource, last = segments[1], segments[2], segments[3]
+        if version == "1" and resource == "item":
+            return "get_item", last
+        if resource == "statistic" and version in ("1", "2"):
+            return f"statistic_v{version}", last
+        if version == "2" and resource == "item":
+            return "delete_item", last
+        if version == "1" and last == "item":
+            return "seller_items", resource
+        return None, None
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body)
+        except (ValueError, UnicodeDecodeError):
+            return None
+
+    # --- Ответы ---
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message):
+        self._send_json(status, {"result": {"message": message, "messages": {}}, "status": str(status)})
+
+    def _dispatch(self, method):
+        if self.command == "POST" and urlsplit(self.path).path == "/api/1/item":
+            route, param = "create_item", None
+        else:
+            route, param = self._route()
+        if route is None:
+            # Тело запроса все равно нужно дочитать, чтобы не сломать keep-alive
+            self._read_json()
+            return self._send_error(404, "route not found")
+        expected_method = {"create_item": "POST", "delete_item": "DELETE"}.get(route, "GET")
+        if method != expected_method:
+            self._read_json()
+            return self._send_error(405, "method not allowed")
+
+        faults = self.server.faults
+        delay = faults.delay_seconds(route)
+        if delay:
+            time.sleep(delay)
+        fault = faults.pick_fault()
+        if fault == "reset":
+            self.close_connection = True
+            self.connection.shutdown(socket.SHUT_RDWR)
+            return
+        if fault is not None:
+            self._read_json()
+            return self._send_error(fault, "injected error")
+
+        getattr(self, f"_handle_{route}")(param)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    # --- Обработчики эндпоинтов ---
+
+    def _validate_item(self, data):
+        bugs = self.server.bugs
+        if not isinstance(data, dict):
+            return "invalid json"
+        for field in ["sellerID", "name", "price", "statistics"]:
+            if field not in data:
+                return f"field {field} is required"
+        seller_id, name, price, statistics = data["sellerID"], data["name"], data["price"], data["statistics"]
+        if not _is_int(seller_id) or not MIN_SELLER_ID <= seller_id <= MAX_SELLER_ID:
+            return "sellerID must be an integer in range 111111-999999"
+        if not isinstance(name, str) or not name:
+            return "name must be a non-empty string"
+        if not _is_int(price) or price == 0 or (price < 0 and "BUG-002" not in bugs):
+            return "price must be a positive integer"
+        if not isinstance(statistics, dict):
+            return "statistics must be an object"
+        for field in STATISTICS_FIELDS:
+            value = statistics.get(field)
+            if not _is_int(value):
+                return f"statistics.{field} must be an integer"
+            if value < 0 and "BUG-003" not in bugs:
+                return f"statistics.{field} must be non-negative"
+            if value == 0 and "BUG-004" in bugs:
+                return f"statistics.{field} is required"
+        return None
+
+    def _handle_create_item(self, _):
+        data = self._read_json()
+        error = self._validate_item(data)
+        if error:
+            return self._send_error(400, error)
+        item = self.server.store.add(data["sellerID"], data["name"], data["price"], data["statistics"])
+        if "BUG-001" in self.server.bugs:
+            return self._send_json(200, {"status": f"Сохранили объявление - {item['id']}"})
+        self._send_json(200, item)
+
+    def _handle_get_item(self, item_id):
+        bugs = self.server.bugs
+        item = self.server.store.get(item_id)
+        if item is not None:
+            if "BUG-005" in bugs:
+                return self._send_error(400, "bad request")
+            return self._send_json(200, [item])
+        if ("BUG-006" in bugs) or ("BUG-007" in bugs and item_id.isdigit()):
+            return self._send_error(400, "bad request")
+        self._send_error(404, f"item {item_id} not found")
+
+    def _handle_seller_items(self, raw_seller_id):
+        bugs = self.server.bugs
+        try:
+            seller_id = int(raw_seller_id)
+        except ValueError:
+            if "BUG-009" in bugs:
+                return self._send_error(405, "method not allowed")
+            return self._send_error(400, "sellerID must be an integer")
+        if seller_id < 0 and "BUG-010" not in bugs:
+            return self._send_error(400, "sellerID must be positive")
+        if 0 <= seller_id < MIN_SELLER_ID or seller_id > MAX_SELLER_ID:
+            if "BUG-011" not in bugs:
+                # Продавца вне допустимого диапазона не существует
+                return self._send_error(404, f"seller {seller_id} not found")
+        self._send_json(200, self.server.store.by_seller_id(seller_id))
+
+    def _handle_statistic(self, item_id):
+        item = self.server.store.get(item_id)
+        if item is None:
+            return self._send_error(404, f"statistic for item {item_id} not found")
+        self._send_json(200, [dict(item["statistics"])])
+
+    def _handle_statistic_v1(self, item_id):
+        self._handle_statistic(item_id)
+
+    def _handle_statistic_v2(self, item_id):
+        self._handle_statistic(item_id)
+
+    def _handle_delete_item(self, item_id):
+        if self.server.store.delete(item_id) is None:
+            return self._send_error(404, f"item {item_id} not found")
+        self._send_json(200, {})
+
+
+class _AdsHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Клиент закрыл соединение по таймауту - для заменителя это штатная ситуация
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class FakeAdsServer:
+    """Сервер в фоновом потоке: with FakeAdsServer() as server: ApiClient(base_url=server.url)"""
+
+    def __init__(self, host="127.0.0.1", port=0, bugs=(), faults=None):
+        self.httpd = _AdsHTTPServer((host, port), AdsRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.request_queue_size = 1024
+        self.httpd.store = ItemStore()
+        self.httpd.bugs = set(bugs)
+        self.httpd.faults = faults or FaultInjection()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def store(self):
+        return self.httpd.store
+
+    @property
+    def bugs(self):
+        return self.httpd.bugs
+
+    @property
+    def faults(self):
+        return self.httpd.faults
+
+    @faults.setter
+    def faults(self, value):
+        self.httpd.faults = value
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05},
+                                        name="fake-ads-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def build_faults(latency=None, route_latency=(), error_rate=0.0, error_statuses="500", reset_rate=0.0, seed=None):
+    """FaultInjection из строковых параметров командной строки"""
+    routes = {}
+    for entry in route_latency:
+        route, _, spec = entry.partition("=")
+        routes[route] = Distribution(spec)
+    return FaultInjection(
+        latency=Distribution(latency) if latency else None,
+        route_latency=routes,
+        error_rate=error_rate,
+        error_statuses=[int(status) for status in str(error_statuses).split(",")],
+        reset_rate=reset_rate,
+        seed=seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--bugs", default="", help="'all' или список через запятую: " + ", ".join(BUGS))
+    parser.add_argument("--latency", default=None, help="Распределение задержки, например lognormal:20:0.5")
+    parser.add_argument("--route-latency", action="append", default=[],
+                        help="Задержка для маршрута: get_item=fixed:100 (можно повторять)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов с ошибкой")
+    parser.add_argument("--error-status", default="500", help="Коды ошибок через запятую")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="Доля разорванных соединений")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    faults = build_faults(args.latency, args.route_latency, args.error_rate, args.error_status,
+                          args.reset_rate, args.seed)
+    server = FakeAdsServer(args.host, args.port, parse_bugs(args.bugs), faults)
+    print(f"Fake ads service listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Хуки ApiClient на каждую попытку запроса и сборщик метрик по эндпоинтам
+с экспортом в текстовый формат OpenMetrics.
+
+Фазы запроса, которые доступны через requests:
+- ttfb - от отправки запроса до получения заголовков ответа (response.elapsed;
+  включает установку соединения, если оно не взято из пула);
+- transfer - чтение тела ответа;
+- total - вся попытка целиком, включая накладные расходы клиента.
+DNS, TCP connect и TLS по отдельности requests не отдает.
+"""
+import os
+import threading
+import time
+
+from latency_recorder import LatencyHistogram
+
+HOOK_EVENTS = ("pre_request", "post_response", "on_error")
+EXPORT_QUANTILES = [0.5, 0.9, 0.95, 0.99]
+
+
+class RequestEvent:
+    """Одна попытка запроса: передается во все хуки"""
+
+    def __init__(self, endpoint, method, url, stream=False, json=None):
+        self.endpoint = endpoint
+        self.method = method
+        self.url = url
+        self.stream = stream
+        # Тело запроса (аргумент json у requests)
+        self.json = json
+        self.started_at = time.time()
+        self.started_ns = time.perf_counter_ns()
+        self.total_ns = None
+        self.response = None
+        self.error = None
+
+    def finish(self, response=None, error=None):
+        self.total_ns = time.perf_counter_ns() - self.started_ns
+        self.response = response
+        self.error = error
+
+    @property
+    def ttfb_ns(self):
+        if self.response is None:
+            return None
+        return int(self.response.elapsed.total_seconds() * 1e9)
+
+    @property
+    def transfer_ns(self):
+        # Потоковый ответ к этому моменту еще не прочитан
+        if self.response is None or self.stream:
+            return None
+        return max(0, self.total_ns - self.ttfb_ns)
+
+    @property
+    def response_bytes(self):
+        if self.response is None:
+            return 0
+        if self.stream:
+            return int(self.response.headers.get("Content-Length", 0))
+        return len(self.response.content)
+
+
+class RequestHooks:
+    """Списки хуков по событиям pre_request / post_response / on_error.
+
+    Хук - функция, принимающая RequestEvent. Исключение в хуке прерывает запрос.
+    """
+
+    def __init__(self):
+        self._hooks = {event: [] for event in HOOK_EVENTS}
+        self._lock = threading.Lock()
+
+    def add(self, event, hook):
+        if event not in self._hooks:
+            raise ValueError(f"Unknown hook event: {event}")
+        with self._lock:
+            self._hooks[event] = self._hooks[event] + [hook]
+        return hook
+
+    def remove(self, event, hook):
+        with self._lock:
+            self._hooks[event] = [h for h in self._hooks[event] if h != hook]
+
+    def __bool__(self):
+        return any(self._hooks.values())
+
+    def fire(self, event, request_event):
+        # Список заменяется целиком при изменении, поэтому читается без блокировки
+        for hook in self._hooks[event]:
+            hook(request_event)
+
+
+class EndpointMetrics:
+    """Счетчики и гистограммы фаз одного эндпоинта"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.errors = {}
+        self.response_bytes = 0
+        self.phases = {"ttfb": LatencyHistogram(), "transfer": LatencyHistogram(), "total": LatencyHistogram()}
+
+    def observe(self, event):
+        for phase, value in (("ttfb", event.ttfb_ns), ("transfer", event.transfer_ns), ("total", event.total_ns)):
+            if value is not None:
+                self.phases[phase].record(value)
+        if event.response is not None:
+            status = str(event.response.status_code)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.response_bytes += event.response_bytes
+        else:
+            # "Request timeout: url" -> "Request timeout"
+            kind = str(event.error).split(":", 1)[0]
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+class MetricsCollector:
+    """Метрики попыток запросов по эндпоинтам.
+
+    collector = MetricsCollector().attach(DEFAULT_HOOKS)
+    ...
+    collector.write("metrics.txt")
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+        self._hooks = None
+
+    def attach(self, hooks):
+        hooks.add("post_response", self.observe)
+        hooks.add("on_error", self.observe)
+        self._hooks = hooks
+        return self
+
+    def detach(self):
+        if self._hooks is not None:
+            self._hooks.remove("post_response", self.observe)
+            self._hooks.remove("on_error", self.observe)
+            self._hooks = None
+
+    def observe(self, event):
+        with self._lock:
+            metrics = self.endpoints.get(event.endpoint)
+            if metrics is None:
+                metrics = EndpointMetrics()
+                self.endpoints[event.endpoint] = metrics
+            metrics.observe(event)
+
+    def to_openmetrics(self, prefix="api_client"):
+        """Метрики в текстовом формате OpenMetrics"""
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            lines = [
+                f"# TYPE {prefix}_responses counter",
+                f"# HELP {prefix}_responses Responses by endpoint and status code.",
+            ]
+            for endpoint, metrics in endpoints:
+                for status, count in sorted(metrics.statuses.items()):
+                    lines.append(f'{prefix}_responses_total{{{_labels(endpoint)},status="{status}"}} {count}')
+            lines += [
+                f"# TYPE {prefix}_errors counter",
+                f"# HELP {prefix}_errors Requests that failed without a response.",
+            ]
+            for endpoint, metrics in endpoints:
+                for kind, count in sorted(metrics.errors.items()):
+                    lines.append(f'{prefix}_errors_total{{{_labels(endpoint)},error="{_escape(kind)}"}} {count}')
+            lines += [
+                f"# TYPE {prefix}_response_bytes counter",
+                f"# UNIT {prefix}_response_bytes bytes",
+                f"# HELP {prefix}_response_bytes Response body bytes received.",
+            ]
+            for endpoint, metrics in endpoints:
+                lines.append(f"{prefix}_response_bytes_total{{{_labels(endpoint)}}} {metrics.response_bytes}")
+            for phase in ("ttfb", "transfer", "total"):
+                name = f"{prefix}_{phase}_seconds"
+                lines += [
+                    f"# TYPE {name} summary",
+                    f"# UNIT {name} seconds",
+                    f"# HELP {name} Request {phase} time.",
+                ]
+                for endpoint, metrics in endpoints:
+                    histogram = metrics.phases[phase]
+                    if not histogram.count:
+                        continue
+                    labels = _labels(endpoint)
+                    for quantile in EXPORT_QUANTILES:
+                        value = histogram.percentile(quantile * 100) / 1e9
+                        lines.append(f'{name}{{{labels},quantile="{quantile}"}} {value:.6f}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.total_ns / 1e9:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_openmetrics())
+        return path
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(endpoint):
+    return f'endpoint="{_escape(endpoint)}"'
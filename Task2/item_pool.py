@@ -0,0 +1,60 @@
+import asyncio
+import copy
+import itertools
+import threading
+
+from api_client import extract_item_id
+from async_api_client import AsyncApiClient
+from test_data import get_valid_item_data
+
+
+class PooledItem:
+    """Объявление из общего пула: только для чтения"""
+
+    def __init__(self, item_id, data):
+        self.id = item_id
+        self._data = data
+
+    @property
+    def data(self):
+        """Копия данных, с которыми создано объявление"""
+        return copy.deepcopy(self._data)
+
+
+class ItemPool:
+    """Набор канонических объявлений, создаваемых один раз на сессию.
+
+    Подходит только для тестов, которые не изменяют объявление; тесты,
+    которые удаляют или меняют данные, должны создавать свои объявления.
+    """
+
+    def __init__(self, items):
+        if not items:
+            raise ValueError("Item pool is empty")
+        self.items = items
+        self._cycle = itertools.cycle(items)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, size, max_concurrency=8, base_url=None):
+        """Создать size объявлений параллельно"""
+        async def create_all():
+            async with AsyncApiClient(max_concurrency=max_concurrency, base_url=base_url) as client:
+                payloads = [get_valid_item_data() for _ in range(size)]
+                responses = await asyncio.gather(*[client.create_item(data) for data in payloads])
+                return list(zip(payloads, responses))
+
+        items = []
+        for data, response in asyncio.run(create_all()):
+            if response.status_code != 200:
+                raise RuntimeError(f"Failed to create pooled item: {response.status_code} {response.text}")
+            item_id = extract_item_id(response.json())
+            if not item_id:
+                raise RuntimeError(f"No item id in create response: {response.text}")
+            items.append(PooledItem(item_id, data))
+        return cls(items)
+
+    def acquire(self):
+        """Следующее объявление из пула (по кругу)"""
+        with self._lock:
+            return next(self._cycle)
@@ -0,0 +1,89 @@
+"""Потоковый разбор JSON-массива: элементы отдаются по одному по мере поступления данных."""
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+_NUMBER_START = "-0123456789"
+_NUMBER_CHARS = "0123456789+-.eE"
+# После стольких разобранных символов буфер обрезается
+_COMPACT_THRESHOLD = 1 << 16
+
+
+def iter_json_array(chunks):
+    """Итератор по элементам JSON-массива верхнего уровня.
+
+    chunks - итерируемое по кускам bytes (например, response.iter_content()).
+    В памяти держится только неразобранный хвост, а не весь ответ.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    buffer = ""
+    position = 0
+    exhausted = False
+
+    def read_more():
+        nonlocal buffer, position, exhausted
+        if exhausted:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer += utf8.decode(b"", final=True)
+            return True
+        if position > _COMPACT_THRESHOLD:
+            buffer = buffer[position:]
+            position = 0
+        buffer += utf8.decode(chunk)
+        return True
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            if position < len(buffer) or not read_more():
+                return position < len(buffer)
+
+    if not skip_whitespace() or buffer[position] != "[":
+        raise ValueError("Expected JSON array")
+    position += 1
+    expect_value = True
+    first = True
+    while True:
+        if not skip_whitespace():
+            raise ValueError("Unexpected end of JSON array")
+        char = buffer[position]
+        if char == "]" and (first or not expect_value):
+            position += 1
+            break
+        if not expect_value:
+            if char != ",":
+                raise ValueError(f"Expected ',' or ']' at position {position}")
+            position += 1
+            expect_value = True
+            continue
+        if char in _NUMBER_START:
+            # Число на границе куска может быть неполным ("1.5e" из "1.5e3") - ждем его конца
+            while True:
+                end = position
+                while end < len(buffer) and buffer[end] in _NUMBER_CHARS:
+                    end += 1
+                if end < len(buffer) or not read_more():
+                    break
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Элемент пришел не целиком - дочитываем следующий кусок
+                if not read_more():
+                    raise
+                continue
+            break
+        position = end
+        yield item
+        expect_value = False
+        first = False
+
+    if skip_whitespace():
+        raise ValueError("Extra data after JSON array")
@@ -0,0 +1,155 @@
+"""Сбор задержек по эндпоинтам в логарифмически-бакетные гистограммы (в стиле HDR Histogram).
+
+Значения хранятся в наносекундах (time.perf_counter_ns). Каждая степень двойки
+делится на 2**SUB_BUCKET_BITS под-бакетов, поэтому относительная ошибка
+перцентилей не превышает 1 / 2**SUB_BUCKET_BITS (< 0.8%).
+"""
+import json
+import math
+import os
+import threading
+import time
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+REPORT_PERCENTILES = [50, 90, 95, 99, 99.9]
+
+
+def bucket_index(value_ns):
+    """Номер бакета для значения (значения меньше SUB_BUCKET_COUNT хранятся точно)"""
+    if value_ns < SUB_BUCKET_COUNT:
+        return value_ns
+    shift = value_ns.bit_length() - 1 - SUB_BUCKET_BITS
+    return (shift + 1) * SUB_BUCKET_COUNT + (value_ns >> shift) - SUB_BUCKET_COUNT
+
+
+def bucket_bounds(index):
+    """Границы бакета [lower, upper)"""
+    if index < SUB_BUCKET_COUNT:
+        return index, index + 1
+    shift = index // SUB_BUCKET_COUNT - 1
+    lower = (index % SUB_BUCKET_COUNT + SUB_BUCKET_COUNT) << shift
+    return lower, lower + (1 << shift)
+
+
+class LatencyHistogram:
+    """Гистограмма задержек в наносекундах"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = None
+
+    def record(self, value_ns):
+        value_ns = max(0, int(value_ns))
+        index = bucket_index(value_ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ns += value_ns
+        self.min_ns = value_ns if self.min_ns is None else min(self.min_ns, value_ns)
+        self.max_ns = value_ns if self.max_ns is None else max(self.max_ns, value_ns)
+
+    def merge(self, other):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total_ns += other.total_ns
+        for value in (other.min_ns, other.max_ns):
+            if value is not None:
+                self.min_ns = value if self.min_ns is None else min(self.min_ns, value)
+                self.max_ns = value if self.max_ns is None else max(self.max_ns, value)
+
+    def percentile(self, percent):
+        """Перцентиль в наносекундах (середина бакета, ограниченная min/max)"""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(percent * self.count / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                lower, upper = bucket_bounds(index)
+                return min(max((lower + upper - 1) // 2, self.min_ns), self.max_ns)
+        return self.max_ns
+
+    def percentile_ms(self, percent):
+        return self.percentile(percent) / 1e6
+
+    def mean_ms(self):
+        return self.total_ns / self.count / 1e6 if self.count else 0.0
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "min_ms": (self.min_ns or 0) / 1e6,
+            "max_ms": (self.max_ns or 0) / 1e6,
+            "mean_ms": self.mean_ms(),
+            "percentiles_ms": {str(p): self.percentile_ms(p) for p in REPORT_PERCENTILES},
+            "sub_bucket_bits": SUB_BUCKET_BITS,
+            "total_ns": self.total_ns,
+            "min_ns": self.min_ns,
+            "max_ns": self.max_ns,
+            "buckets": {str(index): count for index, count in sorted(self.buckets.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("sub_bucket_bits", SUB_BUCKET_BITS) != SUB_BUCKET_BITS:
+            raise ValueError("Histogram was recorded with a different sub_bucket_bits")
+        histogram = cls()
+        histogram.buckets = {int(index): count for index, count in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.total_ns = data["total_ns"]
+        histogram.min_ns = data["min_ns"]
+        histogram.max_ns = data["max_ns"]
+        return histogram
+
+
+class LatencyRecorder:
+    """Гистограммы задержек по эндпоинтам за сессию"""
+
+    def __init__(self, iterations=20, warmup=3):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, value_ns):
+        with self._lock:
+            self.histograms.setdefault(endpoint, LatencyHistogram()).record(value_ns)
+
+    def measure(self, endpoint, call, iterations=None, warmup=None, accept_status=None):
+        """Выполнить call() warmup раз без замера и iterations раз с замером.
+
+        Возвращает гистограмму этого замера; она же добавляется в гистограмму
+        эндпоинта за сессию. Если задан accept_status, ответы с другими кодами
+        не попадают в гистограмму.
+        """
+        iterations = self.iterations if iterations is None else iterations
+        warmup = self.warmup if warmup is None else warmup
+        for _ in range(warmup):
+            call()
+        histogram = LatencyHistogram()
+        for _ in range(iterations):
+            start = time.perf_counter_ns()
+            response = call()
+            elapsed = time.perf_counter_ns() - start
+            if accept_status is None or response.status_code in accept_status:
+                histogram.record(elapsed)
+        with self._lock:
+            self.histograms.setdefault(endpoint, LatencyHistogram()).merge(histogram)
+        return histogram
+
+    def to_dict(self):
+        with self._lock:
+            return {endpoint: histogram.to_dict() for endpoint, histogram in sorted(self.histograms.items())}
+
+    def dump(self, directory):
+        """Сохранить гистограммы всех эндпоинтов в directory/latency-<время>.json"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"latency-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "endpoints": self.to_dict()}, f, ensure_ascii=False, indent=2)
+        return path
@@ -0,0 +1,134 @@
+"""Нагрузочный драйвер: N потоков-воркеров выполняют заданное число запросов,
+опционально с ограничением целевого RPS, и собирают задержки и коды ответов."""
+import math
+import threading
+import time
+from collections import Counter
+
+
+def percentile(sorted_samples, percent):
+    """Перцентиль по отсортированной выборке (метод ближайшего ранга)"""
+    if not sorted_samples:
+        return 0.0
+    rank = min(max(1, math.ceil(percent * len(sorted_samples) / 100)), len(sorted_samples))
+    return sorted_samples[rank - 1]
+
+
+class LoadResult:
+    """Результат нагрузочного прогона"""
+
+    def __init__(self, latencies_ms, outcomes, duration, expected_status):
+        self.latencies_ms = sorted(latencies_ms)
+        # outcomes: код ответа (int) или имя исключения (str) для каждого запроса
+        self.outcomes = Counter(outcomes)
+        self.duration = duration
+        self.expected_status = expected_status
+
+    @property
+    def total(self):
+        return sum(self.outcomes.values())
+
+    @property
+    def errors(self):
+        return {outcome: count for outcome, count in self.outcomes.items()
+                if outcome != self.expected_status}
+
+    @property
+    def error_rate(self):
+        return sum(self.errors.values()) / self.total if self.total else 0.0
+
+    @property
+    def throughput(self):
+        return self.total / self.duration if self.duration > 0 else 0.0
+
+    def percentile(self, percent):
+        return percentile(self.latencies_ms, percent)
+
+    def summary(self):
+        errors = ", ".join(f"{outcome}: {count}" for outcome, count in sorted(self.errors.items(), key=str)) or "нет"
+        return (f"{self.total} запросов за {self.duration:.2f} с, "
+                f"throughput={self.throughput:.1f} rps, "
+                f"p50={self.percentile(50):.1f} ms, p95={self.percentile(95):.1f} ms, "
+                f"p99={self.percentile(99):.1f} ms, "
+                f"error_rate={self.error_rate:.2%} (ошибки: {errors})")
+
+
+class LoadSlo:
+    """Пороговые значения (SLO) для нагрузочного прогона; None - не проверять"""
+
+    def __init__(self, max_p50_ms=None, max_p95_ms=None, max_p99_ms=None,
+                 max_error_rate=None, min_throughput=None):
+        self.max_p50_ms = max_p50_ms
+        self.max_p95_ms = max_p95_ms
+        self.max_p99_ms = max_p99_ms
+        self.max_error_rate = max_error_rate
+        self.min_throughput = min_throughput
+
+    def violations(self, result):
+        """Список нарушенных SLO в человекочитаемом виде"""
+        violations = []
+        for percent, limit in [(50, self.max_p50_ms), (95, self.max_p95_ms), (99, self.max_p99_ms)]:
+            if limit is not None and result.percentile(percent) > limit:
+                violations.append(f"p{percent}={result.percentile(percent):.1f} ms > {limit} ms")
+        if self.max_error_rate is not None and result.error_rate > self.max_error_rate:
+            violations.append(f"error_rate={result.error_rate:.2%} > {self.max_error_rate:.2%}")
+        if self.min_throughput is not None and result.throughput < self.min_throughput:
+            violations.append(f"throughput={result.throughput:.1f} rps < {self.min_throughput} rps")
+        return violations
+
+
+def run_load(call, workers=8, total_requests=100, target_rps=None, expected_status=200, schema=None):
+    """Выполнить total_requests вызовов call() в workers потоках.
+
+    call должен возвращать requests.Response. Если задан target_rps, запросы
+    стартуют по расписанию (i / target_rps от начала прогона), иначе - так быстро,
+    как позволяют воркеры. Если задана schema (см. schemas.py), тело каждого ответа
+    с expected_status проверяется по ней вне замера задержки; несоответствие
+    учитывается как ошибка "schema".
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    latencies_ms = []
+    outcomes = []
+    lock = threading.Lock()
+    next_ticket = [0]
+
+    def worker():
+        while True:
+            with lock:
+                ticket = next_ticket[0]
+                if ticket >= total_requests:
+                    return
+                next_ticket[0] += 1
+            if target_rps:
+                delay = start + ticket / target_rps - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            request_start = time.perf_counter()
+            response = None
+            try:
+                response = call()
+                outcome = response.status_code
+            except Exception as e:
+                # ApiClient поднимает Exception("Connection error: <url>") - группируем по префиксу
+                outcome = str(e).split(":", 1)[0] or type(e).__name__
+            latency_ms = (time.perf_counter() - request_start) * 1000
+            if schema is not None and outcome == expected_status:
+                try:
+                    if not schema.is_valid(response.json()):
+                        outcome = "schema"
+                except ValueError:
+                    outcome = "schema"
+            with lock:
+                latencies_ms.append(latency_ms)
+                outcomes.append(outcome)
+
+    threads = [threading.Thread(target=worker, name=f"load-worker-{i}", daemon=True)
+               for i in range(min(workers, total_requests) or 1)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start
+    return LoadResult(latencies_ms, outcomes, duration, expected_status)
@@ -0,0 +1,323 @@
+"""Нагрузка открытого типа (open-loop) для POST /api/1/item.
+
+В закрытой модели (load_driver.run_load) воркер отправляет следующий запрос
+только после ответа на предыдущий: когда сервис замедляется, замедляется и
+нагрузка, и очередь перед сервисом в задержках не видна (coordinated omission).
+Здесь запросы отправляются по расписанию с заданной интенсивностью прихода
+независимо от того, сколько отвечает сервис, а задержка считается от
+запланированного времени отправки, то есть включает ожидание в очереди клиента.
+
+Профиль нагрузки - последовательность ступеней Stage (интенсивность меняется
+линейно от start_rate до end_rate за duration секунд):
+    constant(50, 10)          # 50 rps 10 секунд
+    ramp(10, 200, 30)         # от 10 до 200 rps за 30 секунд
+    steps([25, 50, 100], 5)   # по 5 секунд на каждой ступени
+
+Результат разбивается на окна (не длиннее window секунд, в пределах одной
+ступени). Точка насыщения - первое окно, в котором фактическая пропускная
+способность отстает от заданной интенсивности больше чем на throughput_tolerance
+или p95 вырос больше чем в latency_factor раз относительно первого окна.
+Если одновременно выполняется max_in_flight запросов, очередной запрос не
+отправляется и учитывается как dropped.
+
+Запуск:
+    python open_loop.py --fake-server --profile ramp --start-rate 10 --end-rate 300 --duration 30
+    python open_loop.py --profile steps --rates 25,50,100,200 --step-duration 10 --output open_loop.json
+"""
+import argparse
+import json
+import math
+import sys
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+
+from api_client import DEFAULT_HOOKS, ApiClient
+from cleanup import CreatedItemRegistry
+from fake_server import FakeAdsServer
+from load_driver import LoadResult
+from payloads import PayloadGenerator
+
+DROPPED = "dropped"
+DEFAULT_MAX_IN_FLIGHT = 256
+DEFAULT_THROUGHPUT_TOLERANCE = 0.1
+DEFAULT_LATENCY_FACTOR = 3.0
+# Базовый p95 не меньше этого значения: рост с 1 до 3 мс - шум, а не насыщение
+LATENCY_BASELINE_FLOOR_MS = 5.0
+
+
+class Stage:
+    """Ступень профиля: интенсивность линейно от start_rate до end_rate rps"""
+
+    def __init__(self, start_rate, end_rate, duration):
+        if start_rate < 0 or end_rate < 0 or duration <= 0:
+            raise ValueError("rates must be >= 0 and duration > 0")
+        self.start_rate = start_rate
+        self.end_rate = end_rate
+        self.duration = duration
+
+    def rate_at(self, offset):
+        return self.start_rate + (self.end_rate - self.start_rate) * offset / self.duration
+
+    def arrivals(self):
+        """Смещения запланированных отправок от начала ступени, секунды.
+
+        i-я отправка - момент, когда накопленное число приходов
+        r0 * t + (r1 - r0) * t^2 / (2 * T) достигает i.
+        """
+        r0, r1, length = self.start_rate, self.end_rate, self.duration
+        slope = (r1 - r0) / length
+        index = 0
+        while True:
+            if slope == 0:
+                if r0 == 0:
+                    return
+                offset = index / r0
+            else:
+                # Корень квадратного уравнения slope/2 * t^2 + r0 * t - index = 0
+                offset = (-r0 + math.sqrt(r0 * r0 + 2 * slope * index)) / slope
+            if offset >= length:
+                return
+            yield offset
+            index += 1
+
+    def __repr__(self):
+        return f"Stage({self.start_rate}, {self.end_rate}, {self.duration})"
+
+
+def constant(rate, duration):
+    return [Stage(rate, rate, duration)]
+
+
+def ramp(start_rate, end_rate, duration):
+    return [Stage(start_rate, end_rate, duration)]
+
+
+def steps(rates, step_duration):
+    return [Stage(rate, rate, step_duration) for rate in rates]
+
+
+class LoadWindow:
+    """Окно прогона: заданная интенсивность и фактические показатели"""
+
+    def __init__(self, start, duration, offered_rate, result, completed, dropped):
+        self.start = start
+        self.duration = duration
+        self.offered_rate = offered_rate
+        # Запросы, запланированные в окне (задержки - от запланированного времени)
+        self.result = result
+        # Успешные ответы, полученные в окне
+        self.completed = completed
+        self.dropped = dropped
+
+    @property
+    def throughput(self):
+        """Успешных ответов в секунду"""
+        return self.completed / self.duration
+
+    def to_dict(self):
+        return {
+            "start": round(self.start, 3),
+            "duration": round(self.duration, 3),
+            "offered_rps": round(self.offered_rate, 2),
+            "throughput_rps": round(self.throughput, 2),
+            "p50_ms": round(self.result.percentile(50), 3),
+            "p95_ms": round(self.result.percentile(95), 3),
+            "p99_ms": round(self.result.percentile(99), 3),
+            "error_rate": round(self.result.error_rate, 4),
+            "dropped": self.dropped,
+        }
+
+
+class OpenLoopResult:
+    def __init__(self, windows, result, dropped, throughput_tolerance=DEFAULT_THROUGHPUT_TOLERANCE,
+                 latency_factor=DEFAULT_LATENCY_FACTOR):
+        self.windows = windows
+        # Все запросы прогона; задержки - от запланированного времени
+        self.result = result
+        self.dropped = dropped
+        self.throughput_tolerance = throughput_tolerance
+        self.latency_factor = latency_factor
+
+    def saturated(self, window):
+        if window.offered_rate <= 0:
+            return False
+        if window.throughput < window.offered_rate * (1 - self.throughput_tolerance):
+            return True
+        baseline = max(self.windows[0].result.percentile(95), LATENCY_BASELINE_FLOOR_MS)
+        return window.result.percentile(95) > baseline * self.latency_factor
+
+    @property
+    def saturation(self):
+        """Первое окно с насыщением или None"""
+        return next((window for window in self.windows if self.saturated(window)), None)
+
+    @property
+    def max_sustained_rate(self):
+        """Наибольшая заданная интенсивность среди окон до насыщения"""
+        rates = []
+        for window in self.windows:
+            if self.saturated(window):
+                break
+            rates.append(window.offered_rate)
+        return max(rates, default=0.0)
+
+    def summary(self):
+        lines = [f"{'start':>7} {'offered':>8} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                 f"{'errors':>7} {'dropped':>7}"]
+        for window in self.windows:
+            row = window.to_dict()
+            mark = "  <- saturated" if self.saturated(window) else ""
+            lines.append(f"{row['start']:7.1f} {row['offered_rps']:8.1f} {row['throughput_rps']:8.1f} "
+                         f"{row['p50_ms']:9.1f} {row['p95_ms']:9.1f} {row['p99_ms']:9.1f} "
+                         f"{row['error_rate']:7.2%} {row['dropped']:7d}{mark}")
+        saturation = self.saturation
+        if saturation is None:
+            lines.append(f"Насыщение не достигнуто, максимальная интенсивность {self.max_sustained_rate:.1f} rps")
+        else:
+            lines.append(f"Насыщение при {saturation.offered_rate:.1f} rps (t={saturation.start:.1f} с), "
+                         f"устойчиво до {self.max_sustained_rate:.1f} rps")
+        lines.append(self.result.summary() + f", dropped={self.dropped}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        saturation = self.saturation
+        return {
+            "windows": [window.to_dict() for window in self.windows],
+            "saturation_rps": saturation.offered_rate if saturation else None,
+            "max_sustained_rps": self.max_sustained_rate,
+            "total": self.result.total,
+            "dropped": self.dropped,
+            "p95_ms": self.result.percentile(95),
+            "error_rate": self.result.error_rate,
+        }
+
+
+def _outcome(call, argument):
+    try:
+        return (call(argument) if argument is not None else call()).status_code
+    except Exception as e:
+        # ApiClient поднимает Exception("Connection error: <url>") - группируем по префиксу
+        return str(e).split(":", 1)[0] or type(e).__name__
+
+
+def run_open_loop(call, profile, payloads=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT, window=1.0,
+                  expected_status=200, throughput_tolerance=DEFAULT_THROUGHPUT_TOLERANCE,
+                  latency_factor=DEFAULT_LATENCY_FACTOR):
+    """Выполнить профиль profile (список Stage), вызывая call по расписанию.
+
+    call должен возвращать requests.Response; если задан итератор payloads,
+    call получает очередной его элемент (например, тело объявления).
+    """
+    records = []
+    lock = threading.Lock()
+    in_flight = [0]
+
+    # Запись: (ступень, запланировано, получен ответ - секунды от начала; задержка, мс; исход)
+    def send(stage_index, intended, argument):
+        outcome = _outcome(call, argument)
+        finished = time.perf_counter()
+        with lock:
+            in_flight[0] -= 1
+            records.append((stage_index, intended - start, finished - start, (finished - intended) * 1000, outcome))
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="open-loop") as executor:
+        start = time.perf_counter()
+        stage_start = start
+        for stage_index, stage in enumerate(profile):
+            for offset in stage.arrivals():
+                intended = stage_start + offset
+                delay = intended - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                argument = next(payloads) if payloads is not None else None
+                with lock:
+                    if in_flight[0] >= max_in_flight:
+                        records.append((stage_index, intended - start, None, None, DROPPED))
+                        continue
+                    in_flight[0] += 1
+                executor.submit(send, stage_index, intended, argument)
+            stage_start += stage.duration
+    duration = time.perf_counter() - start
+
+    sent = [record for record in records if record[4] != DROPPED]
+    completions = sorted(record[2] for record in sent if record[4] == expected_status)
+    windows = []
+    stage_start = 0.0
+    for stage_index, stage in enumerate(profile):
+        count = max(1, math.ceil(stage.duration / window - 1e-9))
+        length = stage.duration / count
+        for number in range(count):
+            begin = stage_start + number * length
+            end = begin + length
+            selected = [record for record in records if record[0] == stage_index and begin <= record[1] < end]
+            window_sent = [record for record in selected if record[4] != DROPPED]
+            result = LoadResult([record[3] for record in window_sent], [record[4] for record in window_sent],
+                                length, expected_status)
+            completed = bisect_left(completions, end) - bisect_left(completions, begin)
+            offered = (stage.rate_at(begin - stage_start) + stage.rate_at(end - stage_start)) / 2
+            windows.append(LoadWindow(begin, length, offered, result, completed, len(selected) - len(window_sent)))
+        stage_start += stage.duration
+
+    result = LoadResult([record[3] for record in sent], [record[4] for record in sent], duration, expected_status)
+    return OpenLoopResult(windows, result, len(records) - len(sent), throughput_tolerance, latency_factor)
+
+
+def build_profile(args):
+    if args.profile == "constant":
+        return constant(args.rate, args.duration)
+    if args.profile == "ramp":
+        return ramp(args.start_rate, args.end_rate, args.duration)
+    return steps([float(rate) for rate in args.rates.split(",")], args.step_duration)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=["constant", "ramp", "steps"], default="constant")
+    parser.add_argument("--rate", type=float, default=50, help="Интенсивность для constant, rps")
+    parser.add_argument("--start-rate", type=float, default=10, help="Начальная интенсивность для ramp, rps")
+    parser.add_argument("--end-rate", type=float, default=200, help="Конечная интенсивность для ramp, rps")
+    parser.add_argument("--duration", type=float, default=10, help="Длительность constant и ramp, секунды")
+    parser.add_argument("--rates", default="25,50,100,200", help="Ступени для steps через запятую, rps")
+    parser.add_argument("--step-duration", type=float, default=5, help="Длительность ступени steps, секунды")
+    parser.add_argument("--window", type=float, default=1.0, help="Окно отчета, секунды")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="Максимум одновременных запросов; сверх него запросы отбрасываются")
+    parser.add_argument("--throughput-tolerance", type=float, default=DEFAULT_THROUGHPUT_TOLERANCE,
+                        help="Допустимое отставание пропускной способности от интенсивности")
+    parser.add_argument("--latency-factor", type=float, default=DEFAULT_LATENCY_FACTOR,
+                        help="Рост p95 относительно первого окна, считающийся насыщением")
+    parser.add_argument("--seed", default=None, help="Seed генератора тел объявлений")
+    parser.add_argument("--base-url", default=None, help="Базовый URL сервиса")
+    parser.add_argument("--fake-server", action="store_true", help="Запустить локальный fake_server.py")
+    parser.add_argument("--keep-items", action="store_true", help="Не удалять созданные объявления")
+    parser.add_argument("--output", default=None, help="Сохранить окна и точку насыщения в JSON")
+    args = parser.parse_args(argv)
+
+    server = FakeAdsServer().start() if args.fake_server else None
+    api_client = ApiClient(base_url=server.url if server else args.base_url, pool_maxsize=args.max_in_flight)
+    registry = None if args.keep_items else CreatedItemRegistry(api_client.base_url).attach(DEFAULT_HOOKS)
+    try:
+        generator = PayloadGenerator(seed=args.seed)
+        print(f"seed={generator.seed}", file=sys.stderr)
+        result = run_open_loop(
+            api_client.create_item, build_profile(args), payloads=generator.stream(),
+            max_in_flight=args.max_in_flight, window=args.window,
+            throughput_tolerance=args.throughput_tolerance, latency_factor=args.latency_factor
+        )
+        print(result.summary())
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+    finally:
+        if registry is not None:
+            registry.detach()
+            print(registry.cleanup(api_client, workers=16).summary())
+        if server is not None:
+            server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Генератор тел запросов POST /api/1/item.
+
+PayloadGenerator выдает воспроизводимые (один seed - одна и та же
+последовательность) тела объявлений:
+- valid() - валидное объявление с уникальным названием "<prefix> <tag>-<n>",
+  где tag выводится из seed, а n - номер в последовательности;
+- stream(count) - ленивый поток валидных тел для нагрузочных прогонов,
+  ничего не накапливает в памяти;
+- cases() - обход граничных значений: каждое поле по очереди заменяется
+  значением из таблиц ниже, остальные поля валидны;
+- fuzz(count) - ленивый поток случайных мутаций с заданной долей невалидных.
+
+cases() и fuzz() выдают Payload с ожидаемым результатом: valid=True - сервис
+должен создать объявление (200), False - вернуть 400. documented=True - ожидание
+следует из контракта (TESTCASES.md и BUGS.md): все поля обязательны, sellerID -
+111111-999999, name - непустая строка, price - положительное число до INT32_MAX,
+статистика - неотрицательные числа до INT32_MAX. Остальные случаи (таблицы
+*_EXPLORATORY: значения больше INT32_MAX, другие типы, длинные названия,
+управляющие символы) - предположения, контрактом не описанные.
+
+Запуск (печать тел в JSONL, например для fuzz-прогона внешним инструментом):
+    python payloads.py --seed 42 --count 1000000 > payloads.jsonl
+    python payloads.py --mode cases
+    python payloads.py --mode fuzz --invalid-ratio 0.3 --count 10000
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import zlib
+
+from test_data import SELLER_ID_MAX, SELLER_ID_MIN
+
+INT32_MAX = 2 ** 31 - 1
+INT64_MAX = 2 ** 63 - 1
+STATISTICS_FIELDS = ("likes", "viewCount", "contacts")
+MISSING = object()
+
+# (значение, валидно): ожидания из контракта
+SELLER_ID_BOUNDARIES = [
+    (SELLER_ID_MIN, True), (SELLER_ID_MIN + 1, True), (SELLER_ID_MAX - 1, True), (SELLER_ID_MAX, True),
+    (SELLER_ID_MIN - 1, False), (SELLER_ID_MAX + 1, False), (0, False), (-SELLER_ID_MIN, False), (MISSING, False),
+]
+PRICE_BOUNDARIES = [
+    (1, True), (2, True), (INT32_MAX, True),
+    (0, False), (-1, False), (-INT32_MAX - 1, False), (MISSING, False),
+]
+STATISTIC_BOUNDARIES = [
+    (0, True), (1, True), (INT32_MAX, True),
+    (-1, False), (-INT32_MAX - 1, False),
+]
+STATISTICS_OBJECT_BOUNDARIES = [
+    (MISSING, False),
+]
+NAME_CHARSETS = {
+    "ascii": "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 ",
+    "cyrillic": "абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ ",
+    "special": "!\"#$%&'()*+,-./:;<=>?@[\\]^_`{|}~",
+}
+NAME_LENGTHS = [1, 2, 16]
+NAME_BOUNDARIES = [
+    ("", False), (MISSING, False),
+]
+
+# Предположения вне контракта: другие типы, значения больше INT32_MAX, длина и состав названия
+SELLER_ID_EXPLORATORY = [
+    (float(SELLER_ID_MIN), False), (str(SELLER_ID_MIN), False), (True, False), (None, False),
+]
+PRICE_EXPLORATORY = [
+    (INT32_MAX + 1, True), (INT64_MAX, True), (1.5, False), ("100", False), (None, False),
+]
+STATISTIC_EXPLORATORY = [
+    (INT64_MAX, True), (1.5, False), ("1", False), (None, False), (MISSING, False),
+]
+STATISTICS_OBJECT_EXPLORATORY = [
+    ("not_an_object", False), ([], False), (None, False),
+]
+NAME_CHARSETS_EXPLORATORY = {
+    "emoji": "🐸🚀🔥✓€™©😀👍🏽",
+    "control": "\t\n\r​ ",
+}
+NAME_LENGTHS_EXPLORATORY = [255, 256, 1000, 4096]
+NAME_EXPLORATORY = [
+    (" ", True), ("test'; DROP TABLE items; --", True), ("<script>alert('xss')</script>", True),
+    ("../../etc/passwd", True), ("%00", True), (12345, False), (None, False), (["name"], False),
+]
+
+
+class Payload:
+    """Тело запроса, описание случая, ожидаемая валидность и источник ожидания"""
+    __slots__ = ("data", "case", "valid", "documented")
+
+    def __init__(self, data, case, valid, documented=True):
+        self.data = data
+        self.case = case
+        self.valid = valid
+        self.documented = documented
+
+    def __repr__(self):
+        return f"Payload({self.case!r}, valid={self.valid}, documented={self.documented})"
+
+
+def _set(data, path, value):
+    target = data
+    for key in path[:-1]:
+        target = target[key]
+    if value is MISSING:
+        del target[path[-1]]
+    else:
+        target[path[-1]] = value
+
+
+class PayloadGenerator:
+    def __init__(self, seed=None, seller_ids=None, name_prefix="Test Item"):
+        """seller_ids - функция без аргументов, возвращающая sellerID
+        (например, test_data.generate_seller_id); по умолчанию - случайный
+        sellerID из допустимого диапазона."""
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.tag = format(zlib.crc32(str(seed).encode("utf-8")), "08x")
+        self.name_prefix = name_prefix
+        self._rng = random.Random(seed)
+        self._seller_ids = seller_ids
+        self._numbers = itertools.count(1)
+        self._mutations = self._build_mutations()
+
+    def name(self):
+        return f"{self.name_prefix} {self.tag}-{next(self._numbers)}"
+
+    def valid(self):
+        """Валидное тело с уникальным названием и случайными значениями"""
+        rng = self._rng.randrange
+        return {
+            "sellerID": self._seller_ids() if self._seller_ids else rng(SELLER_ID_MIN, SELLER_ID_MAX + 1),
+            "name": self.name(),
+            "price": rng(1, 1000000),
+            "statistics": {"likes": rng(1, 1000), "viewCount": rng(1, 100000), "contacts": rng(1, 1000)},
+        }
+
+    def stream(self, count=None):
+        """Ленивый поток из count валидных тел (бесконечный, если count=None)"""
+        return itertools.islice(iter(self.valid, None), count)
+
+    def _build_mutations(self):
+        """[(описание, путь к полю, значение или функция rng -> значение, валидно, из контракта)]"""
+        mutations = []
+
+        def add(path, value, valid, documented, case=None):
+            if case is None:
+                field = ".".join(path)
+                case = f"{field} missing" if value is MISSING else f"{field}={value!r}"
+            mutations.append((case, path, value, valid, documented))
+
+        def add_values(path, boundaries, exploratory):
+            for value, valid in boundaries:
+                add(path, value, valid, True)
+            for value, valid in exploratory:
+                add(path, value, valid, False)
+
+        def add_names(charsets, lengths, documented):
+            for charset, alphabet in charsets.items():
+                # Название только из пробельных символов контрактом не описано
+                first = alphabet.strip() if documented else alphabet
+                for length in lengths:
+                    def make_name(rng, first=first, alphabet=alphabet, length=length):
+                        return rng.choice(first) + "".join(rng.choices(alphabet, k=length - 1))
+                    add(("name",), make_name, True, documented, case=f"name={charset}[{length}]")
+
+        add_values(("sellerID",), SELLER_ID_BOUNDARIES, SELLER_ID_EXPLORATORY)
+        add_values(("price",), PRICE_BOUNDARIES, PRICE_EXPLORATORY)
+        add_values(("statistics",), STATISTICS_OBJECT_BOUNDARIES, STATISTICS_OBJECT_EXPLORATORY)
+        for field in STATISTICS_FIELDS:
+            add_values(("statistics", field), STATISTIC_BOUNDARIES, STATISTIC_EXPLORATORY)
+        add_names(NAME_CHARSETS, NAME_LENGTHS, True)
+        add_names(NAME_CHARSETS, NAME_LENGTHS_EXPLORATORY, False)
+        add_names(NAME_CHARSETS_EXPLORATORY, NAME_LENGTHS + NAME_LENGTHS_EXPLORATORY, False)
+        add_values(("name",), NAME_BOUNDARIES, NAME_EXPLORATORY)
+        return mutations
+
+    def _mutate(self, mutation):
+        case, path, value, valid, documented = mutation
+        data = self.valid()
+        _set(data, path, value(self._rng) if callable(value) else value)
+        return Payload(data, case, valid, documented)
+
+    def cases(self):
+        """Граничные значения каждого поля по одному, остальные поля валидны"""
+        return map(self._mutate, self._mutations)
+
+    def fuzz(self, count=None, invalid_ratio=0.2):
+        """Ленивый поток случайных мутаций; доля невалидных - invalid_ratio"""
+        valid_mutations = [mutation for mutation in self._mutations if mutation[3]]
+        invalid_mutations = [mutation for mutation in self._mutations if not mutation[3]]
+        rng = self._rng
+        for _ in (range(count) if count is not None else itertools.count()):
+            if rng.random() < invalid_ratio:
+                yield self._mutate(rng.choice(invalid_mutations))
+            else:
+                yield self._mutate(rng.choice(valid_mutations))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["valid", "cases", "fuzz"], default="valid",
+                        help="valid - поток валидных тел, cases - граничные значения, fuzz - случайные мутации")
+    parser.add_argument("--seed", default=None, help="Seed последовательности")
+    parser.add_argument("--count", type=int, default=None, help="Количество тел (для valid и fuzz)")
+    parser.add_argument("--invalid-ratio", type=float, default=0.2, help="Доля невалидных тел в режиме fuzz")
+    args = parser.parse_args(argv)
+
+    generator = PayloadGenerator(seed=args.seed)
+    print(f"seed={generator.seed}", file=sys.stderr)
+    if args.mode == "valid":
+        payloads = (Payload(data, "valid", True) for data in generator.stream(args.count))
+    elif args.mode == "cases":
+        payloads = generator.cases()
+    else:
+        payloads = generator.fuzz(args.count, args.invalid_ratio)
+    write = sys.stdout.write
+    for payload in payloads:
+        write(json.dumps({"case": payload.case, "valid": payload.valid, "documented": payload.documented,
+                          "data": payload.data}, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
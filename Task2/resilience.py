@@ -0,0 +1,214 @@
+"""Повторы запросов с экспоненциальной задержкой и джиттером, бюджет повторов
+и circuit breaker по эндпоинтам для ApiClient."""
+import random
+import threading
+import time
+from collections import deque
+
+IDEMPOTENT_METHODS = frozenset(["GET", "DELETE"])
+RETRY_STATUSES = frozenset([502, 503, 504])
+
+
+class RetryBudget:
+    """Ограничение доли повторов: каждый запрос добавляет ratio токенов,
+    каждый повтор тратит один. min_tokens - запас на случай малого трафика."""
+
+    def __init__(self, ratio=0.2, min_tokens=10):
+        self.ratio = ratio
+        self.max_tokens = max(min_tokens, 1)
+        self._tokens = float(self.max_tokens)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self):
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class RetryPolicy:
+    """Политика повторов для идемпотентных методов.
+
+    Повторяются ошибки соединения/таймауты и ответы с кодами из retry_statuses.
+    Задержка перед n-м повтором - случайная в [0, min(backoff_max, backoff_base * 2**n)]
+    (full jitter). Счетчики показывают усиление нагрузки повторами.
+    """
+
+    def __init__(self, max_attempts=3, backoff_base=0.1, backoff_max=2.0,
+                 retry_methods=IDEMPOTENT_METHODS, retry_statuses=RETRY_STATUSES,
+                 budget=None, sleep=time.sleep):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be >= 1")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+        self.retry_statuses = frozenset(retry_statuses)
+        self.budget = budget if budget is not None else RetryBudget()
+        self.sleep = sleep
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "attempts": 0, "retries": 0, "budget_exhausted": 0,
+                         "gave_up": 0, "deadline_exceeded": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    @property
+    def amplification(self):
+        """Среднее число попыток на запрос"""
+        with self._lock:
+            requests_count = self.counters["requests"]
+            return self.counters["attempts"] / requests_count if requests_count else 0.0
+
+    def is_retryable(self, method):
+        return method.upper() in self.retry_methods and self.max_attempts > 1
+
+    def backoff(self, retry_number):
+        with self._lock:
+            return self._rng.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry_number))
+
+    def call(self, method, send, should_retry, deadline=None):
+        """Выполнить send() с повторами.
+
+        should_retry(result, error) решает, нужен ли повтор. Возвращает результат
+        последней попытки или поднимает ее исключение. Повтор не выполняется,
+        если задержка перед ним не укладывается в оставшееся до deadline время.
+        """
+        self._count("requests")
+        self.budget.deposit()
+        retryable = self.is_retryable(method)
+        attempt = 0
+        while True:
+            attempt += 1
+            self._count("attempts")
+            result, error = None, None
+            try:
+                result = send()
+            except Exception as e:
+                error = e
+            if not retryable or not should_retry(result, error):
+                break
+            if attempt >= self.max_attempts:
+                self._count("gave_up")
+                break
+            delay = self.backoff(attempt - 1)
+            if deadline is not None and delay >= deadline.remaining():
+                self._count("deadline_exceeded")
+                break
+            if not self.budget.try_withdraw():
+                self._count("budget_exhausted")
+                break
+            self._count("retries")
+            if result is not None:
+                # Освобождаем соединение перед повтором
+                result.close()
+            self.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+
+class CircuitOpenError(Exception):
+    """Запрос отклонен без отправки: circuit breaker эндпоинта разомкнут"""
+
+
+class CircuitBreaker:
+    """Circuit breaker одного эндпоинта по доле ошибок в скользящем окне.
+
+    closed -> open, когда среди последних window_size запросов (не меньше
+    min_requests) доля ошибок >= failure_threshold. Через reset_timeout секунд
+    пропускается один пробный запрос (half_open): успех замыкает цепь, ошибка
+    снова размыкает.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=0.5, window_size=20, min_requests=10,
+                 reset_timeout=5.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.min_requests = min_requests
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.counters = {"successes": 0, "failures": 0, "opened": 0, "short_circuited": 0}
+
+    def allow(self):
+        """Можно ли отправить запрос сейчас"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.clock() - self._opened_at < self.reset_timeout:
+                    self.counters["short_circuited"] += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    self.counters["short_circuited"] += 1
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    def record(self, success):
+        with self._lock:
+            self.counters["successes" if success else "failures"] += 1
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if success:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (len(self._outcomes) >= self.min_requests
+                    and failures / len(self._outcomes) >= self.failure_threshold):
+                self._open()
+
+    def release(self):
+        """Запрос завершился без исхода (например, истек дедлайн вызывающего):
+        пробный запрос half-open цепи больше не считается выполняющимся"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+        self.counters["opened"] += 1
+
+
+class CircuitBreakerRegistry:
+    """Circuit breaker'ы по ключу эндпоинта; enabled=False отключает проверку"""
+
+    def __init__(self, enabled=True, **breaker_options):
+        self.enabled = enabled
+        self.breaker_options = breaker_options
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, endpoint):
+        with self._lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                breaker = CircuitBreaker(**self.breaker_options)
+                self.breakers[endpoint] = breaker
+            return breaker
+
+    def counters(self):
+        with self._lock:
+            return {endpoint: dict(breaker.counters, state=breaker.state)
+                    for endpoint, breaker in self.breakers.items()}
@@ -0,0 +1,389 @@
+"""Смешанная нагрузка по сценарию из JSON-файла.
+
+Виртуальные пользователи (корутины asyncio поверх AsyncApiClient) в цикле
+выбирают поток действий с учетом весов, выполняют его шаги по порядку и
+делают паузы между шагами. Отчет - задержки и пропускная способность по
+каждому шагу каждого потока.
+
+Формат сценария (см. scenarios/production_mix.json):
+    {
+      "name": "production-mix",
+      "users": 20,              # виртуальных пользователей
+      "duration": 30,           # секунд (или "iterations" - потоков на пользователя)
+      "ramp_up": 5,             # пользователи стартуют равномерно за ramp_up секунд
+      "think_time": [0.5, 2],   # пауза после шага: число или [min, max], секунды
+      "seed": 1,
+      "setup": {"items": 20},   # объявления, которые читают потоки без своего объявления
+      "flows": [
+        {"name": "view_item", "weight": 60, "steps": [{"call": "get_item"}, {"call": "get_statistics"}]},
+        {"name": "lifecycle", "weight": 5, "think_time": 1,
+         "steps": [{"call": "create_item"}, {"call": "get_item"}, {"call": "delete_item", "expect": [200]}]}
+      ]
+    }
+
+Шаги вызывают одноименные методы ApiClient. Аргументы берутся из сессии
+пользователя: create_item создает объявление генератором payloads.py и
+запоминает его ID и sellerID; get_item, get_statistics, get_statistics_v2 и
+delete_item используют объявление сессии, а если его нет - случайное из setup;
+get_seller_items - sellerID сессии или объявления из setup. delete_item
+удаляет только объявление, созданное в этом же потоке; следующие шаги
+обращаются к удаленному объявлению (например, чтобы проверить 404 через
+expect). Поток начинается с пустой сессии. Ожидаемый код ответа шага -
+expect: код или список кодов (по умолчанию 200). Шаг, для которого не нашлось
+объявления, не выполняется и учитывается в skipped.
+
+Запуск:
+    python scenarios.py scenarios/production_mix.json --fake-server
+    python scenarios.py scenarios/production_mix.json --users 100 --duration 300 --output mix.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from api_client import DEFAULT_HOOKS, ApiClient, extract_item_id
+from async_api_client import AsyncApiClient
+from cleanup import CreatedItemRegistry
+from fake_server import FakeAdsServer
+from item_pool import ItemPool
+from load_driver import LoadResult
+from payloads import PayloadGenerator
+
+CALLS = ("create_item", "get_item", "get_seller_items", "get_statistics", "get_statistics_v2", "delete_item")
+
+
+def _think_time(value, where):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and value >= 0:
+        return (float(value), float(value))
+    if isinstance(value, list) and len(value) == 2 and 0 <= value[0] <= value[1]:
+        return (float(value[0]), float(value[1]))
+    raise ValueError(f"{where}: think_time must be a number or [min, max]")
+
+
+def _expect(value, where):
+    """Ожидаемые коды ответа: число или непустой список чисел"""
+    if value is None:
+        return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return [value]
+    if (isinstance(value, list) and value
+            and all(isinstance(code, int) and not isinstance(code, bool) for code in value)):
+        return value
+    raise ValueError(f"{where}: expect must be a status code or a list of status codes, got {value!r}")
+
+
+class Step:
+    def __init__(self, call, name=None, expect=None, think_time=None):
+        self.call = call
+        self.name = name or call
+        self.expect = expect or [200]
+        self.think_time = think_time
+
+
+class Flow:
+    def __init__(self, name, weight, steps, think_time=None):
+        self.name = name
+        self.weight = weight
+        self.steps = steps
+        self.think_time = think_time
+
+
+class Scenario:
+    def __init__(self, name, flows, users=10, duration=None, iterations=None, ramp_up=0.0,
+                 think_time=(0.0, 0.0), seed=None, setup_items=10):
+        self.name = name
+        self.flows = flows
+        self.users = users
+        self.duration = duration
+        self.iterations = iterations
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.seed = seed
+        self.setup_items = setup_items
+
+    @classmethod
+    def from_dict(cls, data):
+        """Сценарий из словаря; ошибки формата - ValueError с указанием места"""
+        flows = []
+        for index, flow in enumerate(data.get("flows") or []):
+            where = f"flows[{index}]"
+            if not isinstance(flow.get("weight", 1), (int, float)) or flow.get("weight", 1) <= 0:
+                raise ValueError(f"{where}: weight must be positive")
+            steps = []
+            for step_index, step in enumerate(flow.get("steps") or []):
+                step_where = f"{where}.steps[{step_index}]"
+                if step.get("call") not in CALLS:
+                    raise ValueError(f"{step_where}: unknown call {step.get('call')!r}, expected one of {CALLS}")
+                steps.append(Step(step["call"], step.get("name"), _expect(step.get("expect"), step_where),
+                                  _think_time(step.get("think_time"), step_where)))
+            if not steps:
+                raise ValueError(f"{where}: flow has no steps")
+            names = [step.name for step in steps]
+            if len(set(names)) != len(names):
+                raise ValueError(f"{where}: step names must be unique within a flow, got {names}")
+            flows.append(Flow(flow.get("name") or f"flow{index}", flow.get("weight", 1), steps,
+                              _think_time(flow.get("think_time"), where)))
+        if not flows:
+            raise ValueError("scenario has no flows")
+        if data.get("duration") is None and data.get("iterations") is None:
+            raise ValueError("scenario needs duration or iterations")
+        return cls(
+            name=data.get("name", "scenario"),
+            flows=flows,
+            users=data.get("users", 10),
+            duration=data.get("duration"),
+            iterations=data.get("iterations"),
+            ramp_up=data.get("ramp_up", 0.0),
+            think_time=_think_time(data.get("think_time", 0), "scenario"),
+            seed=data.get("seed"),
+            setup_items=data.get("setup", {}).get("items", 10),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @property
+    def needs_setup(self):
+        """Нужны ли объявления из setup: шаг чтения встречается до create_item потока"""
+        for flow in self.flows:
+            for step in flow.steps:
+                if step.call == "create_item":
+                    break
+                if step.call != "delete_item":
+                    return True
+        return False
+
+
+class StepResult(LoadResult):
+    """Результат шага; допустимых кодов ответа может быть несколько.
+
+    skipped - сколько раз шаг не выполнялся: не нашлось объявления для запроса.
+    """
+
+    def __init__(self, latencies_ms, outcomes, duration, expected, skipped=0):
+        super().__init__(latencies_ms, outcomes, duration, expected_status=expected[0])
+        self.expected = expected
+        self.skipped = skipped
+
+    @property
+    def errors(self):
+        return {outcome: count for outcome, count in self.outcomes.items() if outcome not in self.expected}
+
+
+class ScenarioResult:
+    def __init__(self, scenario, samples, flows, duration, skipped=None):
+        self.scenario = scenario
+        self.duration = duration
+        # Завершенные потоки по именам
+        self.flows = flows
+        skipped = skipped or {}
+        # StepResult по шагам: ключ "поток.шаг"
+        self.steps = {key: StepResult(latencies, outcomes, duration, expected, skipped.get(key, 0))
+                      for key, (latencies, outcomes, expected) in samples.items()}
+
+    @property
+    def total(self):
+        return sum(result.total for result in self.steps.values())
+
+    @property
+    def throughput(self):
+        return self.total / self.duration if self.duration > 0 else 0.0
+
+    def summary(self):
+        lines = [f"Сценарий {self.scenario.name}: {self.scenario.users} пользователей, {self.duration:.1f} с, "
+                 f"{self.total} запросов, {self.throughput:.1f} rps",
+                 f"{'step':<32} {'count':>7} {'share':>6} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                 f"{'errors':>7}"]
+        for key, result in self.steps.items():
+            lines.append(f"{key:<32} {result.total:7d} {result.total / (self.total or 1):6.1%} {result.throughput:8.1f} "
+                         f"{result.percentile(50):8.1f} {result.percentile(95):8.1f} {result.percentile(99):8.1f} "
+                         f"{result.error_rate:7.2%}")
+        flows = ", ".join(f"{name}: {count}" for name, count in self.flows.items())
+        lines.append(f"Потоков выполнено: {flows}")
+        skipped = ", ".join(f"{key}: {result.skipped}" for key, result in self.steps.items() if result.skipped)
+        if skipped:
+            lines.append(f"Пропущено шагов без объявления: {skipped}")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {
+            "scenario": self.scenario.name,
+            "users": self.scenario.users,
+            "duration": round(self.duration, 3),
+            "total": self.total,
+            "throughput_rps": round(self.throughput, 2),
+            "flows": self.flows,
+            "steps": {
+                key: {
+                    "count": result.total,
+                    "throughput_rps": round(result.throughput, 2),
+                    "p50_ms": round(result.percentile(50), 3),
+                    "p95_ms": round(result.percentile(95), 3),
+                    "p99_ms": round(result.percentile(99), 3),
+                    "errors": {str(outcome): count for outcome, count in result.errors.items()},
+                    "skipped": result.skipped,
+                }
+                for key, result in self.steps.items()
+            },
+        }
+
+
+class VirtualUser:
+    """Состояние пользователя: свой генератор случайных чисел и тел объявлений.
+
+    При заданном seed сценария у каждого пользователя своя воспроизводимая
+    последовательность, не зависящая от порядка выполнения корутин.
+    """
+
+    def __init__(self, index, seed=None):
+        self.index = index
+        user_seed = f"{seed}-{index}" if seed is not None else None
+        self.rng = random.Random(user_seed)
+        self.payloads = PayloadGenerator(seed=user_seed)
+
+
+class ScenarioRunner:
+    def __init__(self, scenario, async_client, pool=None):
+        self.scenario = scenario
+        self.client = async_client
+        self.pool = pool
+        self._samples = {
+            f"{flow.name}.{step.name}": ([], [], step.expect) for flow in scenario.flows for step in flow.steps
+        }
+        self._flows = {flow.name: 0 for flow in scenario.flows}
+        self._skipped = {key: 0 for key in self._samples}
+        self._deadline = None
+
+    def _pool_item(self, user):
+        if self.pool is None:
+            return None
+        return user.rng.choice(self.pool.items)
+
+    def _arguments(self, user, step, session):
+        """Аргументы вызова шага или None, если вызывать не с чем"""
+        if step.call == "create_item":
+            return (user.payloads.valid(),)
+        if step.call == "delete_item":
+            return (session["item_id"],) if session.get("item_id") else None
+        if step.call == "get_seller_items":
+            if session.get("seller_id"):
+                return (session["seller_id"],)
+            item = self._pool_item(user)
+            return (item.data["sellerID"],) if item else None
+        if session.get("item_id"):
+            return (session["item_id"],)
+        item = self._pool_item(user)
+        return (item.id,) if item else None
+
+    async def _step(self, user, flow, step, session):
+        latencies, outcomes, _ = self._samples[f"{flow.name}.{step.name}"]
+        arguments = self._arguments(user, step, session)
+        if arguments is None:
+            # Запрос не отправлялся: ни задержки, ни исхода у него нет
+            self._skipped[f"{flow.name}.{step.name}"] += 1
+            return
+        started = time.perf_counter()
+        try:
+            response = await getattr(self.client, step.call)(*arguments)
+            outcome = response.status_code
+        except Exception as e:
+            response = None
+            outcome = str(e).split(":", 1)[0] or type(e).__name__
+        latencies.append((time.perf_counter() - started) * 1000)
+        outcomes.append(outcome)
+        if step.call == "create_item" and outcome == 200:
+            session["item_id"] = extract_item_id(response.json())
+            session["seller_id"] = arguments[0]["sellerID"]
+
+    async def _think(self, user, flow, step):
+        low, high = step.think_time or flow.think_time or self.scenario.think_time
+        delay = user.rng.uniform(low, high)
+        if self._deadline is not None:
+            delay = min(delay, max(0.0, self._deadline - time.perf_counter()))
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _user(self, index):
+        scenario = self.scenario
+        user = VirtualUser(index, scenario.seed)
+        if scenario.ramp_up and scenario.users > 1:
+            await asyncio.sleep(scenario.ramp_up * index / scenario.users)
+        weights = [flow.weight for flow in scenario.flows]
+        iteration = 0
+        while scenario.iterations is None or iteration < scenario.iterations:
+            if self._deadline is not None and time.perf_counter() >= self._deadline:
+                return
+            flow = user.rng.choices(scenario.flows, weights)[0]
+            session = {}
+            # Поток выполняется до конца, даже если время вышло: созданное объявление удаляется
+            for step in flow.steps:
+                await self._step(user, flow, step, session)
+                await self._think(user, flow, step)
+            self._flows[flow.name] += 1
+            iteration += 1
+
+    async def run(self):
+        started = time.perf_counter()
+        if self.scenario.duration is not None:
+            self._deadline = started + self.scenario.duration
+        await asyncio.gather(*[self._user(index) for index in range(self.scenario.users)])
+        duration = time.perf_counter() - started
+        samples = {key: value for key, value in self._samples.items() if value[1] or self._skipped[key]}
+        return ScenarioResult(self.scenario, samples, dict(self._flows), duration, dict(self._skipped))
+
+
+def run_scenario(scenario, base_url=None, pool=None):
+    """Выполнить сценарий: объявления для setup создаются заранее, если pool не передан"""
+    if pool is None and scenario.needs_setup and scenario.setup_items:
+        pool = ItemPool.create(scenario.setup_items, base_url=base_url)
+
+    async def run():
+        async with AsyncApiClient(max_concurrency=scenario.users, base_url=base_url) as client:
+            return await ScenarioRunner(scenario, client, pool=pool).run()
+
+    return asyncio.run(run())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenario", help="JSON-файл сценария")
+    parser.add_argument("--users", type=int, default=None, help="Переопределить число пользователей")
+    parser.add_argument("--duration", type=float, default=None, help="Переопределить длительность, секунды")
+    parser.add_argument("--base-url", default=None, help="Базовый URL сервиса")
+    parser.add_argument("--fake-server", action="store_true", help="Запустить локальный fake_server.py")
+    parser.add_argument("--keep-items", action="store_true", help="Не удалять созданные объявления")
+    parser.add_argument("--output", default=None, help="Сохранить результаты по шагам в JSON")
+    args = parser.parse_args(argv)
+
+    scenario = Scenario.load(args.scenario)
+    if args.users is not None:
+        scenario.users = args.users
+    if args.duration is not None:
+        scenario.duration, scenario.iterations = args.duration, None
+
+    server = FakeAdsServer().start() if args.fake_server else None
+    api_client = ApiClient(base_url=server.url if server else args.base_url)
+    registry = None if args.keep_items else CreatedItemRegistry(api_client.base_url).attach(DEFAULT_HOOKS)
+    try:
+        result = run_scenario(scenario, base_url=api_client.base_url)
+        print(result.summary())
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+    finally:
+        if registry is not None:
+            registry.detach()
+            print(registry.cleanup(api_client, workers=16).summary())
+        if server is not None:
+            server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
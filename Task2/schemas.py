@@ -0,0 +1,181 @@
+"""Схемы ответов API и компилируемые валидаторы.
+
+Схема описывает поля объекта: имя -> тип Python или вложенная схема.
+При создании схема один раз компилируется в две функции:
+- is_valid(value) - цепочка проверок типов без выделения памяти,
+  быстрый путь для проверки каждого ответа в нагрузочных прогонах;
+- errors(value, path) - все нарушения за один проход в виде строк
+  "$[3].statistics.likes: expected int, got str".
+
+ListOf проверяет список целиком быстрым путем и строит подробный отчет
+только для невалидных элементов, поэтому список из 10k объявлений
+проверяется за миллисекунды.
+
+Типы проверяются строго (type(value) is int): bool и float не считаются int,
+как и в JSON-схеме сервиса. Лишние поля допускаются.
+"""
+import itertools
+
+_MISSING = object()
+_TYPE_NAMES = {dict: "object", list: "array", str: "str", int: "int", float: "float", bool: "bool",
+               type(None): "null"}
+
+
+class SchemaError(Exception):
+    """Ответ не соответствует схеме"""
+
+    def __init__(self, schema_name, violations, limit=20):
+        self.violations = violations
+        lines = violations[:limit]
+        if len(violations) > limit:
+            lines.append(f"... and {len(violations) - limit} more")
+        super().__init__(f"{schema_name}: {len(violations)} violation(s)\n  " + "\n  ".join(lines))
+
+
+def _type_name(value):
+    return _TYPE_NAMES.get(type(value), type(value).__name__)
+
+
+class _Compiler:
+    """Генерация исходного кода валидаторов для одной схемы"""
+
+    def __init__(self):
+        self.names = {"_MISSING": _MISSING, "_type_name": _type_name}
+        self._counter = itertools.count()
+
+    def constant(self, value):
+        name = f"_c{next(self._counter)}"
+        self.names[name] = value
+        return name
+
+    def variable(self):
+        return f"v{next(self._counter)}"
+
+    def type_check(self, var, expected):
+        if isinstance(expected, tuple):
+            return f"type({var}) in {self.constant(expected)}"
+        return f"type({var}) is {self.constant(expected)}"
+
+    def check_lines(self, schema, var, indent):
+        """Операторы, возвращающие False при первом несоответствии var схеме"""
+        pad = " " * indent
+        lines = [f"{pad}if type({var}) is not dict:", f"{pad}    return False"]
+        for field, expected in schema.fields.items():
+            if isinstance(expected, Schema):
+                nested = self.variable()
+                lines.append(f"{pad}{nested} = {var}.get({field!r})")
+                lines.extend(self.check_lines(expected, nested, indent))
+            else:
+                lines.append(f"{pad}if not ({self.type_check(f'{var}.get({field!r}, _MISSING)', expected)}):")
+                lines.append(f"{pad}    return False")
+        return lines
+
+    def error_lines(self, schema, var, path, indent):
+        """Операторы, дописывающие нарушения в errors"""
+        pad = " " * indent
+        lines = [
+            f"{pad}if type({var}) is not dict:",
+            f"{pad}    errors.append({path} + ': expected object, got ' + _type_name({var}))",
+            f"{pad}else:",
+        ]
+        pad += "    "
+        for field, expected in schema.fields.items():
+            value = self.variable()
+            field_path = f"{path} + {'.' + field!r}"
+            lines.append(f"{pad}{value} = {var}.get({field!r}, _MISSING)")
+            lines.append(f"{pad}if {value} is _MISSING:")
+            lines.append(f"{pad}    errors.append({field_path} + ': missing')")
+            if isinstance(expected, Schema):
+                lines.append(f"{pad}else:")
+                lines.extend(self.error_lines(expected, value, f"({field_path})", indent + 8))
+            else:
+                expected_name = self.constant(" or ".join(
+                    _TYPE_NAMES.get(t, t.__name__) for t in (expected if isinstance(expected, tuple) else (expected,))))
+                lines.append(f"{pad}elif not ({self.type_check(value, expected)}):")
+                lines.append(f"{pad}    errors.append({field_path} + ': expected ' + {expected_name}"
+                             f" + ', got ' + _type_name({value}))")
+        return lines
+
+    def build(self, schema):
+        source = "\n".join([
+            "def is_valid(value):",
+            *self.check_lines(schema, "value", 4),
+            "    return True",
+            "",
+            "def errors(value, path='$'):",
+            "    errors = []",
+            *self.error_lines(schema, "value", "path", 4),
+            "    return errors",
+        ])
+        namespace = dict(self.names)
+        exec(compile(source, f"<schema {schema.name}>", "exec"), namespace)
+        return namespace["is_valid"], namespace["errors"], source
+
+
+class Schema:
+    """Объект с обязательными полями; fields - {имя: тип | кортеж типов | Schema}"""
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = dict(fields)
+        self.is_valid, self._errors, self.source = _Compiler().build(self)
+
+    def errors(self, value, path="$"):
+        """Все нарушения схемы (пустой список, если их нет)"""
+        if self.is_valid(value):
+            return []
+        return self._errors(value, path)
+
+    def validate(self, value):
+        """Вернуть value или поднять SchemaError со всеми нарушениями"""
+        if not self.is_valid(value):
+            raise SchemaError(self.name, self._errors(value, "$"))
+        return value
+
+    def __repr__(self):
+        return f"Schema({self.name!r})"
+
+
+class ListOf:
+    """Массив элементов одной схемы (пустой массив валиден)"""
+
+    def __init__(self, item, name=None):
+        self.item = item
+        self.name = name or f"{item.name} list"
+
+    def is_valid(self, value):
+        return type(value) is list and all(map(self.item.is_valid, value))
+
+    def errors(self, value, path="$"):
+        if type(value) is not list:
+            return [f"{path}: expected array, got {_type_name(value)}"]
+        is_valid = self.item.is_valid
+        if all(map(is_valid, value)):
+            return []
+        errors = []
+        for index, item in enumerate(value):
+            if not is_valid(item):
+                errors.extend(self.item.errors(item, f"{path}[{index}]"))
+        return errors
+
+    def validate(self, value):
+        if not self.is_valid(value):
+            raise SchemaError(self.name, self.errors(value))
+        return value
+
+    def __repr__(self):
+        return f"ListOf({self.item!r})"
+
+
+STATISTICS = Schema("statistics", {"likes": int, "viewCount": int, "contacts": int})
+ITEM = Schema("item", {
+    "id": str,
+    "sellerId": int,
+    "name": str,
+    "price": int,
+    "statistics": STATISTICS,
+    "createdAt": str,
+})
+ITEM_LIST = ListOf(ITEM)
+STATISTICS_LIST = ListOf(STATISTICS)
+ERROR = Schema("error", {"result": dict, "status": str})
@@ -0,0 +1,424 @@
+"""Длительный (soak) прогон: дрейф задержек и рост ресурсов клиента.
+
+Воркеры в течение duration секунд выполняют смесь операций (чтение объявления,
+списка продавца, статистики v1/v2 и создание с удалением) с ограничением
+частоты. Задержки попыток собираются хуком ApiClient в гистограммы по
+эндпоинтам за каждое окно (window секунд). В конце окна снимаются ресурсы
+процесса из /proc/self: RSS, открытые файловые дескрипторы, сокеты и сокеты
+в состоянии CLOSE_WAIT (сервер закрыл соединение, а клиент - нет: признак
+утечки соединений). Окна дописываются в JSONL по мере прогона.
+
+Дрейф ищется по рядам окон (p50/p95/p99 каждого эндпоинта и ресурсы), без
+первых warmup окон: тест Манна-Кендалла на монотонный рост (односторонний,
+уровень alpha) и оценка наклона Тейла-Сена. Ряд считается дрейфующим, если
+рост статистически значим и изменение за прогон по наклону не меньше
+min_relative_change от начального уровня и не меньше абсолютного порога
+метрики (DRIFT_THRESHOLDS) - так шум в доли миллисекунды не дает ложных
+срабатываний.
+
+Запуск:
+    python soak.py --fake-server --duration 600 --window 30
+    python soak.py --duration 14400 --window 60 --rate 20 --output soak.jsonl
+"""
+import argparse
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+from api_client import ApiClient, extract_item_id
+from cleanup import CreatedItemRegistry, RateLimiter
+from fake_server import FakeAdsServer
+from instrumentation import RequestHooks
+from item_pool import ItemPool
+from latency_recorder import LatencyHistogram
+from payloads import PayloadGenerator
+
+DEFAULT_ALPHA = 0.01
+DEFAULT_MIN_RELATIVE_CHANGE = 0.2
+# Минимальное абсолютное изменение за прогон по типу метрики
+DRIFT_THRESHOLDS = {"ms": 2.0, "rss_mb": 20.0, "fds": 5, "sockets": 5, "close_wait": 3}
+LATENCY_PERCENTILES = (50, 95, 99)
+# Состояния TCP из /proc/net/tcp
+TCP_CLOSE_WAIT = "08"
+
+
+def _socket_inodes():
+    inodes = set()
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            target = os.readlink(f"/proc/self/fd/{fd}")
+        except OSError:
+            continue
+        if target.startswith("socket:["):
+            inodes.add(target[8:-1])
+    return inodes
+
+
+def _close_wait_count(inodes):
+    count = 0
+    for path in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(path, encoding="ascii") as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[3] == TCP_CLOSE_WAIT and fields[9] in inodes:
+                        count += 1
+        except OSError:
+            continue
+    return count
+
+
+def sample_resources():
+    """RSS (МБ), дескрипторы, сокеты и сокеты в CLOSE_WAIT текущего процесса.
+
+    Без /proc (не Linux) известен только пиковый RSS, остальное - None.
+    """
+    if not os.path.isdir("/proc/self/fd"):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS отдает байты, остальные системы - килобайты
+        return {"rss_mb": peak / (1 << 20 if sys.platform == "darwin" else 1 << 10),
+                "fds": None, "sockets": None, "close_wait": None}
+    rss_kb = 0
+    with open("/proc/self/status", encoding="ascii") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+                break
+    inodes = _socket_inodes()
+    return {
+        "rss_mb": round(rss_kb / 1024, 2),
+        "fds": len(os.listdir("/proc/self/fd")),
+        "sockets": len(inodes),
+        "close_wait": _close_wait_count(inodes),
+    }
+
+
+def mann_kendall(values):
+    """Односторонний тест Манна-Кендалла на рост: (S, z, p-value).
+
+    Нормальная аппроксимация с поправкой на совпадающие значения.
+    """
+    n = len(values)
+    s = 0
+    for i in range(n - 1):
+        for j in range(i + 1, n):
+            difference = values[j] - values[i]
+            s += (difference > 0) - (difference < 0)
+    ties = {}
+    for value in values:
+        ties[value] = ties.get(value, 0) + 1
+    variance = (n * (n - 1) * (2 * n + 5)
+                - sum(t * (t - 1) * (2 * t + 5) for t in ties.values())) / 18
+    if variance <= 0:
+        return s, 0.0, 1.0
+    if s > 0:
+        z = (s - 1) / math.sqrt(variance)
+    elif s < 0:
+        z = (s + 1) / math.sqrt(variance)
+    else:
+        z = 0.0
+    return s, z, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def sen_slope(times, values):
+    """Оценка наклона Тейла-Сена: медиана наклонов по всем парам точек"""
+    slopes = [(values[j] - values[i]) / (times[j] - times[i])
+              for i in range(len(values) - 1) for j in range(i + 1, len(values)) if times[j] != times[i]]
+    return statistics.median(slopes) if slopes else 0.0
+
+
+class DriftResult:
+    def __init__(self, metric, times, values, alpha, min_relative_change, min_absolute_change):
+        self.metric = metric
+        self.windows = len(values)
+        _, self.z, self.p_value = mann_kendall(values)
+        self.slope = sen_slope(times, values)
+        # Начальный уровень - медиана первой трети ряда
+        head = values[:max(1, len(values) // 3)]
+        self.baseline = statistics.median(head)
+        self.change = self.slope * (times[-1] - times[0])
+        self.relative_change = self.change / self.baseline if self.baseline else math.inf if self.change > 0 else 0.0
+        self.drifting = (self.p_value < alpha and self.change >= min_absolute_change
+                         and self.relative_change >= min_relative_change)
+
+    @property
+    def slope_per_hour(self):
+        return self.slope * 3600
+
+    def to_dict(self):
+        return {
+            "metric": self.metric,
+            "windows": self.windows,
+            "baseline": round(self.baseline, 3),
+            "change": round(self.change, 3),
+            "relative_change": round(self.relative_change, 4) if math.isfinite(self.relative_change) else None,
+            "slope_per_hour": round(self.slope_per_hour, 3),
+            "p_value": round(self.p_value, 6),
+            "drifting": self.drifting,
+        }
+
+
+def _threshold(metric):
+    if metric.endswith("_ms"):
+        return DRIFT_THRESHOLDS["ms"]
+    return DRIFT_THRESHOLDS.get(metric, 0)
+
+
+def detect_drift(windows, warmup=1, alpha=DEFAULT_ALPHA, min_relative_change=DEFAULT_MIN_RELATIVE_CHANGE,
+                 min_windows=5):
+    """DriftResult по каждой метрике окон (без первых warmup окон)"""
+    windows = windows[warmup:]
+    series = {}
+    for window in windows:
+        for metric, value in window["resources"].items():
+            if value is not None:
+                series.setdefault(metric, []).append((window["end"], value))
+        for endpoint, stats in window["endpoints"].items():
+            if not stats["count"]:
+                continue
+            for percent in LATENCY_PERCENTILES:
+                series.setdefault(f"{endpoint} p{percent}_ms", []).append((window["end"], stats[f"p{percent}_ms"]))
+    results = []
+    for metric, points in series.items():
+        if len(points) < min_windows:
+            continue
+        times = [point[0] for point in points]
+        values = [point[1] for point in points]
+        results.append(DriftResult(metric, times, values, alpha, min_relative_change, _threshold(metric)))
+    return results
+
+
+class WindowCollector:
+    """Хук ApiClient: гистограммы и ошибки попыток по эндпоинтам за текущее окно"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._errors = {}
+        self._hooks = None
+
+    def attach(self, hooks):
+        hooks.add("post_response", self.observe)
+        hooks.add("on_error", self.observe)
+        self._hooks = hooks
+        return self
+
+    def detach(self):
+        if self._hooks is not None:
+            self._hooks.remove("post_response", self.observe)
+            self._hooks.remove("on_error", self.observe)
+            self._hooks = None
+
+    def observe(self, event):
+        failed = event.response is None or event.response.status_code >= 500
+        with self._lock:
+            self._histograms.setdefault(event.endpoint, LatencyHistogram()).record(event.total_ns)
+            if failed:
+                self._errors[event.endpoint] = self._errors.get(event.endpoint, 0) + 1
+
+    def rotate(self):
+        """Статистика окна по эндпоинтам; следующее окно начинается с нуля"""
+        with self._lock:
+            histograms, errors = self._histograms, self._errors
+            self._histograms, self._errors = {}, {}
+        endpoints = {}
+        for endpoint, histogram in histograms.items():
+            stats = {"count": histogram.count, "errors": errors.get(endpoint, 0)}
+            for percent in LATENCY_PERCENTILES:
+                stats[f"p{percent}_ms"] = round(histogram.percentile_ms(percent), 3)
+            endpoints[endpoint] = stats
+        return endpoints
+
+
+def default_operations(api_client, pool, payloads):
+    """[(имя, вес, функция)] - в основном чтение, немного создания с удалением"""
+    rng = random.Random(payloads.seed)
+    item_ids = [item.id for item in pool.items]
+    seller_ids = [item.data["sellerID"] for item in pool.items]
+
+    def create_and_delete():
+        response = api_client.create_item(payloads.valid())
+        if response.status_code == 200:
+            api_client.delete_item(extract_item_id(response.json()))
+        return response
+
+    return [
+        ("get_item", 40, lambda: api_client.get_item(rng.choice(item_ids))),
+        ("get_seller_items", 20, lambda: api_client.get_seller_items(rng.choice(seller_ids))),
+        ("get_statistics", 15, lambda: api_client.get_statistics(rng.choice(item_ids))),
+        ("get_statistics_v2", 15, lambda: api_client.get_statistics_v2(rng.choice(item_ids))),
+        ("create_and_delete", 10, create_and_delete),
+    ]
+
+
+class SoakResult:
+    def __init__(self, windows, drift, duration):
+        self.windows = windows
+        self.drift = drift
+        self.duration = duration
+
+    @property
+    def drifting(self):
+        return [result for result in self.drift if result.drifting]
+
+    def summary(self):
+        requests = sum(stats["count"] for window in self.windows for stats in window["endpoints"].values())
+        lines = [f"Soak: {self.duration:.0f} с, {len(self.windows)} окон, {requests} попыток запросов"]
+        if self.windows:
+            first, last = self.windows[0]["resources"], self.windows[-1]["resources"]
+            lines.append("Ресурсы: " + ", ".join(f"{name} {first[name]} -> {last[name]}" for name in first))
+        for result in sorted(self.drift, key=lambda result: result.p_value):
+            if result.drifting or result.p_value < DEFAULT_ALPHA:
+                status = "ДРЕЙФ" if result.drifting else "рост ниже порога"
+                lines.append(f"  {status}: {result.metric}: {result.baseline:.2f} -> +{result.change:.2f} "
+                             f"({result.slope_per_hour:+.2f}/ч, p={result.p_value:.2g})")
+        if not self.drifting:
+            lines.append("Дрейф не обнаружен")
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {"duration": round(self.duration, 3), "windows": len(self.windows),
+                "drift": [result.to_dict() for result in self.drift]}
+
+
+class SoakRunner:
+    def __init__(self, operations, hooks, duration, window=60.0, workers=4, rate=None, output=None,
+                 warmup=1, alpha=DEFAULT_ALPHA, min_relative_change=DEFAULT_MIN_RELATIVE_CHANGE, seed=None):
+        """operations - [(имя, вес, функция без аргументов)]; hooks - хуки ApiClient,
+        через который операции выполняют запросы"""
+        self.operations = operations
+        self.hooks = hooks
+        self.duration = duration
+        self.window = window
+        self.workers = workers
+        self.rate = rate
+        self.output = output
+        self.warmup = warmup
+        self.alpha = alpha
+        self.min_relative_change = min_relative_change
+        self.seed = seed
+        self.operation_errors = {}
+        self._lock = threading.Lock()
+
+    def _worker(self, index, limiter, stop):
+        rng = random.Random(f"{self.seed}-{index}" if self.seed is not None else None)
+        functions = [operation[2] for operation in self.operations]
+        weights = [operation[1] for operation in self.operations]
+        names = [operation[0] for operation in self.operations]
+        while not stop.is_set():
+            limiter.acquire()
+            if stop.is_set():
+                return
+            choice = rng.choices(range(len(functions)), weights)[0]
+            try:
+                functions[choice]()
+            except Exception as e:
+                kind = f"{names[choice]}: {str(e).split(':', 1)[0] or type(e).__name__}"
+                with self._lock:
+                    self.operation_errors[kind] = self.operation_errors.get(kind, 0) + 1
+
+    def run(self, progress=None):
+        """Выполнить прогон; progress(window) вызывается после каждого окна"""
+        collector = WindowCollector().attach(self.hooks)
+        limiter = RateLimiter(self.rate)
+        stop = threading.Event()
+        threads = [threading.Thread(target=self._worker, args=(index, limiter, stop),
+                                    name=f"soak-worker-{index}", daemon=True)
+                   for index in range(self.workers)]
+        windows = []
+        output = open(self.output, "a", encoding="utf-8") if self.output else None
+        started = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            window_end = started
+            while window_end - started < self.duration - 1e-9:
+                window_end = min(window_end + self.window, started + self.duration)
+                delay = window_end - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                window = {
+                    "end": round(time.perf_counter() - started, 3),
+                    "ts": time.time(),
+                    "endpoints": collector.rotate(),
+                    "resources": sample_resources(),
+                }
+                windows.append(window)
+                if output is not None:
+                    output.write(json.dumps(window, ensure_ascii=False) + "\n")
+                    output.flush()
+                if progress is not None:
+                    progress(window)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            collector.detach()
+            if output is not None:
+                output.close()
+        drift = detect_drift(windows, warmup=self.warmup, alpha=self.alpha,
+                             min_relative_change=self.min_relative_change)
+        return SoakResult(windows, drift, time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=3600, help="Длительность прогона, секунды")
+    parser.add_argument("--window", type=float, default=60, help="Окно статистики, секунды")
+    parser.add_argument("--workers", type=int, default=4, help="Потоков-воркеров")
+    parser.add_argument("--rate", type=float, default=None, help="Не больше стольких операций в секунду")
+    parser.add_argument("--warmup", type=int, default=1, help="Окон прогрева, не участвующих в поиске дрейфа")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA, help="Уровень значимости теста на рост")
+    parser.add_argument("--min-change", type=float, default=DEFAULT_MIN_RELATIVE_CHANGE,
+                        help="Минимальный относительный рост за прогон, считающийся дрейфом")
+    parser.add_argument("--pool-size", type=int, default=20, help="Объявлений для операций чтения")
+    parser.add_argument("--seed", default=None, help="Seed выбора операций и тел объявлений")
+    parser.add_argument("--base-url", default=None, help="Базовый URL сервиса")
+    parser.add_argument("--fake-server", action="store_true", help="Запустить локальный fake_server.py")
+    parser.add_argument("--output", default=None, help="Дописывать окна в JSONL")
+    parser.add_argument("--report", default=None, help="Сохранить результаты поиска дрейфа в JSON")
+    args = parser.parse_args(argv)
+
+    server = FakeAdsServer().start() if args.fake_server else None
+    hooks = RequestHooks()
+    api_client = ApiClient(base_url=server.url if server else args.base_url, hooks=hooks)
+    registry = CreatedItemRegistry(api_client.base_url).attach(hooks)
+    try:
+        pool = ItemPool.create(args.pool_size, base_url=api_client.base_url)
+        for item in pool.items:
+            registry.add(item.id)
+        payloads = PayloadGenerator(seed=args.seed)
+        runner = SoakRunner(default_operations(api_client, pool, payloads), hooks, args.duration,
+                            window=args.window, workers=args.workers, rate=args.rate, output=args.output,
+                            warmup=args.warmup, alpha=args.alpha, min_relative_change=args.min_change,
+                            seed=args.seed)
+
+        def progress(window):
+            total = sum(stats["count"] for stats in window["endpoints"].values())
+            print(f"t={window['end']:.1f}s requests={total} {window['resources']}", flush=True)
+
+        result = runner.run(progress)
+        print(result.summary())
+        if runner.operation_errors:
+            print(f"Ошибки операций: {runner.operation_errors}")
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(result.to_dict(), f, ensure_ascii=False, indent=2)
+        return 1 if result.drifting else 0
+    finally:
+        # Пул и объявления, созданные до прерывания (Ctrl-C, ошибка), тоже удаляются
+        registry.detach()
+        print(registry.cleanup(api_client, workers=8).summary())
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""Сканер согласованности статистики API v1 и v2 по диапазону продавцов.
+
+Продавцы обходятся блоками: объявления каждого продавца в блоке запрашиваются
+параллельно, найденные ID сразу передаются в ApiClient.compare_statistics.
+После каждого блока сохраняется контрольная точка, поэтому прерванный скан
+продолжается с первого незавершенного блока. Расхождения дописываются в JSONL.
+
+Запуск:
+    python stats_scanner.py --workers 64
+    python stats_scanner.py --first 111111 --last 200000 --checkpoint scan.json --findings scan.jsonl
+    # Повторный проход: статистика проверяется только у объявлений,
+    # созданных после предыдущего завершенного скана
+    python stats_scanner.py --incremental
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from api_client import ApiClient
+from test_data import SELLER_ID_MAX, SELLER_ID_MIN
+
+DEFAULT_CHECKPOINT = "stats_scan.checkpoint.json"
+DEFAULT_FINDINGS = "stats_scan.findings.jsonl"
+DEFAULT_BLOCK_SIZE = 1000
+
+
+def parse_created_at(value):
+    """createdAt в datetime с часовым поясом или None.
+
+    Поддерживаются ISO 8601 и формат сервиса "2025-09-01 12:00:00.123456 +0300 +0300".
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        parts = value.split()
+        if len(parts) < 3:
+            return None
+        date, clock, offset = parts[:3]
+        clock = clock[:15]  # не больше микросекунд
+        try:
+            parsed = datetime.strptime(f"{date} {clock} {offset}",
+                                       "%Y-%m-%d %H:%M:%S.%f %z" if "." in clock else "%Y-%m-%d %H:%M:%S %z")
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+class ScanCheckpoint:
+    """Состояние скана: next_seller - первый продавец незавершенного блока.
+
+    since - граница инкрементального прохода (createdAt), high_water - самый
+    поздний createdAt, найденный в текущем проходе.
+    """
+
+    def __init__(self, first, last, since=None):
+        self.first = first
+        self.last = last
+        self.next_seller = first
+        self.since = since
+        self.high_water = since
+        self.completed = False
+        self.started_at = time.time()
+        self.updated_at = self.started_at
+        self.counters = {"sellers": 0, "sellers_with_items": 0, "seller_errors": 0,
+                         "items": 0, "items_checked": 0}
+        self.kinds = {}
+
+    @property
+    def progress(self):
+        return (self.next_seller - self.first) / (self.last - self.first + 1)
+
+    def to_dict(self):
+        return {
+            "first": self.first,
+            "last": self.last,
+            "next_seller": self.next_seller,
+            "since": self.since.isoformat() if self.since else None,
+            "high_water": self.high_water.isoformat() if self.high_water else None,
+            "completed": self.completed,
+            "started_at": self.started_at,
+            "updated_at": self.updated_at,
+            "counters": self.counters,
+            "kinds": self.kinds,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        checkpoint = cls(data["first"], data["last"], since=parse_created_at(data.get("since")))
+        checkpoint.next_seller = data["next_seller"]
+        checkpoint.high_water = parse_created_at(data.get("high_water"))
+        checkpoint.completed = data["completed"]
+        checkpoint.started_at = data["started_at"]
+        checkpoint.updated_at = data["updated_at"]
+        checkpoint.counters.update(data["counters"])
+        checkpoint.kinds = dict(data["kinds"])
+        return checkpoint
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path):
+        """Атомарная запись: прерванный процесс не оставляет битый файл"""
+        self.updated_at = time.time()
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        os.replace(temporary, path)
+
+
+class StatsScanner:
+    def __init__(self, api_client=None, first=SELLER_ID_MIN, last=SELLER_ID_MAX, workers=32,
+                 block_size=DEFAULT_BLOCK_SIZE, checkpoint_path=DEFAULT_CHECKPOINT,
+                 findings_path=DEFAULT_FINDINGS, incremental=False):
+        if first > last:
+            raise ValueError("first must be <= last")
+        # Пул соединений рассчитан на запросы обоих пулов потоков
+        self.api_client = api_client or ApiClient(pool_maxsize=2 * workers)
+        self.first = first
+        self.last = last
+        self.workers = workers
+        self.block_size = block_size
+        self.checkpoint_path = checkpoint_path
+        self.findings_path = findings_path
+        self.incremental = incremental
+        # Продавцов, обработанных этим процессом (без учета предыдущих запусков)
+        self.sellers_scanned = 0
+
+    def load_checkpoint(self):
+        """Продолжить незавершенный скан или начать новый проход"""
+        previous = ScanCheckpoint.load(self.checkpoint_path)
+        if previous is not None and (previous.first, previous.last) != (self.first, self.last):
+            raise Exception(f"Checkpoint {self.checkpoint_path} is for sellers "
+                            f"{previous.first}-{previous.last}, not {self.first}-{self.last}")
+        if previous is not None and not previous.completed:
+            return previous
+        since = None
+        if self.incremental:
+            if previous is None:
+                raise Exception("Incremental scan needs a completed scan checkpoint")
+            # Объявления, созданные во время предыдущего прохода в уже пройденных
+            # блоках, могут быть старше high_water - берем и время начала прохода
+            started = datetime.fromtimestamp(previous.started_at, timezone.utc)
+            since = min(previous.high_water, started) if previous.high_water else None
+        return ScanCheckpoint(self.first, self.last, since=since)
+
+    def discover(self, seller_id):
+        """(seller_id, объявления, ошибка)"""
+        try:
+            return seller_id, list(self.api_client.iter_seller_items(seller_id)), None
+        except Exception as e:
+            if str(e).startswith("Unexpected status 404"):
+                return seller_id, [], None
+            return seller_id, [], str(e)
+
+    def scan_block(self, checkpoint, executor, first, last, findings):
+        def item_ids():
+            for seller_id, items, error in executor.map(self.discover, range(first, last + 1)):
+                checkpoint.counters["sellers"] += 1
+                self.sellers_scanned += 1
+                if error is not None:
+                    checkpoint.counters["seller_errors"] += 1
+                    findings.write(json.dumps({"seller_id": seller_id, "kind": "seller_error", "error": error},
+                                              ensure_ascii=False) + "\n")
+                    continue
+                if items:
+                    checkpoint.counters["sellers_with_items"] += 1
+                for item in items:
+                    checkpoint.counters["items"] += 1
+                    created_at = parse_created_at(item.get("createdAt"))
+                    if created_at is not None and (checkpoint.high_water is None or created_at > checkpoint.high_water):
+                        checkpoint.high_water = created_at
+                    # Объявления без разбираемого createdAt проверяются всегда
+                    if checkpoint.since is not None and created_at is not None and created_at <= checkpoint.since:
+                        continue
+                    yield item["id"]
+
+        for diff in self.api_client.compare_statistics(item_ids(), max_workers=self.workers):
+            checkpoint.counters["items_checked"] += 1
+            checkpoint.kinds[diff.kind] = checkpoint.kinds.get(diff.kind, 0) + 1
+            if not diff.consistent:
+                findings.write(json.dumps(diff.to_dict(), ensure_ascii=False) + "\n")
+
+    def run(self, progress=None):
+        """Выполнить скан; progress(checkpoint) вызывается после каждого блока"""
+        checkpoint = self.load_checkpoint()
+        with open(self.findings_path, "a", encoding="utf-8") as findings, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scan-sellers") as executor:
+            while checkpoint.next_seller <= self.last:
+                block_last = min(checkpoint.next_seller + self.block_size - 1, self.last)
+                self.scan_block(checkpoint, executor, checkpoint.next_seller, block_last, findings)
+                # Расхождения блока записаны до того, как блок отмечен завершенным
+                findings.flush()
+                checkpoint.next_seller = block_last + 1
+                checkpoint.save(self.checkpoint_path)
+                if progress is not None:
+                    progress(checkpoint)
+        checkpoint.completed = True
+        checkpoint.save(self.checkpoint_path)
+        return checkpoint
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--first", type=int, default=SELLER_ID_MIN, help="Первый sellerID")
+    parser.add_argument("--last", type=int, default=SELLER_ID_MAX, help="Последний sellerID")
+    parser.add_argument("--workers", type=int, default=32, help="Параллельных запросов на каждом этапе")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Продавцов между контрольными точками")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT, help="Файл контрольной точки")
+    parser.add_argument("--findings", default=DEFAULT_FINDINGS, help="JSONL с расхождениями")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Проверять только объявления, созданные после предыдущего завершенного скана")
+    parser.add_argument("--base-url", default=None, help="Базовый URL сервиса (по умолчанию API_BASE_URL)")
+    args = parser.parse_args(argv)
+
+    scanner = StatsScanner(
+        api_client=ApiClient(base_url=args.base_url, pool_maxsize=2 * args.workers),
+        first=args.first, last=args.last, workers=args.workers, block_size=args.block_size,
+        checkpoint_path=args.checkpoint, findings_path=args.findings, incremental=args.incremental
+    )
+    started = time.perf_counter()
+
+    def progress(checkpoint):
+        rate = scanner.sellers_scanned / (time.perf_counter() - started)
+        print(f"{checkpoint.progress:6.1%} sellerID<{checkpoint.next_seller} "
+              f"items={checkpoint.counters['items']} checked={checkpoint.counters['items_checked']} "
+              f"kinds={checkpoint.kinds} {rate:.0f} sellers/s", flush=True)
+
+    checkpoint = scanner.run(progress)
+    inconsistent = sum(count for kind, count in checkpoint.kinds.items() if kind not in ("consistent", "not_found"))
+    print(f"Готово: {checkpoint.counters}, расхождений {inconsistent} (см. {args.findings})")
+    return 1 if inconsistent or checkpoint.counters["seller_errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
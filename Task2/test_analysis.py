@@ -0,0 +1,101 @@
+import json
+import random
+
+import pytest
+
+from latency_recorder import LatencyHistogram
+from load_driver import percentile
+
+np = pytest.importorskip("numpy")
+analysis = pytest.importorskip("analysis")
+
+
+def write_jsonl(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+class TestAnalysis:
+    """Тесты векторизованного анализа данных прогонов"""
+
+    def traffic_rows(self, seed, scale=1.0):
+        rng = random.Random(seed)
+        rows = []
+        for _ in range(2000):
+            endpoint = rng.choice(["GET /api/1/item/:id", "POST /api/1/item"])
+            status = rng.choice([200] * 18 + [500, None])
+            row = {"endpoint": endpoint, "elapsed_ms": rng.lognormvariate(2, 0.5) * scale}
+            if status is not None:
+                row["status"] = status
+            rows.append(row)
+        return rows
+
+    def test_percentiles_match_load_driver(self, tmp_path):
+        """Перцентили по эндпоинтам совпадают с построчным расчетом"""
+        rows = self.traffic_rows(seed=1)
+        path = tmp_path / "traffic.jsonl"
+        write_jsonl(path, rows)
+
+        columns = analysis.load_traffic(str(path))
+        # Повторная загрузка из кэша .npz дает те же данные
+        cached = analysis.load_traffic(str(path))
+        assert (tmp_path / "traffic.jsonl.npz").exists()
+        assert np.array_equal(cached.latency_ms, columns.latency_ms)
+
+        result = analysis.percentiles(columns)
+        for endpoint in ["GET /api/1/item/:id", "POST /api/1/item"]:
+            samples = sorted(row["elapsed_ms"] for row in rows if row["endpoint"] == endpoint and "status" in row)
+            assert result[endpoint]["count"] == len(samples)
+            for p in analysis.DEFAULT_PERCENTILES:
+                assert result[endpoint][f"p{p}_ms"] == percentile(samples, p)
+
+        errors = analysis.error_rates(columns)
+        expected = sum(1 for row in rows if row["endpoint"] == "POST /api/1/item" and row.get("status") != 200)
+        total = sum(1 for row in rows if row["endpoint"] == "POST /api/1/item")
+        assert errors["POST /api/1/item"] == pytest.approx(expected / total)
+
+    def test_nearest_rank(self):
+        """Ранг ближайшего перцентиля одинаков в NumPy, load_driver и гистограмме"""
+        samples = [1.0, 2.0, 3.0, 4.0, 5.0]
+        histogram = LatencyHistogram()
+        for value in samples:
+            histogram.record(value * 1e6)
+        columns = analysis.LatencyColumns(["a"], [0] * 5, samples, [200] * 5)
+        result = analysis.percentiles(columns, [10, 50, 90, 100])["a"]
+        for p, expected in [(10, 1.0), (50, 3.0), (90, 5.0), (100, 5.0)]:
+            assert percentile(samples, p) == result[f"p{p}_ms"] == expected
+            assert histogram.percentile_ms(p) == pytest.approx(expected, rel=0.01)
+
+    def test_outliers_and_regressions(self, tmp_path):
+        """Выбросы находятся внутри эндпоинта, регрессия - по росту перцентиля"""
+        baseline = analysis.LatencyColumns(["a", "b"], [0] * 100 + [1] * 100,
+                                           [10.0] * 99 + [500.0] + [100.0] * 100, [200] * 200)
+        mask, summary = analysis.outliers(baseline)
+        assert mask.sum() == 1
+        assert summary["a"][0] == 1 and summary["b"][0] == 0
+
+        current = analysis.LatencyColumns(["b", "a"], [0] * 100 + [1] * 100,
+                                          [100.0] * 100 + [20.0] * 100, [200] * 200)
+        regressions = analysis.find_regressions(baseline, current, threshold=0.1)
+        assert {(endpoint, p) for endpoint, p, *_ in regressions} == {("a", "p50"), ("a", "p95"), ("a", "p99")}
+
+    def test_statistics_deltas(self, tmp_path):
+        """Разницы v2 - v1 по полям статистики"""
+        path = tmp_path / "diffs.jsonl"
+        write_jsonl(path, [
+            {"item_id": "1", "v1": {"likes": 1, "viewCount": 2, "contacts": 3},
+             "v2": {"likes": 1, "viewCount": 2, "contacts": 3}},
+            {"item_id": "2", "v1": {"likes": 1, "viewCount": 2, "contacts": 3},
+             "v2": {"likes": 4, "viewCount": 2, "contacts": 1}},
+            {"item_id": "3", "v1": None, "v2": {"likes": 1, "viewCount": 1, "contacts": 1}},
+            {"seller_id": 111111, "kind": "seller_error", "error": "Connection error"},
+        ])
+        deltas = analysis.statistics_deltas(analysis.load_statistics(str(path)))
+
+        assert deltas["items"] == 3
+        assert deltas["compared"] == 2
+        assert deltas["items_mismatched"] == 1
+        assert deltas["fields"]["likes"] == {"mismatched": 1, "mean_delta": 3.0, "max_abs_delta": 3.0}
+        assert deltas["fields"]["contacts"]["mean_delta"] == -2.0
+        assert deltas["fields"]["viewCount"]["mismatched"] == 0
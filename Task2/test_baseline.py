@@ -0,0 +1,103 @@
+import random
+
+from baseline import (IMPROVEMENT, NO_BASELINE, REGRESSION, UNCHANGED, BaselineStore, check_run,
+                      environment_metadata, histogram_counts, main, mann_whitney_u)
+from latency_recorder import LatencyHistogram
+
+ENDPOINT = "GET /api/1/item/:id"
+
+
+def make_histograms(median_ms, count=50, seed=0):
+    rng = random.Random(seed)
+    histogram = LatencyHistogram()
+    for _ in range(count):
+        histogram.record(median_ms * 1e6 * rng.lognormvariate(0, 0.1))
+    return {ENDPOINT: histogram}
+
+
+class TestBaseline:
+    """Тесты хранилища базовых замеров и проверки регрессий"""
+
+    def test_mann_whitney_u(self):
+        """U-статистика, p-value сдвига и совпадение для списков и гистограмм"""
+        assert mann_whitney_u([1, 2, 3], [4, 5, 6])[0] == 0
+        assert mann_whitney_u([4, 5, 6], [1, 2, 3])[0] == 9
+        # Классический пример: связь 16/16 дает половину пары
+        assert mann_whitney_u([19, 22, 16, 29, 24], [20, 11, 17, 12, 16])[0] == 21.5
+
+        rng = random.Random(1)
+        baseline = [rng.gauss(10, 1) for _ in range(50)]
+        assert mann_whitney_u([value * 1.2 for value in baseline], baseline)[1] < 1e-6
+        assert mann_whitney_u(baseline, baseline)[1] > 0.4
+        assert mann_whitney_u([5, 5, 5], [5, 5, 5]) == (4.5, 1.0)
+
+        histogram = make_histograms(10)[ENDPOINT]
+        counts = histogram_counts(histogram)
+        values = [value for value, count in counts.items() for _ in range(count)]
+        assert sum(counts.values()) == histogram.count
+        assert mann_whitney_u(counts, values[:20]) == mann_whitney_u(values, values[:20])
+
+    def test_store_round_trip_and_baseline_selection(self, tmp_path):
+        """Прогоны сохраняются с метаданными; база - последние прогоны без регрессий на том же стенде"""
+        with BaselineStore(tmp_path / "baselines.sqlite") as store:
+            metadata = environment_metadata("fake-server", label="first")
+            first = store.save_run(make_histograms(10, seed=1), metadata)
+            second = store.save_run(make_histograms(10, seed=2), metadata)
+            regressed = store.save_run(make_histograms(20, seed=3), metadata, regressed=True)
+            store.save_run(make_histograms(100, seed=4), environment_metadata("https://example.com"))
+            third = store.save_run(make_histograms(10, seed=5), metadata)
+
+            run = store.run(first)
+            assert run["label"] == "first" and run["target"] == "fake-server" and run["cpu_count"]
+            restored = store.histograms(first)[ENDPOINT]
+            assert restored.percentile(95) == make_histograms(10, seed=1)[ENDPOINT].percentile(95)
+
+            baseline, run_ids = store.baseline("fake-server", runs=5)
+            assert run_ids == [third, second, first]
+            assert baseline[ENDPOINT].count == 150
+            assert store.baseline("fake-server", runs=2, before=third)[1] == [second, first]
+            assert regressed not in store.baseline("fake-server")[1]
+            assert [run["id"] for run in store.runs("fake-server")] == [third, regressed, second, first]
+
+    def test_regression_gating(self, tmp_path):
+        """Значимый рост медианы - регрессия; шум и рост меньше порогов - нет"""
+        with BaselineStore(tmp_path / "baselines.sqlite") as store:
+            metadata = environment_metadata("fake-server")
+            _, comparison = check_run(store, make_histograms(10, seed=1), metadata)
+            assert comparison.comparisons[0].status == NO_BASELINE and comparison.ok
+            for seed in (2, 3):
+                store.save_run(make_histograms(10, seed=seed), metadata)
+
+            _, comparison = check_run(store, make_histograms(10, seed=4), metadata)
+            assert comparison.comparisons[0].status == UNCHANGED
+
+            run_id, comparison = check_run(store, make_histograms(13, seed=5), metadata)
+            assert comparison.comparisons[0].status == REGRESSION and not comparison.ok
+            assert store.run(run_id)["regressed"] == 1
+            assert run_id not in store.baseline("fake-server")[1]
+            table = comparison.table()
+            assert REGRESSION in table and f"Регрессии: {ENDPOINT}" in table
+
+            _, comparison = check_run(store, make_histograms(7, seed=6), metadata)
+            assert comparison.comparisons[0].status == IMPROVEMENT and comparison.ok
+            # Рост на 30%, но меньше min_delta_ms
+            _, comparison = check_run(store, make_histograms(13, seed=7), metadata, min_delta_ms=5)
+            assert comparison.ok
+
+    def test_accept_and_any_host(self, tmp_path):
+        """Принятый прогон с регрессией становится базой; на CI база берется с любого хоста"""
+        path = tmp_path / "baselines.sqlite"
+        with BaselineStore(path) as store:
+            metadata = environment_metadata("fake-server")
+            for seed in (1, 2):
+                store.save_run(make_histograms(10, seed=seed), dict(metadata, hostname="ci-runner-1"))
+            _, comparison = check_run(store, make_histograms(13, seed=3), metadata)
+            assert comparison.comparisons[0].status == NO_BASELINE
+            run_id, comparison = check_run(store, make_histograms(13, seed=3), metadata, any_host=True)
+            assert comparison.comparisons[0].status == REGRESSION
+
+        assert main([str(path), "accept", str(run_id)]) == 0
+        with BaselineStore(path) as store:
+            assert store.run(run_id)["regressed"] == 0
+            _, comparison = check_run(store, make_histograms(13, seed=4), metadata, runs=1, any_host=True)
+            assert comparison.comparisons[0].status == UNCHANGED
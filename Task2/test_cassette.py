@@ -0,0 +1,100 @@
+import os
+import subprocess
+import sys
+
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+
+from api_client import ApiClient
+from cassette import Cassette, CassetteAdapter
+from fake_server import FakeAdsServer
+from instrumentation import RequestHooks
+from resilience import CircuitBreakerRegistry, RetryPolicy
+from test_data import get_valid_item_data
+
+
+class TestCassette:
+    """Тесты записи и воспроизведения ответов из кассеты"""
+
+    def make_client(self, cassette, base_url):
+        session = requests.Session()
+        adapter = CassetteAdapter(cassette, HTTPAdapter(), base_url)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return ApiClient(
+            base_url=base_url,
+            session=session,
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breakers=CircuitBreakerRegistry(enabled=False),
+            hooks=RequestHooks()
+        )
+
+    def scenario(self, api_client, payload):
+        item_id = api_client.create_item(payload).json()["id"]
+        before = api_client.get_item(item_id)
+        api_client.delete_item(item_id)
+        after = api_client.get_item(item_id)
+        return item_id, before, after
+
+    def test_playback_without_server(self, tmp_path):
+        """Записанные ответы воспроизводятся без сервера, повторы запроса - по порядку"""
+        path = tmp_path / "suite"
+        payload = get_valid_item_data()
+        with FakeAdsServer() as server:
+            cassette = Cassette(path, mode="all")
+            item_id, before, after = self.scenario(self.make_client(cassette, server.url), payload)
+            cassette.save()
+            url = server.url
+
+        cassette = Cassette(path, mode="none")
+        played_id, played_before, played_after = self.scenario(self.make_client(cassette, url), payload)
+        cassette.save()
+
+        assert played_id == item_id
+        assert played_before.status_code == before.status_code == 200
+        assert played_before.json() == before.json()
+        # Тот же GET после удаления получает второй записанный ответ
+        assert played_after.status_code == after.status_code == 404
+        assert cassette.counters == {"played": 4, "recorded": 0, "missed": 0}
+
+    def test_miss_and_new_mode(self, tmp_path):
+        """Отсутствующий запрос - ошибка в режиме none и дописывается в режиме new"""
+        path = tmp_path / "suite"
+        with FakeAdsServer() as server:
+            cassette = Cassette(path, mode="all")
+            self.make_client(cassette, server.url).get_item("first")
+            cassette.save()
+
+            cassette = Cassette(path, mode="none")
+            with pytest.raises(Exception, match="Cassette miss"):
+                self.make_client(cassette, server.url).get_item("second")
+            cassette.save()
+
+            cassette = Cassette(path, mode="new")
+            self.make_client(cassette, server.url).get_item("second")
+            cassette.save()
+            assert cassette.counters["recorded"] == 1
+            url = server.url
+
+        cassette = Cassette(path, mode="none")
+        api_client = self.make_client(cassette, url)
+        assert api_client.get_item("first").status_code == 404
+        assert api_client.get_item("second").status_code == 404
+        cassette.save()
+
+    def test_replay_subset_of_recorded_suite(self, tmp_path):
+        """Кассета, записанная прогоном нескольких файлов, воспроизводит и их часть (-k)"""
+        def run_pytest(*args):
+            command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider",
+                       f"--cassette={tmp_path / 'suite'}", f"--latency-dir={tmp_path / 'latency'}", *args]
+            return subprocess.run(command, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                  capture_output=True, text=True, timeout=120)
+
+        files = ["test_item_creation.py", "test_get_item.py", "test_statistics.py"]
+        recorded = run_pytest("--fake-server", "--cassette-mode=all", *files)
+        assert recorded.returncode == 0, recorded.stdout[-2000:]
+        # Без сервера: каждый запрос должен найтись в кассете
+        for subset in (["-k", "consistency"], ["test_statistics.py"], ["-k", "response_time"]):
+            played = run_pytest("--cassette-mode=none", *files, *subset)
+            assert played.returncode == 0, played.stdout[-2000:]
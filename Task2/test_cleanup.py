@@ -0,0 +1,72 @@
+import time
+
+from api_client import ApiClient
+from cleanup import CreatedItemRegistry, RateLimiter
+from fake_server import FakeAdsServer
+from instrumentation import RequestHooks
+from resilience import RetryPolicy
+from test_data import get_valid_item_data
+
+
+class TestCleanup:
+    """Тесты реестра созданных объявлений и их удаления"""
+
+    def test_registry_tracks_created_and_deleted(self):
+        """Созданные объявления попадают в реестр, удаленные тестом - убираются"""
+        hooks = RequestHooks()
+        with FakeAdsServer() as server, FakeAdsServer() as other_server:
+            registry = CreatedItemRegistry(server.url).attach(hooks)
+            api_client = ApiClient(base_url=server.url, hooks=hooks)
+            results = api_client.create_items([get_valid_item_data() for _ in range(5)], max_workers=4)
+            ApiClient(base_url=other_server.url, hooks=hooks).create_item(get_valid_item_data())
+            api_client.delete_item(results[0].item_id)
+            api_client.create_item({"name": "invalid"})
+            registry.detach()
+            api_client.create_item(get_valid_item_data())
+
+        assert sorted(registry.item_ids) == sorted(result.item_id for result in results[1:])
+
+    def test_cleanup_deletes_and_reports(self):
+        """Удаление с ограничением частоты и отчет о неудаленных объявлениях"""
+        registry = CreatedItemRegistry()
+        with FakeAdsServer() as server:
+            api_client = ApiClient(base_url=server.url, hooks=RequestHooks())
+            item_ids = [result.item_id for result in api_client.create_items(
+                [get_valid_item_data() for _ in range(10)], max_workers=4)]
+            for item_id in item_ids:
+                registry.add(item_id)
+            registry.add("already-deleted")
+            api_client.delete_item(item_ids[0])
+            started = time.perf_counter()
+            report = registry.cleanup(api_client, workers=4, rate=100)
+            elapsed = time.perf_counter() - started
+            remaining = [api_client.get_item(item_id).status_code for item_id in item_ids]
+
+        assert sorted(report.deleted) == sorted(item_ids[1:])
+        assert sorted(report.missing) == sorted([item_ids[0], "already-deleted"])
+        assert report.ok
+        assert remaining == [404] * 10
+        assert len(registry) == 0
+        # 11 запросов при 100 в секунду - не быстрее 0.1 с
+        assert elapsed >= 0.09
+
+    def test_cleanup_keeps_failed_items(self):
+        """Объявления, которые не удалось удалить, остаются в реестре"""
+        registry = CreatedItemRegistry()
+        registry.add("item-1")
+        api_client = ApiClient(base_url="http://127.0.0.1:9", hooks=RequestHooks(),
+                               retry_policy=RetryPolicy(max_attempts=1))
+        report = registry.cleanup(api_client, workers=2)
+
+        assert not report.ok
+        assert list(report.failed) == ["item-1"]
+        assert registry.item_ids == ["item-1"]
+        assert "failed=1" in report.summary()
+
+    def test_rate_limiter_spacing(self):
+        """Вызовы acquire() распределяются равномерно с заданной частотой"""
+        limiter = RateLimiter(rate=200)
+        started = time.perf_counter()
+        for _ in range(21):
+            limiter.acquire()
+        assert time.perf_counter() - started >= 0.095
@@ -1,17 +1,102 @@
+import itertools
+import os
 import random
+import threading
 import time
 
+SELLER_ID_MIN = 111111
+SELLER_ID_MAX = 999999
+# Фиксированное значение делает последовательность sellerID воспроизводимой
+SELLER_ID_SEED_ENV = "SELLER_ID_SEED"
+
+
+def get_worker_partition():
+    """(номер воркера, количество воркеров) при параллельном запуске через pytest-xdist"""
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+    count = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", "1"))
+    return int(worker[2:] or 0), max(count, 1)
+
+
+def get_seller_id_range(worker_index, worker_count):
+    """Непересекающийся диапазон sellerID [first, last] для воркера"""
+    size = (SELLER_ID_MAX - SELLER_ID_MIN + 1) // worker_count
+    first = SELLER_ID_MIN + worker_index * size
+    last = SELLER_ID_MAX if worker_index == worker_count - 1 else first + size - 1
+    return first, last
+
+
+class SellerIdSequence:
+    """Последовательность sellerID внутри диапазона воркера без повторов.
+
+    Начальная позиция определяется seed, дальше ID идут подряд по кругу.
+    """
+
+    def __init__(self, first, last, seed=None):
+        self.first = first
+        self.size = last - first + 1
+        self._position = random.Random(seed).randrange(self.size)
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            seller_id = self.first + self._position
+            self._position = (self._position + 1) % self.size
+            return seller_id
+
+
+_seller_ids = None
+_seller_ids_lock = threading.Lock()
+
+
+def _get_seller_id_sequence():
+    global _seller_ids
+    with _seller_ids_lock:
+        if _seller_ids is None:
+            worker_index, worker_count = get_worker_partition()
+            seed = os.environ.get(SELLER_ID_SEED_ENV)
+            seed = f"{seed}-{worker_index}" if seed is not None else None
+            _seller_ids = SellerIdSequence(*get_seller_id_range(worker_index, worker_count), seed=seed)
+        return _seller_ids
+
+
+def reseed_seller_ids(seed):
+    """Начать последовательность sellerID заново с позиции, заданной seed"""
+    global _seller_ids
+    worker_index, worker_count = get_worker_partition()
+    with _seller_ids_lock:
+        _seller_ids = SellerIdSequence(*get_seller_id_range(worker_index, worker_count), seed=seed)
+
+
+def reseed_test_data(seed):
+    """Воспроизводимые данные теста: sellerID с позиции seed и нумерация названий с 1"""
+    global _item_numbers
+    reseed_seller_ids(seed)
+    _item_numbers = itertools.count(1)
+
 
 def generate_seller_id():
-    """Генерация sellerID в допустимом диапазоне"""
-    return random.randint(111111, 999999)
+    """Генерация sellerID в допустимом диапазоне (в своем диапазоне для каждого воркера)"""
+    return _get_seller_id_sequence().next()
+
+
+_frozen_name_time = None
+# Номер объявления в процессе: названия не совпадают в пределах одной секунды
+_item_numbers = itertools.count(1)
+
+
+def freeze_item_name_time(timestamp):
+    """Фиксировать время в названиях объявлений (None - текущее время)"""
+    global _frozen_name_time
+    _frozen_name_time = timestamp
 
 
 def get_valid_item_data():
     """Валидные данные для создания объявления"""
+    timestamp = _frozen_name_time if _frozen_name_time is not None else int(time.time())
+    worker_index, _ = get_worker_partition()
     return {
         "sellerID": generate_seller_id(),
-        "name": f"Test Item {int(time.time())}",
+        "name": f"Test Item {timestamp}-{worker_index}-{next(_item_numbers)}",
         "price": 9900,
         "statistics": {
             "likes": 21,
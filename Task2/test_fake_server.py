@@ -0,0 +1,58 @@
+import pytest
+from api_client import ApiClient, extract_item_id
+from fake_server import FakeAdsServer, FaultInjection, Distribution, parse_bugs
+from test_data import get_valid_item_data, get_negative_price_data
+
+
+class TestFakeServer:
+    """Тесты локального заменителя сервиса (fake_server.py)"""
+
+    def test_spec_mode_create_and_get(self):
+        """По умолчанию сервер возвращает объявление по документации"""
+        with FakeAdsServer() as server:
+            api_client = ApiClient(base_url=server.url)
+            data = get_valid_item_data()
+            create_response = api_client.create_item(data)
+            assert create_response.status_code == 200
+            item_id = create_response.json()["id"]
+
+            get_response = api_client.get_item(item_id)
+            assert get_response.status_code == 200
+            assert get_response.json()[0]["sellerId"] == data["sellerID"]
+
+            seller_response = api_client.get_seller_items(data["sellerID"])
+            assert [item["id"] for item in seller_response.json()] == [item_id]
+
+            assert api_client.delete_item(item_id).status_code == 200
+            assert api_client.get_statistics(item_id).status_code == 404
+
+    def test_bug_compatibility_switches(self):
+        """Переключатели воспроизводят поведение из BUGS.md"""
+        with FakeAdsServer(bugs=parse_bugs("BUG-001,BUG-002,BUG-005")) as server:
+            api_client = ApiClient(base_url=server.url)
+            create_response = api_client.create_item(get_valid_item_data())
+            assert create_response.status_code == 200
+            assert "status" in create_response.json()
+
+            item_id = extract_item_id(create_response.json())
+            assert item_id in server.store.items
+            assert api_client.get_item(item_id).status_code == 400
+            assert api_client.create_item(get_negative_price_data()).status_code == 200
+
+    def test_unknown_bug_switch(self):
+        """Неизвестный переключатель отклоняется"""
+        with pytest.raises(ValueError):
+            parse_bugs("BUG-999")
+
+    def test_injected_errors(self):
+        """Инжекция ошибок возвращает заданный статус"""
+        faults = FaultInjection(error_rate=1.0, error_statuses=[503], seed=1)
+        with FakeAdsServer(faults=faults) as server:
+            response = ApiClient(base_url=server.url).get_item("any")
+            assert response.status_code == 503
+
+    @pytest.mark.parametrize("spec", ["fixed", "uniform:10", "lognormal:a:b", "normal:1:2"])
+    def test_invalid_latency_spec(self, spec):
+        """Невалидное описание распределения задержки"""
+        with pytest.raises(ValueError):
+            Distribution(spec)
@@ -1,7 +1,9 @@
 import pytest
 import json
-from api_client import ApiClient
-from test_data import get_valid_item_data, get_test_ids_for_get_item, generate_seller_id
+from api_client import ApiClient, DEFAULT_POOL_MAXSIZE
+from load_driver import run_load
+from schemas import ERROR, ITEM, ITEM_LIST
+from test_data import get_test_ids_for_get_item, generate_seller_id
 
 
 class TestGetItemById:
@@ -10,21 +12,11 @@ class TestGetItemById:
     def setup_method(self):
         self.api_client = ApiClient()
 
-    def extract_item_id(self, response_data):
-        """Извлечение ID из ответа создания объявления"""
-        if isinstance(response_data, list) and len(response_data) > 0:
-            return response_data[0].get("id")
-        return response_data.get("id")
-
-    def test_get_existing_item_success(self):
+    def test_get_existing_item_success(self, shared_item):
         """Успешное получение существующего объявления по ID"""
-        # Создаем объявление
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        created_item = create_response.json()
-        item_id = self.extract_item_id(created_item)
+        # Объявление из общего пула (только чтение)
+        data = shared_item.data
+        item_id = shared_item.id
 
         # Получаем объявление по ID
         get_response = self.api_client.get_item(item_id)
@@ -37,9 +29,7 @@ class TestGetItemById:
         assert len(response_data) > 0
 
         item = response_data[0]
-        required_fields = ["id", "sellerId", "name", "price", "statistics", "createdAt"]
-        for field in required_fields:
-            assert field in item, f"Missing field '{field}' in response"
+        assert ITEM.errors(item) == []
 
         # Проверяем соответствие данных
         assert item["id"] == item_id
@@ -47,21 +37,13 @@ class TestGetItemById:
         assert item["name"] == data["name"]
         assert item["price"] == data["price"]
 
-        # Проверяем статистику
-        stats = item["statistics"]
-        assert "likes" in stats
-        assert "viewCount" in stats
-        assert "contacts" in stats
-
     def test_get_nonexistent_item(self):
         """Попытка получения несуществующего объявления"""
         response = self.api_client.get_item("nonexistent_id_12345")
         assert response.status_code == 404
 
         # Проверяем структуру ошибки
-        error_data = response.json()
-        assert "result" in error_data
-        assert "status" in error_data
+        assert ERROR.errors(response.json()) == []
 
     def test_get_item_empty_id(self):
         """Попытка получения с пустым ID"""
@@ -102,13 +84,10 @@ class TestGetItemById:
         response = self.api_client.get_item("123456")
         assert response.status_code == 404
 
-    def test_get_item_response_structure(self):
+    def test_get_item_response_structure(self, shared_item):
         """Проверка структуры ответа для существующего объявления"""
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
         get_response = self.api_client.get_item(item_id)
         assert get_response.status_code == 200
 
@@ -118,29 +97,14 @@ class TestGetItemById:
         assert isinstance(response_data, list)
         item = response_data[0]
 
-        # Проверка типов данных
-        assert isinstance(item["id"], str)
-        assert isinstance(item["sellerId"], int)
-        assert isinstance(item["name"], str)
-        assert isinstance(item["price"], int)
-        assert isinstance(item["createdAt"], str)
-        assert isinstance(item["statistics"], dict)
-
-        # Проверка статистики
-        stats = item["statistics"]
-        assert isinstance(stats["likes"], int)
-        assert isinstance(stats["viewCount"], int)
-        assert isinstance(stats["contacts"], int)
-
-    def test_get_item_data_consistency(self):
-        """Проверка согласованности данных при создании и получении"""
-        # Создаем объявление
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
+        # Проверка полей и типов данных, включая статистику
+        assert ITEM.errors(item) == []
 
-        created_item = create_response.json()
-        item_id = self.extract_item_id(created_item)
+    def test_get_item_data_consistency(self, shared_item):
+        """Проверка согласованности данных при создании и получении"""
+        # Объявление из общего пула (только чтение)
+        data = shared_item.data
+        item_id = shared_item.id
 
         # Получаем объявление
         get_response = self.api_client.get_item(item_id)
@@ -162,13 +126,10 @@ class TestGetItemById:
         assert retrieved_stats["viewCount"] == created_stats["viewCount"]
         assert retrieved_stats["contacts"] == created_stats["contacts"]
 
-    def test_get_item_multiple_times(self):
+    def test_get_item_multiple_times(self, shared_item):
         """Многократное получение одного и того же объявления"""
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
 
         # Получаем несколько раз
         for i in range(3):
@@ -178,15 +139,10 @@ class TestGetItemById:
             assert len(items) > 0
             assert items[0]["id"] == item_id
 
-    def test_get_item_after_modification(self):
+    def test_get_item_after_modification(self, shared_item):
         """Получение объявления после создания (проверка временных меток)"""
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        created_item = create_response.json()
-        item_id = self.extract_item_id(created_item)
-        created_at = created_item.get("createdAt")
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
 
         # Получаем объявление и проверяем временную метку
         get_response = self.api_client.get_item(item_id)
@@ -223,42 +179,40 @@ class TestGetItemPerformance:
     def setup_method(self):
         self.api_client = ApiClient()
 
-    def extract_item_id(self, response_data):
-        return response_data.get("id")
-
-    def test_get_item_response_time(self):
+    def test_get_item_response_time(self, latency_recorder, shared_item):
         """Проверка времени ответа для получения объявления"""
-        # Создаем объявление
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
-
-        # Измеряем время выполнения
-        import time
-        start_time = time.time()
-        get_response = self.api_client.get_item(item_id)
-        end_time = time.time()
-
-        assert get_response.status_code == 200
-        response_time = end_time - start_time
-
-        # Операция должна выполняться быстро (менее 2 секунд)
-        assert response_time < 2, f"Response time too slow: {response_time} seconds"
-
-    def test_get_item_concurrent_requests(self):
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
+
+        # Измеряем время выполнения серией запросов после прогрева
+        histogram = latency_recorder.measure(
+            "GET /api/1/item/:id",
+            lambda: self.api_client.get_item(item_id),
+            accept_status=[200]
+        )
+        assert histogram.count == latency_recorder.iterations, "Not all responses were 200"
+
+        # Операция должна выполняться быстро (p95 менее 2 секунд)
+        p95_ms = histogram.percentile_ms(95)
+        assert p95_ms < 2000, f"Response time too slow: p95={p95_ms:.1f} ms"
+
+    def test_get_item_concurrent_requests(self, load_config, shared_item):
         """Проверка поведения при конкурентных запросах"""
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
 
-        item_id = self.extract_item_id(create_response.json())
+        # Параллельная нагрузка: воркеров не больше, чем соединений в пуле
+        api_client = ApiClient(pool_maxsize=max(DEFAULT_POOL_MAXSIZE, load_config.workers))
+        result = run_load(
+            lambda: api_client.get_item(item_id),
+            workers=load_config.workers,
+            total_requests=load_config.total_requests,
+            target_rps=load_config.target_rps,
+            schema=ITEM_LIST
+        )
 
-        # Делаем несколько последовательных запросов
-        for i in range(5):
-            response = self.api_client.get_item(item_id)
-            assert response.status_code == 200
+        violations = load_config.slo.violations(result)
+        assert not violations, f"SLO breached: {'; '.join(violations)} ({result.summary()})"
 
 
 class TestGetItemErrorScenarios:
@@ -274,16 +228,13 @@ class TestGetItemErrorScenarios:
         # Сервер должен корректно обрабатывать такие случаи
         assert response.status_code != 500  # Не должно быть Internal Server Error
 
-    def test_get_item_network_issues(self):
+    def test_get_item_network_issues(self, shared_item):
         """Проверка поведения при проблемах с сетью"""
         # Тест на таймауты и сетевые ошибки
         # Этот тест может быть сложно воспроизвести в автоматическом режиме
         # Но мы можем проверить, что клиент корректно обрабатывает ошибки
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
 
         # Нормальный запрос должен работать
         response = self.api_client.get_item(item_id)
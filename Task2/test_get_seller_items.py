@@ -1,6 +1,11 @@
 import pytest
 import random
+import asyncio
+import json
 from api_client import ApiClient
+from async_api_client import AsyncApiClient
+from json_stream import iter_json_array
+from schemas import ITEM, ITEM_LIST
 from test_data import get_valid_item_data, generate_seller_id, get_multiple_items_data
 
 
@@ -36,9 +41,7 @@ class TestGetSellerItems:
         # Проверяем, что все объявления принадлежат этому продавцу
         for item in response_data:
             assert item["sellerId"] == seller_id
-            required_fields = ["id", "sellerId", "name", "price", "statistics", "createdAt"]
-            for field in required_fields:
-                assert field in item, f"Missing field '{field}' in response"
+        assert ITEM_LIST.errors(response_data) == []
 
     def test_get_seller_items_empty_list(self):
         """Получение объявлений продавца без объявлений"""
@@ -114,28 +117,10 @@ class TestGetSellerItems:
         create_response = self.api_client.create_item(data)
         assert create_response.status_code == 200
 
-        # Получаем объявления продавца
-        get_response = self.api_client.get_seller_items(seller_id)
-        assert get_response.status_code == 200
-
-        response_data = get_response.json()
-        assert isinstance(response_data, list)
-
-        if len(response_data) > 0:
-            item = response_data[0]
-            # Проверяем типы данных
-            assert isinstance(item["id"], str)
-            assert isinstance(item["sellerId"], int)
-            assert isinstance(item["name"], str)
-            assert isinstance(item["price"], int)
-            assert isinstance(item["createdAt"], str)
-            assert isinstance(item["statistics"], dict)
-
-            # Проверяем статистику
-            stats = item["statistics"]
-            assert isinstance(stats["likes"], int)
-            assert isinstance(stats["viewCount"], int)
-            assert isinstance(stats["contacts"], int)
+        # Получаем объявления продавца потоково и проверяем каждое по мере получения
+        for item in self.api_client.iter_seller_items(seller_id):
+            # Проверяем поля и типы данных, включая статистику
+            assert ITEM.errors(item) == []
 
     def test_get_seller_items_data_consistency(self):
         """Проверка согласованности данных при создании и получении"""
@@ -208,10 +193,10 @@ class TestGetSellerItems:
 
         # Создаем несколько объявлений
         items_count = 3
-        for i in range(items_count):
-            data = get_multiple_items_data(seller_id, i + 1)
-            create_response = self.api_client.create_item(data)
-            assert create_response.status_code == 200
+        results = self.api_client.create_items(get_multiple_items_data(seller_id, i + 1) for i in range(items_count))
+        for result in results:
+            assert result.error is None, result.error
+            assert result.response.status_code == 200
 
         # Получаем объявления
         response = self.api_client.get_seller_items(seller_id)
@@ -230,35 +215,69 @@ class TestGetSellerItems:
                 assert items[i]["createdAt"] is not None
 
 
+class TestGetSellerItemsStreaming:
+    """Тесты потокового получения объявлений продавца"""
+
+    def setup_method(self):
+        self.api_client = ApiClient()
+
+    def test_iter_seller_items_matches_json(self):
+        """Потоковый разбор возвращает те же объявления, что и response.json()"""
+        seller_id = generate_seller_id()
+        results = self.api_client.create_items(get_multiple_items_data(seller_id, i + 1) for i in range(3))
+        assert all(result.ok for result in results)
+
+        streamed = list(self.api_client.iter_seller_items(seller_id, chunk_size=7))
+        assert streamed == self.api_client.get_seller_items(seller_id).json()
+
+    def test_iter_seller_items_invalid_seller(self):
+        """Ошибочный статус ответа прерывает потоковое чтение"""
+        with pytest.raises(Exception, match="Unexpected status"):
+            list(self.api_client.iter_seller_items("invalid_string"))
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 64])
+    def test_iter_json_array_chunk_boundaries(self, chunk_size):
+        """Элементы, разрезанные границами кусков, собираются корректно"""
+        items = [{"name": "Тест 🐸", "price": -1.5e3}, 123456, "строка", True, None, []]
+        body = json.dumps(items, ensure_ascii=False).encode("utf-8")
+        chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        assert list(iter_json_array(chunks)) == items
+
+
 class TestGetSellerItemsPerformance:
     """Тесты производительности для эндпоинта GET /api/1/:sellerID/item"""
 
     def setup_method(self):
         self.api_client = ApiClient()
 
-    def test_get_seller_items_response_time(self):
+    def test_get_seller_items_response_time(self, latency_recorder):
         """Проверка времени ответа"""
         seller_id = generate_seller_id()
 
-        import time
-        start_time = time.time()
-        response = self.api_client.get_seller_items(seller_id)
-        end_time = time.time()
-
-        assert response.status_code == 200
-        response_time = end_time - start_time
+        histogram = latency_recorder.measure(
+            "GET /api/1/:sellerID/item",
+            lambda: self.api_client.get_seller_items(seller_id),
+            accept_status=[200]
+        )
+        assert histogram.count == latency_recorder.iterations, "Not all responses were 200"
 
         # Операция должна выполняться быстро
-        assert response_time < 3, f"Response time too slow: {response_time} seconds"
+        p95_ms = histogram.percentile_ms(95)
+        assert p95_ms < 3000, f"Response time too slow: p95={p95_ms:.1f} ms"
 
     def test_get_seller_items_with_many_items(self):
         """Проверка работы с большим количеством объявлений"""
         seller_id = generate_seller_id()
 
-        # Создаем несколько объявлений
-        for i in range(5):
-            data = get_multiple_items_data(seller_id, i + 1)
-            create_response = self.api_client.create_item(data)
+        # Создаем несколько объявлений конкурентно
+        async def create_items():
+            async with AsyncApiClient() as async_client:
+                return await asyncio.gather(*[
+                    async_client.create_item(get_multiple_items_data(seller_id, i + 1))
+                    for i in range(5)
+                ])
+
+        for create_response in asyncio.run(create_items()):
             assert create_response.status_code == 200
 
         # Получаем все объявления
@@ -0,0 +1,68 @@
+import pytest
+from api_client import ApiClient
+from fake_server import Distribution, FakeAdsServer, FaultInjection
+from instrumentation import MetricsCollector, RequestHooks
+from resilience import CircuitBreakerRegistry, RetryPolicy
+from test_data import get_valid_item_data
+
+
+class TestInstrumentation:
+    """Тесты хуков ApiClient и сборщика метрик"""
+
+    def make_client(self, server, hooks, **options):
+        return ApiClient(
+            base_url=server.url,
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breakers=CircuitBreakerRegistry(enabled=False),
+            hooks=hooks,
+            **options
+        )
+
+    def test_hooks_called_for_each_attempt(self):
+        """pre_request и post_response вызываются с эндпоинтом и ответом"""
+        hooks = RequestHooks()
+        calls = []
+        hooks.add("pre_request", lambda event: calls.append(("pre", event.endpoint)))
+        hooks.add("post_response", lambda event: calls.append(("post", event.response.status_code)))
+        with FakeAdsServer() as server:
+            api_client = self.make_client(server, hooks)
+            api_client.get_item("any")
+
+        assert calls == [("pre", "GET /api/1/item/:id"), ("post", 404)]
+
+    def test_on_error_hook(self):
+        """on_error получает ошибку запроса"""
+        hooks = RequestHooks()
+        errors = []
+        hooks.add("on_error", lambda event: errors.append(str(event.error)))
+        faults = FaultInjection(route_latency={"get_item": Distribution("fixed:300")})
+        with FakeAdsServer(faults=faults) as server:
+            api_client = self.make_client(server, hooks, timeouts={"GET /api/1/item/:id": (1, 0.05)})
+            with pytest.raises(Exception, match="Request timeout"):
+                api_client.get_item("any")
+
+        assert len(errors) == 1
+        assert errors[0].startswith("Request timeout")
+
+    def test_collector_openmetrics(self):
+        """Сборщик считает ответы, байты и фазы по эндпоинтам"""
+        hooks = RequestHooks()
+        collector = MetricsCollector().attach(hooks)
+        with FakeAdsServer() as server:
+            api_client = self.make_client(server, hooks)
+            item_id = api_client.create_items([get_valid_item_data()])[0].item_id
+            api_client.get_item(item_id)
+            api_client.get_item("any")
+
+        metrics = collector.endpoints["GET /api/1/item/:id"]
+        assert metrics.statuses == {"200": 1, "404": 1}
+        assert metrics.phases["total"].count == 2
+        assert metrics.response_bytes > 0
+
+        text = collector.to_openmetrics()
+        assert 'api_client_responses_total{endpoint="POST /api/1/item",status="200"} 1' in text
+        assert 'api_client_ttfb_seconds_count{endpoint="GET /api/1/item/:id"} 2' in text
+        assert text.endswith("# EOF\n")
+
+        collector.detach()
+        assert not hooks
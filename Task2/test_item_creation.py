@@ -1,6 +1,10 @@
 import pytest
+import random
 import re
-from api_client import ApiClient
+from api_client import ApiClient, DEFAULT_POOL_MAXSIZE
+from open_loop import constant, run_open_loop
+from payloads import PayloadGenerator
+from schemas import ITEM
 from test_data import (
     get_valid_item_data,
     get_negative_price_data,
@@ -34,9 +38,7 @@ class TestItemCreation:
         response_data = response.json()
 
         # БАГ: Формат ответа не соответствует документации
-        required_fields = ["id", "sellerId", "name", "price", "statistics", "createdAt"]
-        for field in required_fields:
-            assert field in response_data, f"Missing field '{field}' in response"
+        assert ITEM.errors(response_data) == []
 
     @pytest.mark.parametrize("missing_field", ["sellerID", "name", "price", "statistics"])
     def test_create_item_missing_required_fields(self, missing_field):
@@ -94,10 +96,50 @@ class TestItemCreation:
         """Несколько объявлений от одного продавца"""
         seller_id = generate_seller_id()
 
-        for i in range(2):
-            data = get_multiple_items_data(seller_id, i + 1)
-            response = self.api_client.create_item(data)
-            assert response.status_code == 200
+        results = self.api_client.create_items(get_multiple_items_data(seller_id, i + 1) for i in range(2))
+        for result in results:
+            assert result.error is None, result.error
+            assert result.response.status_code == 200
+
+    def test_create_items_bulk_keeps_order_and_failures(self):
+        """Пакетное создание: порядок результатов и ошибки отдельных объявлений"""
+        payloads = [get_valid_item_data(), get_zero_price_data(), get_minimal_price_data()]
+        results = self.api_client.create_items(payloads, max_workers=3)
+
+        assert [result.index for result in results] == [0, 1, 2]
+        assert [result.payload for result in results] == payloads
+        assert results[0].response.status_code == 200
+        assert results[1].response.status_code == 400
+        assert not results[1].ok
+        assert results[2].response.status_code == 200
+
+    def check_cases(self, documented):
+        """Создать граничные случаи генератора тел: 200 для валидных, 400 для остальных"""
+        # С кассетой random засеян ID теста, поэтому тела воспроизводимы
+        generator = PayloadGenerator(seed=random.getrandbits(32), seller_ids=generate_seller_id)
+        cases = [case for case in generator.cases() if case.documented == documented]
+        results = self.api_client.create_items((case.data for case in cases), max_workers=8)
+
+        mismatches = []
+        for case, result in zip(cases, results):
+            expected = 200 if case.valid else 400
+            actual = result.response.status_code if result.response is not None else result.error
+            if actual != expected:
+                mismatches.append(f"{case.case}: expected {expected}, got {actual}")
+        assert mismatches == [], f"seed={generator.seed}"
+
+    def test_create_item_boundary_cases(self):
+        """Граничные значения всех полей из контракта (TESTCASES.md, BUGS.md)"""
+        self.check_cases(documented=True)
+
+    # Ожидания этого теста - предположения, которых нет ни в контракте, ни в BUGS.md:
+    # цена и статистика больше INT32_MAX, названия до 4096 символов, управляющие
+    # символы и emoji, значения других типов. Расхождение - повод уточнить
+    # требования, а не баг, поэтому тест не роняет прогон.
+    @pytest.mark.xfail(reason="ожидания вне документированного контракта", strict=False)
+    def test_create_item_exploratory_cases(self):
+        """Исследовательские граничные значения вне контракта"""
+        self.check_cases(documented=False)
 
     def test_get_created_item(self):
         """Создание и получение объявления"""
@@ -124,3 +166,22 @@ class TestItemCreation:
         response = self.api_client.create_item(data)
         assert response.status_code == 200
 
+
+class TestItemCreationPerformance:
+    """Нагрузка открытого типа на POST /api/1/item"""
+
+    def test_create_item_open_loop(self, load_config):
+        """Постоянная интенсивность создания: задержки от запланированного времени в пределах SLO"""
+        rate = load_config.target_rps or 50
+        api_client = ApiClient(pool_maxsize=max(DEFAULT_POOL_MAXSIZE, load_config.workers))
+        generator = PayloadGenerator(seed=random.getrandbits(32), seller_ids=generate_seller_id)
+        result = run_open_loop(
+            api_client.create_item,
+            constant(rate, load_config.total_requests / rate),
+            payloads=generator.stream(),
+            max_in_flight=max(DEFAULT_POOL_MAXSIZE, load_config.workers)
+        )
+
+        assert result.dropped == 0, result.summary()
+        violations = load_config.slo.violations(result.result)
+        assert not violations, f"SLO breached: {'; '.join(violations)} ({result.summary()})"
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from open_loop import DROPPED, Stage, constant, ramp, run_open_loop, steps
+
+
+class FakeResponse:
+    status_code = 200
+
+
+class SerialService:
+    """Сервис, обрабатывающий один запрос за service_time секунд"""
+
+    def __init__(self, service_time):
+        self.service_time = service_time
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            time.sleep(self.service_time)
+        return FakeResponse()
+
+
+class TestOpenLoop:
+    """Тесты нагрузки открытого типа"""
+
+    def test_arrival_schedule(self):
+        """Расписание отправок для постоянной и растущей интенсивности"""
+        assert [round(offset, 6) for offset in Stage(10, 10, 0.5).arrivals()] == [0.0, 0.1, 0.2, 0.3, 0.4]
+        offsets = list(ramp(0, 100, 1)[0].arrivals())
+        # Всего r_avg * T = 50 отправок, вторая половина плотнее первой
+        assert len(offsets) == 50
+        assert sum(1 for offset in offsets if offset >= 0.5) == 37
+        assert list(Stage(0, 0, 1).arrivals()) == []
+        assert len(steps([10, 20], 1)) == 2
+
+    def test_latency_from_intended_time_and_saturation(self):
+        """Очередь перед перегруженным сервисом видна в задержке, насыщение обнаруживается"""
+        service = SerialService(0.01)  # не больше 100 rps
+        result = run_open_loop(service, steps([20, 40, 200], 0.4), window=0.4)
+
+        healthy, busy, overloaded = result.windows
+        assert healthy.offered_rate == 20
+        assert result.saturation is overloaded
+        assert result.max_sustained_rate == 40
+        assert not result.saturated(healthy)
+        # Задержка от запланированного времени включает ожидание в очереди:
+        # на ступени 200 rps очередь растет на ~1 с за секунду
+        assert overloaded.result.percentile(95) > 100
+        assert overloaded.throughput < 150
+        assert "Насыщение при 200.0 rps" in result.summary()
+
+    def test_dropped_when_in_flight_limit_reached(self):
+        """Сверх max_in_flight запросы не отправляются, а учитываются как dropped"""
+        service = SerialService(0.05)
+        result = run_open_loop(service, constant(100, 0.3), max_in_flight=2)
+
+        assert result.dropped > 20
+        assert result.result.total + result.dropped == 30
+        assert DROPPED not in result.result.outcomes
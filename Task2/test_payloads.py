@@ -0,0 +1,49 @@
+import itertools
+from payloads import INT32_MAX, INT64_MAX, PayloadGenerator
+from schemas import Schema, STATISTICS
+from test_data import SELLER_ID_MAX, SELLER_ID_MIN
+
+CREATE_ITEM = Schema("create item", {"sellerID": int, "name": str, "price": int, "statistics": STATISTICS})
+
+
+class TestPayloadGenerator:
+    """Тесты генератора тел запросов"""
+
+    def test_same_seed_same_payloads(self):
+        """Один seed - одна и та же последовательность, другой seed - другая"""
+        first = [payload.data for payload in PayloadGenerator(seed=42).fuzz(200)]
+        second = [payload.data for payload in PayloadGenerator(seed=42).fuzz(200)]
+        other = [payload.data for payload in PayloadGenerator(seed=43).fuzz(200)]
+        assert first == second
+        assert first != other
+
+    def test_stream_is_lazy_valid_and_unique(self):
+        """Поток валидных тел ленивый, названия не повторяются"""
+        stream = PayloadGenerator(seed=1).stream()
+        assert next(stream)["name"] != next(stream)["name"]
+        payloads = list(itertools.islice(stream, 20000))
+        assert len({payload["name"] for payload in payloads}) == len(payloads)
+        for payload in payloads[:1000]:
+            assert CREATE_ITEM.errors(payload) == []
+            assert SELLER_ID_MIN <= payload["sellerID"] <= SELLER_ID_MAX
+            assert payload["price"] > 0
+        # Сервис отклоняет нули в statistics (BUG-004), валидные тела их не содержат
+        assert all(min(payload["statistics"].values()) > 0 for payload in payloads)
+
+    def test_cases_cover_boundaries(self):
+        """Граничные значения каждого поля, валидные и невалидные"""
+        cases = {payload.case: payload for payload in PayloadGenerator(seed=1).cases()}
+        assert cases["sellerID=111111"].valid
+        assert not cases["sellerID=1000000"].valid
+        assert cases[f"price={INT32_MAX}"].data["price"] == INT32_MAX
+        assert not cases["price=0"].valid
+        assert not cases["statistics.likes=-1"].valid
+        assert "contacts" not in cases["statistics.contacts missing"].data["statistics"]
+        assert len(cases["name=cyrillic[4096]"].data["name"]) == 4096
+        assert not cases["name=''"].valid
+        # Ожидания вне контракта помечены отдельно
+        assert cases["price=2147483647"].documented and cases["statistics.likes=0"].documented
+        assert not cases[f"price={INT64_MAX}"].documented
+        assert not cases["name=cyrillic[4096]"].documented and not cases["name=control[1]"].documented
+        assert all(case.data["name"].strip() for case in cases.values()
+                   if case.documented and case.case.startswith("name=") and case.valid)
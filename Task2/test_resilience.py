@@ -0,0 +1,232 @@
+import time
+
+import pytest
+import requests
+from api_client import ApiClient
+from fake_server import Distribution, FakeAdsServer, FaultInjection
+from resilience import CircuitBreaker, CircuitBreakerRegistry, RetryBudget, RetryPolicy
+from test_data import get_valid_item_data
+from timeouts import DeadlineExceeded, current_deadline, deadline_scope
+
+
+def no_sleep(seconds):
+    pass
+
+
+class TestRetryPolicy:
+    """Тесты повторов запросов в ApiClient"""
+
+    def make_client(self, server, **policy_options):
+        policy = RetryPolicy(sleep=no_sleep, **policy_options)
+        return ApiClient(
+            base_url=server.url,
+            retry_policy=policy,
+            circuit_breakers=CircuitBreakerRegistry(enabled=False)
+        ), policy
+
+    def test_get_retried_on_server_error(self):
+        """GET повторяется при 503 и возвращает последний ответ"""
+        faults = FaultInjection(error_rate=1.0, error_statuses=[503], seed=1)
+        with FakeAdsServer(faults=faults) as server:
+            api_client, policy = self.make_client(server, max_attempts=3)
+            response = api_client.get_item("any")
+
+            assert response.status_code == 503
+            assert policy.counters["attempts"] == 3
+            assert policy.counters["retries"] == 2
+            assert policy.counters["gave_up"] == 1
+            assert policy.amplification == 3
+
+    def test_get_retried_on_connection_reset(self):
+        """GET повторяется после разрыва соединения и завершается успешно"""
+        with FakeAdsServer() as server:
+            api_client, policy = self.make_client(server, max_attempts=5)
+            server.faults = FaultInjection(reset_rate=0.5, seed=3)
+            for _ in range(10):
+                assert api_client.get_item("any").status_code == 404
+            assert policy.counters["retries"] > 0
+
+    def test_post_not_retried(self):
+        """POST не идемпотентен и не повторяется"""
+        faults = FaultInjection(error_rate=1.0, error_statuses=[503], seed=1)
+        with FakeAdsServer(faults=faults) as server:
+            api_client, policy = self.make_client(server, max_attempts=3)
+            response = api_client.create_item(get_valid_item_data())
+
+            assert response.status_code == 503
+            assert policy.counters["attempts"] == 1
+            assert policy.counters["retries"] == 0
+
+    def test_retry_budget_limits_amplification(self):
+        """Бюджет повторов ограничивает число повторов"""
+        faults = FaultInjection(error_rate=1.0, error_statuses=[503], seed=1)
+        with FakeAdsServer(faults=faults) as server:
+            api_client, policy = self.make_client(
+                server, max_attempts=3, budget=RetryBudget(ratio=0.1, min_tokens=2)
+            )
+            for _ in range(10):
+                api_client.get_item("any")
+
+            assert policy.counters["budget_exhausted"] > 0
+            assert policy.counters["retries"] < 10
+
+    def test_backoff_is_bounded(self):
+        """Задержка перед повтором не превышает backoff_max"""
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=1.0)
+        for retry_number in range(10):
+            assert 0 <= policy.backoff(retry_number) <= 1.0
+
+
+class TestCircuitBreaker:
+    """Тесты circuit breaker по эндпоинтам"""
+
+    def test_breaker_opens_and_fails_fast(self):
+        """После серии ошибок запросы отклоняются без обращения к сервису"""
+        faults = FaultInjection(error_rate=1.0, error_statuses=[500], seed=1)
+        registry = CircuitBreakerRegistry(failure_threshold=0.5, window_size=10, min_requests=4, reset_timeout=60)
+        with FakeAdsServer(faults=faults) as server:
+            api_client = ApiClient(base_url=server.url, retry_policy=RetryPolicy(max_attempts=1),
+                                   circuit_breakers=registry)
+            for _ in range(4):
+                assert api_client.get_item("any").status_code == 500
+            with pytest.raises(Exception, match="Circuit open"):
+                api_client.get_item("any")
+
+            # Другие эндпоинты не затронуты
+            assert api_client.get_statistics("any").status_code == 500
+            counters = registry.counters()[f"{server.url} GET /api/1/item/:id"]
+            assert counters["state"] == CircuitBreaker.OPEN
+            assert counters["short_circuited"] == 1
+
+    def test_breaker_half_open_recovers(self):
+        """После reset_timeout пробный успешный запрос замыкает цепь"""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=0.5, window_size=4, min_requests=2,
+                                 reset_timeout=10, clock=lambda: now[0])
+        breaker.record(False)
+        breaker.record(False)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        now[0] = 11
+        assert breaker.allow()
+        assert not breaker.allow()  # пока пробный запрос не завершен
+        breaker.record(True)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow()
+
+    def test_half_open_probe_released_on_request_error(self):
+        """Ошибка requests вне Timeout/ConnectionError на пробном запросе снова размыкает цепь"""
+        class BrokenSession(requests.Session):
+            def request(self, method, url, **kwargs):
+                raise requests.exceptions.ChunkedEncodingError("broken body")
+
+        now = [0.0]
+        registry = CircuitBreakerRegistry(window_size=4, min_requests=2, reset_timeout=10, clock=lambda: now[0])
+        api_client = ApiClient(base_url="http://127.0.0.1:9", session=BrokenSession(),
+                               retry_policy=RetryPolicy(max_attempts=1), circuit_breakers=registry)
+        breaker = registry.get(f"{api_client.base_url} GET /api/1/item/:id")
+        breaker.record(False)
+        breaker.record(False)
+
+        now[0] = 11
+        with pytest.raises(Exception, match="Request failed"):
+            api_client.get_item("any")
+        assert breaker.state == CircuitBreaker.OPEN
+        now[0] = 22
+        assert breaker.allow()
+
+
+class TestTimeouts:
+    """Тесты таймаутов по эндпоинтам и дедлайнов"""
+
+    def make_client(self, server, **options):
+        return ApiClient(
+            base_url=server.url,
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breakers=CircuitBreakerRegistry(enabled=False),
+            **options
+        )
+
+    def slow_route(self, route, delay_ms):
+        return FaultInjection(route_latency={route: Distribution(f"fixed:{delay_ms}")})
+
+    def test_endpoint_read_timeout(self):
+        """Таймаут чтения берется из профиля эндпоинта"""
+        with FakeAdsServer(faults=self.slow_route("get_item", 300)) as server:
+            api_client = self.make_client(server, timeouts={"GET /api/1/item/:id": (1, 0.1)})
+            with pytest.raises(Exception, match="Request timeout"):
+                api_client.get_item("any")
+            # У других эндпоинтов профиль по умолчанию
+            assert api_client.get_statistics("any").status_code in [400, 404]
+
+    def test_deadline_cuts_request(self):
+        """Запрос прерывается по дедлайну раньше таймаута эндпоинта"""
+        with FakeAdsServer(faults=self.slow_route("get_item", 500)) as server:
+            api_client = self.make_client(server)
+            start = time.perf_counter()
+            with deadline_scope(0.2):
+                with pytest.raises(DeadlineExceeded):
+                    api_client.get_item("any")
+                # После истечения дедлайна запросы не отправляются
+                with pytest.raises(DeadlineExceeded):
+                    api_client.get_statistics("any")
+            assert time.perf_counter() - start < 0.45
+
+    def test_deadline_is_not_endpoint_failure(self):
+        """Истекший дедлайн вызывающего не засчитывается circuit breaker'у как ошибка эндпоинта"""
+        registry = CircuitBreakerRegistry(failure_threshold=0.5, window_size=4, min_requests=1)
+        with FakeAdsServer(faults=self.slow_route("get_item", 500)) as server:
+            api_client = ApiClient(base_url=server.url, retry_policy=RetryPolicy(max_attempts=1),
+                                   circuit_breakers=registry)
+            with deadline_scope(0.1):
+                with pytest.raises(DeadlineExceeded):
+                    api_client.get_item("any")
+
+            counters = registry.counters()[f"{server.url} GET /api/1/item/:id"]
+            assert counters["state"] == CircuitBreaker.CLOSED
+            assert counters["failures"] == 0
+            # Таймаут самого эндпоинта по-прежнему ошибка
+            api_client.timeouts["GET /api/1/item/:id"] = (1, 0.1)
+            with pytest.raises(Exception, match="Request timeout"):
+                api_client.get_item("any")
+            assert registry.counters()[f"{server.url} GET /api/1/item/:id"]["state"] == CircuitBreaker.OPEN
+
+    def test_deadline_expiring_before_send(self):
+        """Дедлайн, истекший между проверкой и отправкой, - DeadlineExceeded до захвата пробы half-open цепи"""
+        now = [0.0]
+        registry = CircuitBreakerRegistry(window_size=4, min_requests=2, reset_timeout=10, clock=lambda: now[0])
+        with FakeAdsServer() as server:
+            api_client = ApiClient(base_url=server.url, retry_policy=RetryPolicy(max_attempts=1),
+                                   circuit_breakers=registry)
+            breaker = registry.get(f"{server.url} GET /api/1/item/:id")
+            breaker.record(False)
+            breaker.record(False)
+            now[0] = 11
+            with deadline_scope(1) as deadline:
+                # Проверка expired видит остаток, а clip - уже истекший дедлайн
+                deadline.clock = iter([deadline.expires_at - 0.5, deadline.expires_at + 1]).__next__
+                with pytest.raises(DeadlineExceeded):
+                    api_client.get_item("any")
+            assert breaker.allow()
+
+    def test_create_items_stops_at_deadline(self):
+        """После дедлайна оставшиеся объявления пакета не отправляются"""
+        with FakeAdsServer(faults=self.slow_route("create_item", 100)) as server:
+            api_client = self.make_client(server)
+            with deadline_scope(0.25):
+                results = api_client.create_items((get_valid_item_data() for _ in range(20)), max_workers=2)
+
+            assert [result.index for result in results] == list(range(20))
+            assert results[0].ok
+            assert results[-1].error == "Deadline exceeded"
+            assert len(server.store.items) < 20
+
+    @pytest.mark.deadline(30)
+    def test_deadline_marker(self):
+        """Маркер deadline задает дедлайн на весь тест"""
+        deadline = current_deadline()
+        assert deadline is not None
+        with deadline_scope(60) as nested:
+            # Вложенная область не продлевает внешний дедлайн
+            assert nested is deadline
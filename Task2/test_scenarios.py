@@ -0,0 +1,86 @@
+import asyncio
+import os
+
+import pytest
+from async_api_client import AsyncApiClient
+from scenarios import Scenario, ScenarioRunner
+
+SCENARIO_FILE = os.path.join(os.path.dirname(__file__), "scenarios", "production_mix.json")
+
+
+def make_scenario(**overrides):
+    data = {
+        "name": "test-mix",
+        "users": 4,
+        "iterations": 5,
+        "seed": 7,
+        "flows": [
+            {"name": "view_item", "weight": 3, "steps": [{"call": "get_item"}, {"call": "get_statistics"}]},
+            {"name": "seller_page", "weight": 1, "steps": [{"call": "get_seller_items"}]},
+            {"name": "lifecycle", "weight": 1, "steps": [
+                {"call": "create_item"}, {"call": "get_item"}, {"call": "get_statistics_v2"},
+                {"call": "delete_item"}, {"call": "get_item", "name": "get_deleted", "expect": [404]}
+            ]},
+        ],
+    }
+    data.update(overrides)
+    return Scenario.from_dict(data)
+
+
+class TestScenarios:
+    """Тесты смешанной нагрузки по сценарию"""
+
+    def test_scenario_file_is_valid(self):
+        """Сценарий из репозитория разбирается, веса в основном у чтения"""
+        scenario = Scenario.load(SCENARIO_FILE)
+        writes = sum(flow.weight for flow in scenario.flows
+                     if any(step.call in ("create_item", "delete_item") for step in flow.steps))
+        assert writes / sum(flow.weight for flow in scenario.flows) <= 0.1
+        assert scenario.needs_setup
+
+    @pytest.mark.parametrize("overrides, message", [
+        ({"flows": [{"steps": [{"call": "drop_table"}]}]}, "unknown call 'drop_table'"),
+        ({"flows": [{"weight": 0, "steps": [{"call": "get_item"}]}]}, "weight must be positive"),
+        ({"flows": [{"steps": [{"call": "get_item"}, {"call": "get_item"}]}]}, "step names must be unique"),
+        ({"think_time": [2, 1]}, "think_time"),
+        ({"iterations": None}, "duration or iterations"),
+        ({"flows": [{"steps": [{"call": "get_item", "expect": "404"}]}]}, "expect must be a status code"),
+        ({"flows": [{"steps": [{"call": "get_item", "expect": []}]}]}, "expect must be a status code"),
+    ])
+    def test_invalid_scenario(self, overrides, message):
+        """Ошибки формата сценария указывают место"""
+        with pytest.raises(ValueError, match=message):
+            make_scenario(**overrides)
+
+    def test_mixed_workload(self, item_pool):
+        """Все потоки выполняются, у каждого шага - задержки и ожидаемые коды ответа"""
+        scenario = make_scenario()
+
+        async def run():
+            async with AsyncApiClient(max_concurrency=scenario.users) as client:
+                return await ScenarioRunner(scenario, client, pool=item_pool).run()
+
+        result = asyncio.run(run())
+
+        assert sum(result.flows.values()) == scenario.users * scenario.iterations
+        assert result.flows["lifecycle"] > 0
+        for key, step in result.steps.items():
+            assert step.errors == {}, f"{key}: {step.errors}"
+            assert len(step.latencies_ms) == step.total
+        assert result.steps["lifecycle.get_deleted"].outcomes == {404: result.flows["lifecycle"]}
+        assert result.total == sum(step.total for step in result.steps.values())
+
+    def test_step_without_item_is_skipped(self):
+        """Шаг без объявления не отправляется и учитывается отдельно от запросов"""
+        scenario = make_scenario(flows=[{"name": "read", "steps": [{"call": "get_item", "expect": 200}]}])
+        assert scenario.flows[0].steps[0].expect == [200]
+
+        async def run():
+            async with AsyncApiClient(max_concurrency=scenario.users) as client:
+                return await ScenarioRunner(scenario, client).run()
+
+        result = asyncio.run(run())
+        step = result.steps["read.get_item"]
+        assert "read.get_item: 20" in result.summary()
+        assert step.skipped == scenario.users * scenario.iterations
+        assert step.total == 0 and step.latencies_ms == []
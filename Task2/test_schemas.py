@@ -0,0 +1,53 @@
+import pytest
+from schemas import ITEM, ITEM_LIST, STATISTICS_LIST, SchemaError
+
+
+def make_item(index=0):
+    return {
+        "id": f"id-{index}",
+        "sellerId": 123456,
+        "name": f"Item {index}",
+        "price": 100,
+        "statistics": {"likes": 1, "viewCount": 2, "contacts": 3},
+        "createdAt": "2025-09-01 12:00:00.123456 +0300 +0300",
+    }
+
+
+class TestSchemas:
+    """Тесты схем ответов и скомпилированных валидаторов"""
+
+    def test_valid_item(self):
+        """Корректное объявление проходит проверку, лишние поля допускаются"""
+        item = dict(make_item(), extra="field")
+        assert ITEM.is_valid(item)
+        assert ITEM.errors(item) == []
+        assert ITEM.validate(item) is item
+
+    def test_all_violations_reported(self):
+        """Все нарушения объекта и вложенной статистики - за один проход"""
+        item = make_item()
+        del item["id"]
+        item["price"] = "100"
+        item["statistics"] = {"likes": True, "viewCount": 2.0}
+        assert ITEM.errors(item) == [
+            "$.id: missing",
+            "$.price: expected int, got str",
+            "$.statistics.likes: expected int, got bool",
+            "$.statistics.viewCount: expected int, got float",
+            "$.statistics.contacts: missing",
+        ]
+        assert ITEM.errors([item]) == ["$: expected object, got array"]
+
+    def test_list_reports_invalid_items_only(self):
+        """В отчете по списку - только невалидные элементы с индексами"""
+        items = [make_item(i) for i in range(10000)]
+        assert ITEM_LIST.errors(items) == []
+        items[7]["statistics"] = None
+        items[9000]["sellerId"] = "123456"
+        assert ITEM_LIST.errors(items) == [
+            "$[7].statistics: expected object, got null",
+            "$[9000].sellerId: expected int, got str",
+        ]
+        assert STATISTICS_LIST.errors({}) == ["$: expected array, got object"]
+        with pytest.raises(SchemaError, match="item list: 2 violation"):
+            ITEM_LIST.validate(items)
@@ -0,0 +1,78 @@
+import random
+import socket
+
+from api_client import ApiClient
+from instrumentation import RequestHooks
+from payloads import PayloadGenerator
+from soak import SoakRunner, default_operations, detect_drift, sample_resources
+
+
+def make_windows(latencies, fds=20):
+    return [{"end": float(index), "endpoints": {"GET /api/1/item/:id": {"count": 100, "errors": 0, "p50_ms": value,
+                                                                        "p95_ms": value, "p99_ms": value}},
+             "resources": {"rss_mb": 50.0, "fds": fds, "sockets": 10, "close_wait": 0}}
+            for index, value in enumerate(latencies)]
+
+
+class TestSoak:
+    """Тесты длительного прогона и поиска дрейфа"""
+
+    def test_drift_detection(self):
+        """Устойчивый рост задержки - дрейф; шум вокруг постоянного уровня и малый рост - нет"""
+        rng = random.Random(1)
+        rising = make_windows([10 + index * 0.5 + rng.uniform(-1, 1) for index in range(30)])
+        drift = {result.metric: result for result in detect_drift(rising)}
+        assert drift["GET /api/1/item/:id p95_ms"].drifting
+        assert not drift["fds"].drifting
+
+        flat = make_windows([10 + rng.uniform(-1, 1) for _ in range(30)])
+        assert not any(result.drifting for result in detect_drift(flat))
+        # Рост значим, но меньше порога в 2 мс за прогон
+        slight = make_windows([10 + index * 0.02 for index in range(30)])
+        result = detect_drift(slight)[-1]
+        assert result.p_value < 0.01 and not result.drifting
+
+    def test_close_wait_sockets_counted(self):
+        """Соединение, закрытое сервером, но не клиентом, видно как CLOSE_WAIT"""
+        before = sample_resources()
+        with socket.socket() as server:
+            server.bind(("127.0.0.1", 0))
+            server.listen()
+            client = socket.create_connection(server.getsockname())
+            connection, _ = server.accept()
+            connection.close()
+            after = sample_resources()
+            client.close()
+        assert after["close_wait"] == before["close_wait"] + 1
+        assert after["sockets"] >= before["sockets"] + 1
+
+    def test_socket_leak_is_detected(self):
+        """Операция, не закрывающая сокеты, дает дрейф дескрипторов"""
+        leaked = []
+
+        def leak():
+            leaked.append(socket.socket())
+
+        try:
+            result = SoakRunner([("leak", 1, leak)], RequestHooks(), duration=1.2, window=0.1,
+                                workers=1, rate=100).run()
+        finally:
+            for sock in leaked:
+                sock.close()
+        drifting = {result.metric for result in result.drifting}
+        assert {"fds", "sockets"} <= drifting
+
+    def test_soak_run(self, item_pool):
+        """Короткий прогон смеси операций: окна по всем эндпоинтам, без ошибок"""
+        hooks = RequestHooks()
+        api_client = ApiClient(hooks=hooks)
+        runner = SoakRunner(default_operations(api_client, item_pool, PayloadGenerator(seed=1)), hooks,
+                            duration=1.0, window=0.25, workers=2, rate=200, seed=1)
+        result = runner.run()
+
+        assert runner.operation_errors == {}
+        assert len(result.windows) == 4
+        endpoints = set().union(*(window["endpoints"] for window in result.windows))
+        assert "GET /api/1/item/:id" in endpoints and "POST /api/1/item" in endpoints
+        assert all(window["resources"]["rss_mb"] > 0 for window in result.windows)
+        assert not hooks
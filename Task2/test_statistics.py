@@ -1,6 +1,7 @@
 import pytest
 import random
-from api_client import ApiClient
+from api_client import ApiClient, StatisticsReport
+from schemas import STATISTICS, STATISTICS_LIST
 from test_data import get_valid_item_data, generate_seller_id
 
 
@@ -10,21 +11,10 @@ class TestStatisticsV1:
     def setup_method(self):
         self.api_client = ApiClient()
 
-    def extract_item_id(self, response_data):
-        """Извлечение ID из ответа создания объявления"""
-        if isinstance(response_data, list) and len(response_data) > 0:
-            return response_data[0].get("id")
-        return response_data.get("id")
-
-    def test_get_statistics_existing_item_v1(self):
+    def test_get_statistics_existing_item_v1(self, shared_item):
         """Успешное получение статистики существующего объявления через API v1"""
-        # Создаем объявление
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        created_item = create_response.json()
-        item_id = self.extract_item_id(created_item)
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
 
         # Получаем статистику через API v1
         stat_response = self.api_client.get_statistics(item_id)
@@ -35,10 +25,7 @@ class TestStatisticsV1:
         # Проверяем структуру ответа
         assert isinstance(stat_data, list)
         if len(stat_data) > 0:
-            stat_item = stat_data[0]
-            required_fields = ["likes", "viewCount", "contacts"]
-            for field in required_fields:
-                assert field in stat_item, f"Missing field '{field}' in statistics response"
+            assert STATISTICS.errors(stat_data[0]) == []
 
     def test_get_statistics_nonexistent_item_v1(self):
         """Получение статистики несуществующего объявления через API v1"""
@@ -80,38 +67,23 @@ class TestStatisticsV1:
         response = self.api_client.get_statistics(long_id)
         assert response.status_code in [400, 404]
 
-    def test_get_statistics_response_structure_v1(self):
+    def test_get_statistics_response_structure_v1(self, shared_item):
         """Проверка структуры ответа статистики через API v1"""
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
 
         stat_response = self.api_client.get_statistics(item_id)
         if stat_response.status_code == 200:
             stat_data = stat_response.json()
 
-            # Проверяем, что это список
-            assert isinstance(stat_data, list)
+            # Список (возможно пустой), каждый элемент - объект статистики
+            assert STATISTICS_LIST.errors(stat_data) == []
 
-            # Если есть данные, проверяем структуру каждого элемента
-            for item in stat_data:
-                assert isinstance(item, dict)
-                required_fields = ["likes", "viewCount", "contacts"]
-                for field in required_fields:
-                    assert field in item
-                    assert isinstance(item[field], int)
-
-    def test_get_statistics_data_consistency_v1(self):
+    def test_get_statistics_data_consistency_v1(self, shared_item):
         """Проверка согласованности данных статистики через API v1"""
-        data = get_valid_item_data()
-        original_stats = data["statistics"]
-
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
+        # Объявление из общего пула (только чтение)
+        original_stats = shared_item.data["statistics"]
+        item_id = shared_item.id
 
         stat_response = self.api_client.get_statistics(item_id)
         if stat_response.status_code == 200:
@@ -131,21 +103,10 @@ class TestStatisticsV2:
     def setup_method(self):
         self.api_client = ApiClient()
 
-    def extract_item_id(self, response_data):
-        """Извлечение ID из ответа создания объявления"""
-        if isinstance(response_data, list) and len(response_data) > 0:
-            return response_data[0].get("id")
-        return response_data.get("id")
-
-    def test_get_statistics_existing_item_v2(self):
+    def test_get_statistics_existing_item_v2(self, shared_item):
         """Успешное получение статистики существующего объявления через API v2"""
-        # Создаем объявление
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        created_item = create_response.json()
-        item_id = self.extract_item_id(created_item)
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
 
         # Получаем статистику через API v2
         stat_response = self.api_client.get_statistics_v2(item_id)
@@ -158,10 +119,7 @@ class TestStatisticsV2:
             # Проверяем структуру ответа
             assert isinstance(stat_data, list)
             if len(stat_data) > 0:
-                stat_item = stat_data[0]
-                required_fields = ["likes", "viewCount", "contacts"]
-                for field in required_fields:
-                    assert field in stat_item, f"Missing field '{field}' in statistics response"
+                assert STATISTICS.errors(stat_data[0]) == []
 
     def test_get_statistics_nonexistent_item_v2(self):
         """Получение статистики несуществующего объявления через API v2"""
@@ -203,38 +161,23 @@ class TestStatisticsV2:
         response = self.api_client.get_statistics_v2(long_id)
         assert response.status_code in [400, 404]
 
-    def test_get_statistics_response_structure_v2(self):
+    def test_get_statistics_response_structure_v2(self, shared_item):
         """Проверка структуры ответа статистики через API v2"""
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
 
         stat_response = self.api_client.get_statistics_v2(item_id)
         if stat_response.status_code == 200:
             stat_data = stat_response.json()
 
-            # Проверяем, что это список
-            assert isinstance(stat_data, list)
-
-            # Если есть данные, проверяем структуру каждого элемента
-            for item in stat_data:
-                assert isinstance(item, dict)
-                required_fields = ["likes", "viewCount", "contacts"]
-                for field in required_fields:
-                    assert field in item
-                    assert isinstance(item[field], int)
+            # Список (возможно пустой), каждый элемент - объект статистики
+            assert STATISTICS_LIST.errors(stat_data) == []
 
-    def test_get_statistics_data_consistency_v2(self):
+    def test_get_statistics_data_consistency_v2(self, shared_item):
         """Проверка согласованности данных статистики через API v2"""
-        data = get_valid_item_data()
-        original_stats = data["statistics"]
-
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
+        # Объявление из общего пула (только чтение)
+        original_stats = shared_item.data["statistics"]
+        item_id = shared_item.id
 
         stat_response = self.api_client.get_statistics_v2(item_id)
         if stat_response.status_code == 200:
@@ -254,19 +197,10 @@ class TestStatisticsComparison:
     def setup_method(self):
         self.api_client = ApiClient()
 
-    def extract_item_id(self, response_data):
-        """Извлечение ID из ответа создания объявления"""
-        if isinstance(response_data, list) and len(response_data) > 0:
-            return response_data[0].get("id")
-        return response_data.get("id")
-
-    def test_statistics_v1_vs_v2_same_data(self):
+    def test_statistics_v1_vs_v2_same_data(self, shared_item):
         """Сравнение данных статистики между API v1 и v2 для одного объявления"""
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
 
         # Получаем статистику через оба API
         stat_v1_response = self.api_client.get_statistics(item_id)
@@ -287,9 +221,21 @@ class TestStatisticsComparison:
                 v2_item = stat_v2_data[0]
 
                 # Проверяем одинаковые поля
-                for field in ["likes", "viewCount", "contacts"]:
-                    assert field in v1_item
-                    assert field in v2_item
+                assert STATISTICS.errors(v1_item) == []
+                assert STATISTICS.errors(v2_item) == []
+
+    def test_statistics_v1_vs_v2_batch(self, item_pool):
+        """Пакетное сравнение статистики v1 и v2 с итоговым отчетом"""
+        item_ids = [item.id for item in item_pool.items] + ["nonexistent_stat_id_123"]
+        report = StatisticsReport()
+        diffs = list(self.api_client.compare_statistics(iter(item_ids), max_workers=4, report=report))
+
+        assert sorted(diff.index for diff in diffs) == list(range(len(item_ids)))
+        assert report.total == len(item_ids)
+        assert report.kinds.get("error", 0) == 0
+        for diff in diffs:
+            if diff.kind == "mismatch":
+                assert set(diff.differences) <= {"likes", "viewCount", "contacts"}
 
     def test_statistics_v1_v2_error_consistency(self):
         """Сравнение обработки ошибок между API v1 и v2"""
@@ -316,42 +262,33 @@ class TestStatisticsPerformance:
     def setup_method(self):
         self.api_client = ApiClient()
 
-    def extract_item_id(self, response_data):
-        return response_data.get("id")
-
-    def test_statistics_v1_response_time(self):
+    def test_statistics_v1_response_time(self, latency_recorder, shared_item):
         """Проверка времени ответа для API v1 статистики"""
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
-
-        import time
-        start_time = time.time()
-        stat_response = self.api_client.get_statistics(item_id)
-        end_time = time.time()
-
-        if stat_response.status_code == 200:
-            response_time = end_time - start_time
-            assert response_time < 2, f"Response time too slow: {response_time} seconds"
-
-    def test_statistics_v2_response_time(self):
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
+
+        # В гистограмму попадают только успешные ответы
+        histogram = latency_recorder.measure(
+            "GET /api/1/statistic/:id",
+            lambda: self.api_client.get_statistics(item_id),
+            accept_status=[200]
+        )
+        p95_ms = histogram.percentile_ms(95)
+        assert p95_ms < 2000, f"Response time too slow: p95={p95_ms:.1f} ms"
+
+    def test_statistics_v2_response_time(self, latency_recorder, shared_item):
         """Проверка времени ответа для API v2 статистики"""
-        data = get_valid_item_data()
-        create_response = self.api_client.create_item(data)
-        assert create_response.status_code == 200
-
-        item_id = self.extract_item_id(create_response.json())
-
-        import time
-        start_time = time.time()
-        stat_response = self.api_client.get_statistics_v2(item_id)
-        end_time = time.time()
-
-        if stat_response.status_code in [200, 100]:
-            response_time = end_time - start_time
-            assert response_time < 2, f"Response time too slow: {response_time} seconds"
+        # Объявление из общего пула (только чтение)
+        item_id = shared_item.id
+
+        # В гистограмму попадают только успешные ответы
+        histogram = latency_recorder.measure(
+            "GET /api/2/statistic/:id",
+            lambda: self.api_client.get_statistics_v2(item_id),
+            accept_status=[200, 100]
+        )
+        p95_ms = histogram.percentile_ms(95)
+        assert p95_ms < 2000, f"Response time too slow: p95={p95_ms:.1f} ms"
 
 
 class TestStatisticsEdgeCases:
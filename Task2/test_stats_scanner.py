@@ -0,0 +1,71 @@
+import pytest
+from api_client import ApiClient
+from fake_server import FakeAdsServer
+from stats_scanner import ScanCheckpoint, StatsScanner, parse_created_at
+from test_data import get_boundary_seller_data
+
+FIRST_SELLER = 500000
+LAST_SELLER = 500059
+
+
+class ScanInterrupted(Exception):
+    pass
+
+
+class TestStatsScanner:
+    """Тесты сканера согласованности статистики v1 и v2"""
+
+    def make_scanner(self, server, tmp_path, **options):
+        return StatsScanner(
+            api_client=ApiClient(base_url=server.url),
+            first=FIRST_SELLER, last=LAST_SELLER, workers=4, block_size=20,
+            checkpoint_path=str(tmp_path / "scan.json"), findings_path=str(tmp_path / "scan.jsonl"),
+            **options
+        )
+
+    def create_items(self, server, seller_ids):
+        api_client = ApiClient(base_url=server.url)
+        for seller_id in seller_ids:
+            assert api_client.create_item(get_boundary_seller_data(seller_id)).status_code == 200
+
+    def test_scan_resumes_after_interruption(self, tmp_path):
+        """Прерванный скан продолжается с контрольной точки"""
+        with FakeAdsServer() as server:
+            self.create_items(server, [FIRST_SELLER, FIRST_SELLER, 500030, LAST_SELLER])
+
+            def interrupt(checkpoint):
+                raise ScanInterrupted()
+
+            with pytest.raises(ScanInterrupted):
+                self.make_scanner(server, tmp_path).run(progress=interrupt)
+            saved = ScanCheckpoint.load(str(tmp_path / "scan.json"))
+            assert saved.next_seller == FIRST_SELLER + 20
+            assert not saved.completed
+
+            scanner = self.make_scanner(server, tmp_path)
+            checkpoint = scanner.run()
+
+        assert scanner.sellers_scanned == 40
+        assert checkpoint.completed
+        assert checkpoint.counters["sellers"] == 60
+        assert checkpoint.counters["items"] == 4
+        assert checkpoint.kinds == {"consistent": 4}
+
+    def test_incremental_scan_checks_new_items(self, tmp_path):
+        """Инкрементальный проход проверяет только новые объявления"""
+        with FakeAdsServer() as server:
+            self.create_items(server, [FIRST_SELLER, 500010])
+            self.make_scanner(server, tmp_path).run()
+            self.create_items(server, [500020])
+
+            checkpoint = self.make_scanner(server, tmp_path, incremental=True).run()
+
+        assert checkpoint.counters["items"] == 3
+        assert checkpoint.counters["items_checked"] == 1
+
+    def test_parse_created_at(self):
+        """Разбор createdAt в форматах ISO 8601 и сервиса"""
+        iso = parse_created_at("2025-09-01T12:00:00.123456+00:00")
+        service = parse_created_at("2025-09-01 15:00:00.123456789 +0300 +0300")
+        assert iso == service
+        assert parse_created_at("not a date") is None
@@ -0,0 +1,84 @@
+import time
+
+from api_client import ApiClient
+from fake_server import FakeAdsServer
+from instrumentation import RequestHooks
+from resilience import CircuitBreakerRegistry, RetryPolicy
+from test_data import get_valid_item_data
+from traffic import TrafficRecorder, TrafficReplayer, compare_latency, load_sessions, load_traffic
+
+
+class TestTrafficReplay:
+    """Тесты записи и воспроизведения трафика"""
+
+    def record(self, path, server, item_count=3, record_bodies=False):
+        hooks = RequestHooks()
+        with TrafficRecorder(str(path), record_bodies=record_bodies).attach(hooks) as recorder:
+            api_client = ApiClient(
+                base_url=server.url,
+                retry_policy=RetryPolicy(max_attempts=1),
+                circuit_breakers=CircuitBreakerRegistry(enabled=False),
+                hooks=hooks
+            )
+            for _ in range(item_count):
+                item_id = api_client.create_item(get_valid_item_data()).json()["id"]
+                api_client.get_item(item_id)
+                api_client.get_statistics(item_id)
+        return recorder.session
+
+    def test_replay_against_new_server(self, tmp_path):
+        """Записанный трафик воспроизводится на пустом стенде с подменой ID"""
+        path = tmp_path / "traffic.jsonl"
+        with FakeAdsServer() as server:
+            self.record(path, server)
+        entries = load_traffic(path)
+        assert [entry["endpoint"] for entry in entries[:3]] == [
+            "POST /api/1/item", "GET /api/1/item/:id", "GET /api/1/statistic/:id"
+        ]
+        assert all(entry["status"] == 200 for entry in entries)
+
+        with FakeAdsServer() as server:
+            # Один воркер: GET уходит после завершения POST, ID уже подменен
+            result = TrafficReplayer(base_url=server.url, speed=None, workers=1).replay(entries)
+
+        assert result.requests == 9
+        assert result.status_mismatches == 0
+        assert result.statuses == {200: 9}
+        comparison = compare_latency(entries, result)
+        assert comparison["GET /api/1/item/:id"]["replay_count"] == 3
+
+    def test_replay_keeps_schedule(self, tmp_path):
+        """При speed=N интервалы между запросами сокращаются в N раз"""
+        path = tmp_path / "traffic.jsonl"
+        with FakeAdsServer() as server:
+            self.record(path, server, item_count=1)
+        entries = load_traffic(path)
+        for index, entry in enumerate(entries):
+            entry["t"] = index * 0.2
+
+        with FakeAdsServer() as server:
+            start = time.perf_counter()
+            result = TrafficReplayer(base_url=server.url, speed=2, workers=2).replay(entries)
+            elapsed = time.perf_counter() - start
+
+        assert elapsed >= 0.2
+        assert result.requests == 3
+        assert result.lag.count == 3
+
+    def test_sessions_in_one_file(self, tmp_path):
+        """Сессии, дописанные в один файл, не смешиваются; тела ответов - только по запросу"""
+        path = tmp_path / "traffic.jsonl"
+        with FakeAdsServer() as server:
+            first = self.record(path, server, item_count=2)
+            second = self.record(path, server, item_count=1, record_bodies=True)
+
+        sessions = load_sessions(path)
+        assert list(sessions) == [first, second]
+        assert [len(entries) for entries in sessions.values()] == [6, 3]
+        # По умолчанию воспроизводится последняя сессия, t отсчитывается от ее начала
+        assert load_traffic(path) == sessions[second]
+        assert load_traffic(path, first)[0]["t"] < 1
+        create = sessions[first][0]
+        assert "body" not in create and create["item_id"]
+        assert all("body" not in entry for entry in sessions[first][1:])
+        assert all("body" in entry for entry in sessions[second])
@@ -0,0 +1,75 @@
+"""Таймауты ApiClient: раздельные connect/read по эндпоинтам и общий дедлайн
+для теста или пакета запросов."""
+import contextvars
+import time
+from contextlib import contextmanager
+
+# Таймаут установки соединения: должен быть заметно меньше таймаута чтения
+CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10
+
+# (connect, read) в секундах для каждого эндпоинта
+TIMEOUT_PROFILES = {
+    "POST /api/1/item": (CONNECT_TIMEOUT, 10),
+    "GET /api/1/item/:id": (CONNECT_TIMEOUT, 5),
+    "GET /api/1/:sellerID/item": (CONNECT_TIMEOUT, 10),
+    "GET /api/1/statistic/:id": (CONNECT_TIMEOUT, 5),
+    "GET /api/2/statistic/:id": (CONNECT_TIMEOUT, 5),
+    "DELETE /api/2/item/:id": (CONNECT_TIMEOUT, 5),
+}
+
+_current_deadline = contextvars.ContextVar("api_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Общий дедлайн истек: запрос не отправлен или прерван"""
+
+
+class Deadline:
+    """Момент, к которому должны завершиться все запросы в своей области"""
+
+    def __init__(self, seconds, clock=time.monotonic):
+        self.seconds = seconds
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self):
+        return self.remaining() <= 0
+
+    def clip(self, timeout):
+        """(connect, read), ограниченные оставшимся временем.
+
+        Нулевой таймаут urllib3 отвергает ValueError, поэтому дедлайн,
+        истекший к этому моменту, - DeadlineExceeded.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Deadline exceeded")
+        connect, read = timeout
+        return min(connect, remaining), min(read, remaining)
+
+
+def current_deadline():
+    """Дедлайн текущего контекста или None"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(seconds):
+    """Ограничить все запросы ApiClient внутри блока общим временем seconds.
+
+    Вложенная область не может продлить внешний дедлайн.
+    """
+    deadline = Deadline(seconds)
+    outer = _current_deadline.get()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
@@ -0,0 +1,334 @@
+"""Запись трафика ApiClient в JSONL и воспроизведение его против другого стенда.
+
+Запись (одна строка на попытку запроса, файл только дописывается; у каждой
+записи - ID сессии записи, воспроизводится одна сессия за раз):
+    pytest --fake-server --record-traffic traffic.jsonl
+    pytest --fake-server --record-traffic traffic.jsonl --record-traffic-bodies
+
+Воспроизведение с исходной скоростью, в N раз быстрее или без пауз:
+    python traffic.py traffic.jsonl --fake-server --speed 1
+    python traffic.py traffic.jsonl --base-url http://127.0.0.1:8080 --speed 10 --workers 32
+    python traffic.py traffic.jsonl --fake-server --speed max
+    python traffic.py traffic.jsonl --list-sessions
+    python traffic.py traffic.jsonl --session 1700000000-4242-1 --fake-server
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+
+from api_client import ApiClient, extract_item_id
+from latency_recorder import LatencyHistogram
+
+DEFAULT_TRAFFIC_FILE = "traffic.jsonl"
+CREATE_ITEM_ENDPOINT = "POST /api/1/item"
+COMPARE_PERCENTILES = [50, 95, 99]
+# Номер записи в процессе: ID сессий не совпадают в пределах одной секунды
+_session_numbers = itertools.count(1)
+
+
+class TrafficRecorder:
+    """Хук ApiClient, дописывающий каждую попытку запроса строкой JSON в path.
+
+    session - ID этой записи: в файл могут дописывать несколько сессий, и t
+    (секунды от начала записи, по нему строится расписание воспроизведения)
+    сравним только внутри одной сессии. Тела ответов сохраняются только с
+    record_bodies=True; без них у создания объявления сохраняется item_id
+    (нужен для подмены ID при воспроизведении).
+    """
+
+    def __init__(self, path=DEFAULT_TRAFFIC_FILE, record_bodies=False):
+        self.path = path
+        self.record_bodies = record_bodies
+        self.count = 0
+        self.session = f"{int(time.time())}-{os.getpid()}-{next(_session_numbers)}"
+        self._started_ns = time.perf_counter_ns()
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._hooks = None
+
+    def attach(self, hooks):
+        hooks.add("post_response", self.observe)
+        hooks.add("on_error", self.observe)
+        self._hooks = hooks
+        return self
+
+    def close(self):
+        if self._hooks is not None:
+            self._hooks.remove("post_response", self.observe)
+            self._hooks.remove("on_error", self.observe)
+            self._hooks = None
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def observe(self, event):
+        parts = urlsplit(event.url)
+        entry = {
+            "session": self.session,
+            "t": round((event.started_ns - self._started_ns) / 1e9, 6),
+            "ts": round(event.started_at, 6),
+            "endpoint": event.endpoint,
+            "method": event.method,
+            "path": parts.path + (f"?{parts.query}" if parts.query else ""),
+            "json": event.json,
+            "elapsed_ms": round(event.total_ns / 1e6, 3),
+        }
+        if event.response is not None:
+            entry["status"] = event.response.status_code
+            entry["ttfb_ms"] = round(event.ttfb_ns / 1e6, 3)
+            entry["bytes"] = event.response_bytes
+            if self.record_bodies and not event.stream:
+                entry["body"] = event.response.text
+            elif event.endpoint == CREATE_ITEM_ENDPOINT and event.response.status_code == 200:
+                entry["item_id"] = _item_id(event.response.text)
+        else:
+            entry["error"] = str(event.error)
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+
+def load_sessions(path):
+    """{ID сессии: записи в порядке времени отправки}, сессии в порядке начала.
+
+    Записи без ID сессии (старый формат) - одна сессия None.
+    """
+    sessions = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                sessions.setdefault(entry.get("session"), []).append(entry)
+    for entries in sessions.values():
+        entries.sort(key=lambda entry: entry["t"])
+    return dict(sorted(sessions.items(), key=lambda item: item[1][0]["ts"]))
+
+
+def load_traffic(path, session=None):
+    """Записи одной сессии (по умолчанию последней) в порядке времени отправки"""
+    sessions = load_sessions(path)
+    if not sessions:
+        return []
+    if session is None:
+        return list(sessions.values())[-1]
+    if session not in sessions:
+        raise ValueError(f"Session {session} not found in {path}")
+    return sessions[session]
+
+
+def _item_id(body):
+    try:
+        return extract_item_id(json.loads(body))
+    except (TypeError, ValueError):
+        return None
+
+
+class ReplayResult:
+    """Задержки воспроизведения по эндпоинтам.
+
+    lag - насколько позже расписания ушел запрос (нехватка воркеров или
+    клиентские накладные расходы); при speed=None (max) не считается.
+    """
+
+    def __init__(self, speed, workers):
+        self.speed = speed
+        self.workers = workers
+        self.histograms = {}
+        self.lag = LatencyHistogram()
+        self.statuses = {}
+        self.status_mismatches = 0
+        self.errors = {}
+        self.requests = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, entry, latency_ns, lag_ns, status=None, error=None):
+        with self._lock:
+            self.requests += 1
+            if lag_ns is not None:
+                self.lag.record(lag_ns)
+            if error is not None:
+                kind = error.split(":", 1)[0]
+                self.errors[kind] = self.errors.get(kind, 0) + 1
+                return
+            self.histograms.setdefault(entry["endpoint"], LatencyHistogram()).record(latency_ns)
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if entry.get("status") is not None and entry["status"] != status:
+                self.status_mismatches += 1
+
+    @property
+    def throughput(self):
+        return self.requests / self.duration if self.duration > 0 else 0.0
+
+
+class TrafficReplayer:
+    """Воспроизведение записанного трафика пулом воркеров.
+
+    speed=1 - исходные интервалы между запросами, speed=N - в N раз быстрее,
+    speed=None - без пауз. ID объявлений, созданных при записи, заменяются на
+    ID, созданные при воспроизведении (если запрос создания уже завершился).
+    """
+
+    def __init__(self, base_url=None, speed=1.0, workers=16, session=None):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed must be > 0")
+        self.client = ApiClient(base_url=base_url, pool_maxsize=max(workers, 1), session=session)
+        self.session = self.client.session
+        self.speed = speed
+        self.workers = workers
+        self._id_map = {}
+        self._id_lock = threading.Lock()
+
+    def _rewrite(self, path):
+        with self._id_lock:
+            if not self._id_map:
+                return path
+            return "/".join(self._id_map.get(part, part) for part in path.split("/"))
+
+    def _send(self, entry, due, result):
+        lag_ns = None
+        if due is not None:
+            lag_ns = max(0, time.perf_counter_ns() - due)
+        url = self.client.base_url + self._rewrite(entry["path"])
+        start = time.perf_counter_ns()
+        try:
+            response = self.session.request(
+                entry["method"], url,
+                json=entry.get("json"),
+                headers={"Accept": "application/json"},
+                timeout=self.client.get_timeout(entry["endpoint"])
+            )
+        except requests.exceptions.RequestException as e:
+            result.record(entry, None, lag_ns, error=f"{type(e).__name__}: {url}")
+            return
+        latency_ns = time.perf_counter_ns() - start
+        result.record(entry, latency_ns, lag_ns, status=response.status_code)
+        if entry["endpoint"] == CREATE_ITEM_ENDPOINT and response.status_code == 200:
+            old_id = entry.get("item_id") or _item_id(entry.get("body"))
+            new_id = _item_id(response.text)
+            if old_id and new_id:
+                with self._id_lock:
+                    self._id_map[old_id] = new_id
+
+    def replay(self, entries):
+        result = ReplayResult(self.speed, self.workers)
+        if not entries:
+            return result
+        first = entries[0]["t"]
+        pending = set()
+        start = time.perf_counter_ns()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="replay") as executor:
+            for entry in entries:
+                due = None
+                if self.speed is not None:
+                    due = start + int((entry["t"] - first) / self.speed * 1e9)
+                    delay = (due - time.perf_counter_ns()) / 1e9
+                    if delay > 0:
+                        time.sleep(delay)
+                if len(pending) >= 2 * self.workers:
+                    _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                pending.add(executor.submit(self._send, entry, due, result))
+            wait(pending)
+        result.duration = (time.perf_counter_ns() - start) / 1e9
+        return result
+
+
+def recorded_histograms(entries):
+    """Гистограммы задержек записанного прогона по эндпоинтам (только ответы)"""
+    histograms = {}
+    for entry in entries:
+        if entry.get("status") is not None:
+            histograms.setdefault(entry["endpoint"], LatencyHistogram()).record(entry["elapsed_ms"] * 1e6)
+    return histograms
+
+
+def compare_latency(entries, result):
+    """Перцентили записи и воспроизведения по эндпоинтам и их отношение"""
+    recorded = recorded_histograms(entries)
+    comparison = {}
+    for endpoint in sorted(set(recorded) | set(result.histograms)):
+        before = recorded.get(endpoint, LatencyHistogram())
+        after = result.histograms.get(endpoint, LatencyHistogram())
+        row = {"recorded_count": before.count, "replay_count": after.count}
+        for percent in COMPARE_PERCENTILES:
+            row[f"recorded_p{percent}_ms"] = before.percentile_ms(percent)
+            row[f"replay_p{percent}_ms"] = after.percentile_ms(percent)
+        recorded_p95 = row["recorded_p95_ms"]
+        row["p95_ratio"] = row["replay_p95_ms"] / recorded_p95 if recorded_p95 else None
+        comparison[endpoint] = row
+    return comparison
+
+
+def format_comparison(comparison):
+    lines = [f"{'endpoint':<28} {'count':>11} " + " ".join(f"{f'p{p} ms':>17}" for p in COMPARE_PERCENTILES)
+             + f" {'p95 x':>7}"]
+    for endpoint, row in comparison.items():
+        cells = " ".join(f"{row[f'recorded_p{p}_ms']:>8.2f}/{row[f'replay_p{p}_ms']:<8.2f}" for p in COMPARE_PERCENTILES)
+        ratio = f"{row['p95_ratio']:.2f}" if row["p95_ratio"] is not None else "-"
+        lines.append(f"{endpoint:<28} {row['recorded_count']:>5}/{row['replay_count']:<5} {cells} {ratio:>7}")
+    return "\n".join(lines)
+
+
+def parse_speed(value):
+    if value == "max":
+        return None
+    return float(value.rstrip("x"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("traffic", nargs="?", default=DEFAULT_TRAFFIC_FILE, help="Файл с записанным трафиком")
+    parser.add_argument("--base-url", default=None, help="Стенд для воспроизведения (по умолчанию API_BASE_URL)")
+    parser.add_argument("--fake-server", action="store_true", help="Воспроизвести против локального fake_server.py")
+    parser.add_argument("--speed", type=parse_speed, default=1.0, help="1, 10 (или 10x) либо max")
+    parser.add_argument("--workers", type=int, default=16, help="Количество воркеров")
+    parser.add_argument("--session", default=None, help="Сессия записи (по умолчанию последняя)")
+    parser.add_argument("--list-sessions", action="store_true", help="Показать сессии записи в файле")
+    args = parser.parse_args(argv)
+
+    if args.list_sessions:
+        for session, entries in load_sessions(args.traffic).items():
+            started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entries[0]["ts"]))
+            print(f"{session}  {started}  {len(entries)} запросов, {entries[-1]['t']:.1f} с")
+        return 0
+    entries = load_traffic(args.traffic, args.session)
+    server = None
+    base_url = args.base_url
+    if args.fake_server:
+        from fake_server import FakeAdsServer
+        server = FakeAdsServer().start()
+        base_url = server.url
+    try:
+        result = TrafficReplayer(base_url=base_url, speed=args.speed, workers=args.workers).replay(entries)
+    finally:
+        if server is not None:
+            server.stop()
+
+    speed = "max" if args.speed is None else f"{args.speed:g}x"
+    print(f"{result.requests} запросов за {result.duration:.2f} с ({result.throughput:.1f} rps), скорость {speed}, "
+          f"воркеров {args.workers}")
+    if args.speed is not None:
+        print(f"отставание от расписания: p50={result.lag.percentile_ms(50):.2f} ms "
+              f"p99={result.lag.percentile_ms(99):.2f} ms")
+    print(f"расхождений кода ответа: {result.status_mismatches}, ошибок: {result.errors or 0}")
+    print(format_comparison(compare_latency(entries, result)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())